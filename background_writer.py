@@ -0,0 +1,59 @@
+import os
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+# region Constants
+# A file is written under this name first and renamed when it is complete, so that no reader sees half of it.
+TEMP_PATH = "{}.tmp"
+
+
+# endregion
+
+class BackgroundWriter:
+    """
+    The BackgroundWriter class runs the saving of crawled results in a background thread, so that the results can be
+    printed from memory while they are written to the disk. The tasks run one after another in the order in which
+    they were submitted.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending: list[Future] = []
+
+    def submit(self, function: Callable, *args) -> None:
+        """
+        Starts the function in the background thread.
+
+        :param function: The function which writes the results.
+        :param args: The arguments of the function.
+        """
+        self._pending.append(self._executor.submit(function, *args))
+
+    def wait(self) -> None:
+        """
+        Waits until all submitted tasks are finished. An exception raised by a task is raised here.
+        """
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+
+# region Public functions
+def write_atomically(path: str, write: Callable[[str], None]) -> None:
+    """
+    Writes the file under a temporary name and renames it to the path only when it is complete. The rename replaces
+    an existing file in one step, therefore the path holds always either the old or the new complete file.
+
+    :param path: The path of the file.
+    :param write: Function which writes the file to the path which it gets.
+    """
+    temp_path = TEMP_PATH.format(path)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+# endregion
@@ -0,0 +1,189 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.tree_generator import generate_tree, modify_tree, TREE_SHAPES
+from folder_crawler import FolderCrawler
+from structures import SavedCrawls
+
+# region Constants
+# Run from the root of the repository: python -m benchmarks.run_benchmarks --output results.json
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_REPEAT = 3
+FIRST_ROOT = "first"
+SECOND_ROOT = "second"
+RESULTS_VERSION = 1
+# A stage is reported as a regression if its best time is slower than in the baseline by more than this fraction.
+REGRESSION_TOLERANCE = 0.2
+
+
+# endregion
+
+# region Public functions
+def run_benchmarks(shapes: list[str], scale: float = 1.0, repeat: int = DEFAULT_REPEAT, workers: int = 1) -> dict:
+    """
+    Generates the synthetic trees, times every stage of the crawl on them and returns the results as a JSON
+    serializable dictionary. Every stage runs repeat times. The best time is the one to compare between runs,
+    because it is the least disturbed by the other processes on the machine.
+
+    :param shapes: Keys of TREE_SHAPES which are benchmarked.
+    :param scale: Multiplies the number of files in every folder of the generated trees.
+    :param repeat: The number of runs of each stage.
+    :param workers: The number of workers of the crawler.
+    """
+    results = []
+    working_directory = os.getcwd()
+    for shape in shapes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # The crawler saves its results relative to the working directory.
+            os.chdir(temp_dir)
+            try:
+                files, folders, size = generate_tree(FIRST_ROOT, shape, scale)
+                shutil.copytree(FIRST_ROOT, SECOND_ROOT)
+                modify_tree(SECOND_ROOT)
+                for stage, items, seconds in _time_stages(repeat, workers):
+                    results.append(_get_result(shape, stage, items, seconds))
+                print(f"{shape}: {files} files, {folders} folders, {size} bytes")
+            finally:
+                os.chdir(working_directory)
+
+    return {"version": RESULTS_VERSION,
+            "created": datetime.datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": scale,
+            "repeat": repeat,
+            "workers": workers,
+            "results": results}
+
+
+def time_stage(function, repeat: int) -> tuple[object, list[float]]:
+    """
+    Runs the function repeat times with its output hidden and returns the last result and the times in seconds.
+
+    :param function: Function without arguments.
+    :param repeat: The number of runs.
+    """
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = function()
+            seconds.append(time.perf_counter() - start)
+    return result, seconds
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> list[dict]:
+    """
+    Returns the stages whose best times are slower than in the baseline by more than the tolerance, together with
+    the ratio of both times. Stages which are not in the baseline are not compared.
+
+    :param results: The results returned by run_benchmarks.
+    :param baseline: The results of an earlier run, loaded from its JSON file.
+    :param tolerance: The fraction by which a stage may be slower.
+    """
+    baseline_times = {(row["shape"], row["stage"]): row["best"] for row in baseline["results"]}
+    regressions = []
+    for row in results["results"]:
+        baseline_time = baseline_times.get((row["shape"], row["stage"]))
+        if baseline_time and row["best"] > baseline_time * (1 + tolerance):
+            regressions.append({"shape": row["shape"], "stage": row["stage"], "ratio": row["best"] / baseline_time})
+    return regressions
+
+
+# endregion
+
+# region Private functions
+def _time_stages(repeat: int, workers: int):
+    """
+    Yields the name of each stage, the number of items which it processed and the times of its runs.
+
+    :param repeat: The number of runs of each stage.
+    :param workers: The number of workers of the crawler.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        crawler = FolderCrawler(path=FIRST_ROOT, path2=SECOND_ROOT, read_out_file_contents=False,
+                                copy_diffs_to_folder=False, workers=workers)
+    FolderCrawler._initialize_storage(SavedCrawls.ROOT)
+
+    paths, seconds = time_stage(lambda: FolderCrawler._crawl_deep(FIRST_ROOT), repeat)
+    yield "_crawl_deep", len(paths), seconds
+    shallow_paths, seconds = time_stage(lambda: FolderCrawler._crawl_shallow(FIRST_ROOT), repeat)
+    yield "_crawl_shallow", len(shallow_paths), seconds
+    # The scandir engine stats every item while it lists the folders, the same as _crawl_items does.
+    records, seconds = time_stage(lambda: crawler._scan_roots([FIRST_ROOT], go_deep=True), repeat)
+    yield "_scan_roots", len(records[0]), seconds
+
+    dataframe, seconds = time_stage(lambda: crawler._crawl_items(FIRST_ROOT, go_deep=True), repeat)
+    yield "_crawl_items", len(dataframe), seconds
+    _, seconds = time_stage(lambda: crawler._prepare_dataframes(dataframe), repeat)
+    yield "_prepare_dataframes", len(dataframe), seconds
+    _, seconds = time_stage(crawler._save_dataframes, repeat)
+    yield "_save_dataframes", len(dataframe), seconds
+    _, seconds = time_stage(crawler._load_dataframes, repeat)
+    yield "_load_dataframes", len(dataframe), seconds
+    _, seconds = time_stage(lambda: crawler._print_dataframes(True, True, True, "", 0, ">=", datetime.datetime.min,
+                                                              ">=", True), repeat)
+    yield "_print_dataframes", len(dataframe), seconds
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for path in (FIRST_ROOT, SECOND_ROOT):
+            crawler.crawl_folders(path)
+    differences, seconds = time_stage(crawler.compare_saved_crawls, repeat)
+    yield "compare_saved_crawls", len(differences), seconds
+
+
+def _get_result(shape: str, stage: str, items: int, seconds: list[float]) -> dict:
+    """
+    Returns one row of the results.
+
+    :param shape: The shape of the generated tree.
+    :param stage: The name of the timed stage.
+    :param items: The number of items processed by the stage.
+    :param seconds: The times of the runs of the stage.
+    """
+    best = min(seconds)
+    return {"shape": shape, "stage": stage, "items": items, "seconds": seconds, "best": best,
+            "median": statistics.median(seconds), "items_per_second": items / best if best else None}
+
+
+def _parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark the stages of the folder crawler on synthetic trees.")
+    parser.add_argument('--shapes', nargs="+", choices=list(TREE_SHAPES), default=list(TREE_SHAPES),
+                        help="Shapes of the generated trees.")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplies the number of files in every folder.")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Number of runs of each stage.")
+    parser.add_argument('-w', '--workers', type=int, default=1, help="Number of workers of the crawler.")
+    parser.add_argument('--output', type=str, default=DEFAULT_OUTPUT, help="Path of the JSON file with the results.")
+    parser.add_argument('--baseline', type=str, help="Path of the JSON file with results to compare against.")
+    return parser.parse_args()
+
+
+# endregion
+
+
+if __name__ == '__main__':
+    arguments = _parse_arguments()
+    output = os.path.abspath(arguments.output)
+    benchmark_results = run_benchmarks(arguments.shapes, arguments.scale, arguments.repeat, arguments.workers)
+    with open(output, "w") as results_file:
+        json.dump(benchmark_results, results_file, indent=2)
+    for row in benchmark_results["results"]:
+        print(f"{row['shape']:<14}{row['stage']:<28}{row['items']:>10}{row['best']:>12.4f} s")
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            found_regressions = find_regressions(benchmark_results, json.load(baseline_file))
+        for regression in found_regressions:
+            print(f"REGRESSION {regression['shape']} {regression['stage']}: {regression['ratio']:.2f}x slower")
+        raise SystemExit(1 if found_regressions else 0)
@@ -0,0 +1,87 @@
+import os
+import random
+
+# region Constants
+# Every shape is described by the numbers of folders on each level below the root, the number of files in every
+# folder and the range of file sizes in bytes. The trees are generated from a seed, so every run crawls the same tree.
+TREE_SHAPES = {
+    # Many folders next to each other.
+    "wide": {"levels": [400], "files_per_folder": 10, "file_size": (0, 4096)},
+    # A long chain of nested folders.
+    "deep": {"levels": [1] * 60, "files_per_folder": 20, "file_size": (0, 4096)},
+    # Lots of empty and tiny files in a moderate tree.
+    "tiny_files": {"levels": [20, 5], "files_per_folder": 40, "file_size": (0, 16)},
+    # A few folders with a huge number of files each.
+    "huge_folders": {"levels": [3], "files_per_folder": 3000, "file_size": (0, 1024)},
+}
+FILE_NAME = "file_{}.txt"
+FOLDER_NAME = "folder_{}"
+# All generated items get last changes from this range, so the trees are the same also in their timestamps.
+FIRST_CHANGE = 1_600_000_000
+LAST_CHANGE = 1_700_000_000
+
+
+# endregion
+
+# region Public functions
+def generate_tree(root: str, shape: str, scale: float = 1.0, seed: int = 0) -> tuple[int, int, int]:
+    """
+    Creates a synthetic tree of folders and files in the root and returns the numbers of files and folders and the
+    total size of the files in bytes. The same shape, scale and seed always create the same tree.
+
+    :param root: The folder where the tree is created. It is created if it does not exist.
+    :param shape: One of the keys of TREE_SHAPES.
+    :param scale: Multiplies the number of files in every folder, so the same shape can be benchmarked in more sizes.
+    :param seed: The seed of the generator of sizes and last changes.
+    """
+    parameters = TREE_SHAPES[shape]
+    generator = random.Random(seed)
+    files_per_folder = max(1, round(parameters["files_per_folder"] * scale))
+
+    folders = [root]
+    level = [root]
+    for folders_per_parent in parameters["levels"]:
+        level = [os.path.join(parent, FOLDER_NAME.format(index))
+                 for parent in level for index in range(folders_per_parent)]
+        folders.extend(level)
+
+    total_size = 0
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+        for index in range(files_per_folder):
+            size = generator.randint(*parameters["file_size"])
+            path = os.path.join(folder, FILE_NAME.format(index))
+            with open(path, "wb") as file:
+                file.write(generator.randbytes(size))
+            change = generator.randint(FIRST_CHANGE, LAST_CHANGE)
+            os.utime(path, (change, change))
+            total_size += size
+
+    # Folders get their last changes after all their files were written into them.
+    for folder in reversed(folders):
+        change = generator.randint(FIRST_CHANGE, LAST_CHANGE)
+        os.utime(folder, (change, change))
+
+    return len(folders) * files_per_folder, len(folders) - 1, total_size
+
+
+def modify_tree(root: str, fraction: float = 0.01, seed: int = 1) -> int:
+    """
+    Rewrites a fraction of the files of a generated tree with new contents and last changes, so that two trees can be
+    compared. Returns the number of modified files.
+
+    :param root: The root of the generated tree.
+    :param fraction: The part of the files which are modified.
+    :param seed: The seed of the generator which picks the files.
+    """
+    generator = random.Random(seed)
+    paths = sorted(os.path.join(folder, name) for folder, _, names in os.walk(root) for name in names)
+    modified = generator.sample(paths, max(1, round(len(paths) * fraction))) if paths else []
+    for path in modified:
+        with open(path, "ab") as file:
+            file.write(generator.randbytes(8))
+        change = generator.randint(LAST_CHANGE, LAST_CHANGE + 1_000_000)
+        os.utime(path, (change, change))
+    return len(modified)
+
+# endregion
@@ -14,6 +14,16 @@ def command_line_arguments_parser():
     parser.add_argument('-s', '--shallow', action='store_true', help="Do not crawl deep into sub-folders.")
     parser.add_argument('-v', '--visualize', action='store_true', help="Print the results in the console.")
     parser.add_argument('-e', '--excluded', action='store_true', help="Print skipped items.")
+    parser.add_argument('--csv', action='store_true', help="Export the crawled data also into csv files.")
+    parser.add_argument('-d', '--duplicates', action='store_true', help="Find files with the same content.")
+    parser.add_argument('--hash', action='store_true', help="Compare also the contents of files when two crawls are compared.")
+    parser.add_argument('--stream', action='store_true', help="Compare two crawls by streaming their snapshots.")
+    parser.add_argument('--index', action='store_true', help="Build a SQLite index of the crawl and filter with queries on it.")
+    parser.add_argument('-i', '--incremental', action='store_true', help="Reuse unchanged folders from the previous crawl.")
+    parser.add_argument('-o', '--output', type=str, choices=["table", "csv", "ndjson"], help="Stream the crawled items in this format while crawling, instead of saving them first.")
+    parser.add_argument('-m', '--memory', type=int, default=0, help="Memory budget in MB for the crawled files. Files over the budget are spilled to the disk.")
+    parser.add_argument('--metrics', type=str, default="", help="Save the measurements of the phases of the crawl into this file (.json or .prom).")
+    parser.add_argument('-w', '--workers', type=int, default=1, help="Number of workers listing folders in parallel.")
 
     parser.add_argument('--fpath', type=str, help="Filter by path.")
     parser.add_argument('--fsize', type=int, help="Filter by size.")
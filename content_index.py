@@ -0,0 +1,139 @@
+import sqlite3
+import numpy as np
+
+from content_search import BLOCK_SIZE, map_in_pool
+
+# region Constants
+# The content index is a SQLite database with postings trigram -> file. A trigram is made of three lowered bytes of
+# the content, packed into one integer. A file can contain a text only if it contains all trigrams of the text.
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS files ("
+    "id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, size INTEGER NOT NULL, changed INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS postings ("
+    "trigram INTEGER NOT NULL, file_id INTEGER NOT NULL, PRIMARY KEY (trigram, file_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS idx_postings_file_id ON postings (file_id)",
+)
+TRIGRAM_LENGTH = 3
+
+
+# endregion
+
+# region Public functions
+def update_content_index(path: str, paths: list[str], sizes: list[int], changes: list[int],
+                         workers: int = 1, chunksize: int = 32) -> int:
+    """
+    Adds the files into the index. Files which are already indexed with the same size and last change are skipped,
+    the others are read and their postings are replaced. Returns the number of files which were read.
+
+    :param path: The path of the SQLite database. It is created if it does not exist.
+    :param paths: Paths of the files.
+    :param sizes: Sizes of the files from the crawl.
+    :param changes: Last changes of the files from the crawl, in nanoseconds.
+    :param workers: The number of processes which read the files in parallel.
+    :param chunksize: The number of paths which are sent to the pool in one task.
+    """
+    connection = sqlite3.connect(path)
+    with connection:
+        for statement in SCHEMA:
+            connection.execute(statement)
+        indexed = {row[0]: (row[1], row[2]) for row in connection.execute("SELECT path, size, changed FROM files")}
+
+    outdated = [(file_path, size, changed) for file_path, size, changed in zip(paths, sizes, changes)
+                if indexed.get(file_path) != (size, changed)]
+    outdated_paths = [file_path for file_path, _, _ in outdated]
+
+    with connection:
+        for (file_path, size, changed), trigrams in zip(outdated, map_in_pool(get_trigrams, outdated_paths,
+                                                                              workers, chunksize)):
+            connection.execute("DELETE FROM postings WHERE file_id = "
+                               "(SELECT id FROM files WHERE path = ?)", (file_path,))
+            connection.execute("DELETE FROM files WHERE path = ?", (file_path,))
+            # Files which cannot be read are not indexed, so they are read again next time.
+            if trigrams is None:
+                continue
+            file_id = connection.execute("INSERT INTO files (path, size, changed) VALUES (?, ?, ?)",
+                                         (file_path, size, changed)).lastrowid
+            connection.executemany("INSERT INTO postings VALUES (?, ?)",
+                                   ((trigram, file_id) for trigram in trigrams.tolist()))
+    connection.close()
+
+    return len(outdated)
+
+
+def query_content_index(path: str, text: str) -> set[str] | None:
+    """
+    Returns the paths of the indexed files which can contain the text, case-insensitive. Only these files have to be
+    opened to find the text. Returns None if the text has no trigram to look for, then every file can contain it.
+
+    :param path: The path of the SQLite database.
+    :param text: The searched text.
+    """
+    trigrams = get_text_trigrams(text)
+    if not trigrams:
+        return None
+
+    parameters = ", ".join("?" * len(trigrams))
+    query = (f"SELECT files.path FROM postings JOIN files ON files.id = postings.file_id "
+             f"WHERE postings.trigram IN ({parameters}) "
+             f"GROUP BY postings.file_id HAVING COUNT(*) = ?")
+    connection = sqlite3.connect(path)
+    with connection:
+        rows = connection.execute(query, (*trigrams, len(trigrams))).fetchall()
+    connection.close()
+
+    return {row[0] for row in rows}
+
+
+def get_trigrams(path: str) -> np.ndarray | None:
+    """
+    Returns the unique trigrams of the lowered content of the file, or None if the file cannot be read.
+    This function runs in the pool workers.
+
+    :param path: The path of the file.
+    """
+    trigrams = []
+    rest = b""
+    try:
+        with open(path, "rb") as file:
+            while block := file.read(BLOCK_SIZE):
+                # The last bytes of the previous block are kept, so no trigram is lost on the border of blocks.
+                data = rest + block.lower()
+                trigrams.append(np.unique(_pack_trigrams(data)))
+                rest = data[-(TRIGRAM_LENGTH - 1):]
+    except OSError:
+        return None
+
+    if not trigrams:
+        return np.array([], dtype=np.int64)
+    return np.unique(np.concatenate(trigrams))
+
+
+def get_text_trigrams(text: str) -> list[int]:
+    """
+    Returns the unique trigrams of the searched text. bytes.lower changes only ASCII letters, therefore only the
+    trigrams made of ASCII characters are the same in the lowered text and in the lowered content of a file.
+
+    :param text: The searched text.
+    """
+    ascii_parts = "".join(char if char.isascii() else "\n" for char in text.lower()).split("\n")
+    trigrams = set()
+    for part in ascii_parts:
+        trigrams.update(_pack_trigrams(part.encode("ascii")).tolist())
+    return sorted(trigrams)
+
+
+# endregion
+
+# region Private functions
+def _pack_trigrams(data: bytes) -> np.ndarray:
+    """
+    Packs every three consecutive bytes into one integer.
+
+    :param data: The bytes.
+    """
+    if len(data) < TRIGRAM_LENGTH:
+        return np.array([], dtype=np.int64)
+    values = np.frombuffer(data, dtype=np.uint8).astype(np.int64)
+    return (values[:-2] << 16) | (values[1:-1] << 8) | values[2:]
+
+# endregion
@@ -0,0 +1,122 @@
+import functools
+from multiprocessing import Pool
+from typing import Iterator
+
+from structures import FileOps
+
+# region Constants
+# Files are read in binary blocks of this size. Only the lines which contain the searched text are decoded.
+BLOCK_SIZE = 1024 * 1024
+LINE_SEPARATOR = b"\n"
+
+# Below this number of files, starting the pool takes longer than processing the files in the current process.
+MIN_FILES_FOR_POOL = 64
+
+
+# endregion
+
+# region Public functions
+def search_files(paths: list[str], text: str, workers: int = 1, chunksize: int = 32) -> Iterator[tuple]:
+    """
+    Searches the text in the files and yields a tuple (path, lines) for each file, in the same order as the paths.
+    The results are yielded as soon as they are found, so the first files can be printed while the others are still
+    being searched. Lines is None if the file is not readable with the encoding FileOps.ENCODING.
+
+    :param paths: Paths of the files that need to be searched.
+    :param text: Lines which contain this text, case-insensitive, are returned. An empty text returns all lines.
+    :param workers: The number of processes which search the files in parallel.
+    :param chunksize: The number of paths which are sent to the pool in one task.
+    """
+    yield from map_in_pool(functools.partial(search_file, text=text), paths, workers, chunksize)
+
+
+def map_in_pool(function, items: list, workers: int = 1, chunksize: int = 32) -> Iterator:
+    """
+    Maps the function over the items in a process pool and yields the results in the order of the items, as soon as
+    they are ready. With one worker, or with only a few items, the items are processed in the current process.
+
+    :param function: Module level function (or a partial of it), so that it can be sent to the pool.
+    :param items: The items that need to be processed.
+    :param workers: The number of processes.
+    :param chunksize: The number of items which are sent to the pool in one task.
+    """
+    if workers <= 1 or len(items) < MIN_FILES_FOR_POOL:
+        yield from map(function, items)
+        return
+
+    with Pool(workers) as pool:
+        yield from pool.imap(function, items, chunksize=chunksize)
+
+
+def search_file(path: str, text: str) -> tuple[str, list[str] | None]:
+    """
+    Returns the path and the stripped lines of the file which contain the text, case-insensitive. The lines are the
+    same as if the file was read line by line as text. This function runs in the pool workers.
+
+    :param path: The path of the file.
+    :param text: The searched text.
+    """
+    try:
+        if text.isascii() and "\n" not in text:
+            return path, _search_bytes(path, text.lower().encode(FileOps.ENCODING))
+        return path, _search_text(path, text.lower())
+    except UnicodeDecodeError:
+        return path, None
+
+
+# endregion
+
+# region Private functions
+def _search_bytes(path: str, needle: bytes) -> list[str]:
+    """
+    Reads the file in binary blocks and searches the needle in the lowered blocks. bytes.lower changes only ASCII
+    letters, so it cannot break multibyte characters and it is much faster than lowering every decoded line.
+
+    :param path: The path of the file.
+    :param needle: The lowered ASCII text that is searched.
+    """
+    lines = []
+    rest = b""
+    with open(path, "rb") as file:
+        while block := file.read(BLOCK_SIZE):
+            data = rest + block
+            end = data.rfind(LINE_SEPARATOR) + 1
+            # Only whole lines are searched, the last incomplete line waits for the next block.
+            rest = data[end:]
+            if end:
+                lines.extend(_find_lines(data[:end], needle))
+    if rest:
+        lines.extend(_find_lines(rest, needle))
+    return lines
+
+
+def _find_lines(data: bytes, needle: bytes) -> Iterator[str]:
+    """
+    Yields the decoded and stripped lines of the data which contain the needle.
+
+    :param data: Whole lines of a file.
+    :param needle: The lowered ASCII text that is searched.
+    """
+    lowered = data.lower()
+    position = lowered.find(needle)
+    while position != -1:
+        start = data.rfind(LINE_SEPARATOR, 0, position) + 1
+        end = data.find(LINE_SEPARATOR, position)
+        end = len(data) if end == -1 else end
+        yield data[start:end].decode(FileOps.ENCODING).strip()
+        # The next match is searched after the end of this line, so every line is returned only once.
+        position = lowered.find(needle, end + 1) if end + 1 < len(data) else -1
+
+
+def _search_text(path: str, text: str) -> list[str]:
+    """
+    Searches the lowered text line by line. This is used only for texts which are not ASCII, because the lowering
+    of such texts may change their length in bytes.
+
+    :param path: The path of the file.
+    :param text: The lowered text that is searched.
+    """
+    with open(path, FileOps.READ_MODE, encoding=FileOps.ENCODING) as file:
+        return [line.strip() for line in file if text in line.lower()]
+
+# endregion
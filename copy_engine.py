@@ -0,0 +1,83 @@
+import os
+import shutil
+
+from concurrent.futures import ThreadPoolExecutor
+from structures import CopyStatus
+
+# region Constants
+# Copying waits mostly on the disks, not on Python, so threads are enough to keep several copies in flight.
+COPY_WORKERS = 8
+
+
+# endregion
+
+# region Public functions
+def copy_files(sources: list[str], targets: list[str], workers: int = COPY_WORKERS) -> list[str]:
+    """
+    Copies the files concurrently in a thread pool and returns the CopyStatus of each file, in the order of sources.
+    Missing folders of the targets are created. Targets which already have the same size and last change as their
+    sources are skipped.
+
+    :param sources: Paths of the files that need to be copied.
+    :param targets: Paths where the files are copied to.
+    :param workers: The number of threads which copy the files.
+    """
+    if workers <= 1:
+        return list(map(copy_file, sources, targets))
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(copy_file, sources, targets))
+
+
+def copy_file(source: str, target: str) -> str:
+    """
+    Copies the file together with its last change and returns the CopyStatus. shutil uses a copy inside the kernel
+    where the system provides one (sendfile on Linux, fcopyfile on macOS), so the data do not pass through Python.
+
+    :param source: The path of the file that needs to be copied.
+    :param target: The path where the file is copied to.
+    """
+    try:
+        if is_same_file(source, target):
+            return CopyStatus.SKIPPED
+        os.makedirs(os.path.dirname(target) or os.curdir, exist_ok=True)
+        shutil.copy2(source, target)
+    except OSError:
+        return CopyStatus.FAILED
+    return CopyStatus.COPIED
+
+
+def is_same_file(source: str, target: str) -> bool:
+    """
+    Returns True if the target exists and has the same size and last change as the source.
+
+    :param source: The path of the source file.
+    :param target: The path of the target file.
+    """
+    try:
+        target_stat = os.stat(target)
+    except OSError:
+        return False
+    source_stat = os.stat(source)
+    return target_stat.st_size == source_stat.st_size and target_stat.st_mtime_ns == source_stat.st_mtime_ns
+
+
+def remove_other_files(root: str, kept: set[str]) -> int:
+    """
+    Removes the files below the root which are not in the kept paths, and the folders which become empty.
+    Returns the number of removed files.
+
+    :param root: The folder that needs to be cleaned.
+    :param kept: Normalized paths of the files which stay.
+    """
+    removed = 0
+    for folder, subfolders, file_names in os.walk(root, topdown=False):
+        for file_name in file_names:
+            path = os.path.normpath(os.path.join(folder, file_name))
+            if path not in kept:
+                os.remove(path)
+                removed += 1
+        if folder != root and not os.listdir(folder):
+            os.rmdir(folder)
+    return removed
+
+# endregion
@@ -0,0 +1,177 @@
+import datetime
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+
+from structures import ItemType, ColumnNames as CN
+
+# region Constants
+# The index is a SQLite database with one row per crawled file or folder. Sizes, last changes, extensions and parent
+# folders are indexed, so the filters can be run as queries which read only the matching rows.
+TABLE = "items"
+SCHEMA = f"""
+CREATE TABLE {TABLE} (
+    path TEXT NOT NULL,
+    path_lower TEXT NOT NULL,
+    item_type TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    changed INTEGER NOT NULL,
+    file_count INTEGER,
+    newest_change INTEGER
+)
+"""
+INDEXES = (
+    f"CREATE INDEX idx_{TABLE}_size ON {TABLE} (item_type, size)",
+    f"CREATE INDEX idx_{TABLE}_changed ON {TABLE} (item_type, changed)",
+    f"CREATE INDEX idx_{TABLE}_extension ON {TABLE} (item_type, extension)",
+    f"CREATE INDEX idx_{TABLE}_parent ON {TABLE} (parent)",
+)
+SIGNS = {">=": ">=", "<=": "<="}
+
+# Last changes are stored as nanoseconds, the same as datetime64[ns] in the dataframes. NaT is the minimum.
+MIN_NANOSECONDS = np.iinfo(np.int64).min
+MAX_NANOSECONDS = np.iinfo(np.int64).max
+
+
+# endregion
+
+# region Public functions
+def build_crawl_index(path: str, files: pd.DataFrame, folders: pd.DataFrame) -> None:
+    """
+    Builds the index from the crawled files and folders. An existing index at the path is replaced.
+
+    :param path: The path of the SQLite database.
+    :param files: The dataframe with the crawled files. Sizes must be int64 and last changes datetime64.
+    :param folders: The dataframe with the crawled folders, optionally with the totals of their files.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+
+    with _connect(path) as connection:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute(SCHEMA)
+        for item_type, container in ((ItemType.FILES, files), (ItemType.FOLDERS, folders)):
+            connection.executemany(f"INSERT INTO {TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                   _get_rows(container, item_type))
+        for index in INDEXES:
+            connection.execute(index)
+    connection.close()
+
+
+def query_crawl_index(path: str, item_type: str, filter_path: str = "",
+                      filter_size: int = 0, filter_size_sign: str = ">=",
+                      filter_date: datetime.datetime | str = datetime.datetime.min, filter_date_sign: str = ">=",
+                      extension: str = None, parent: str = None) -> pd.DataFrame:
+    """
+    Returns only the rows of the index which pass the filters, in the same columns and types as the crawled
+    dataframes. The filters work the same as the filters of the FolderCrawler.
+
+    :param path: The path of the SQLite database.
+    :param item_type: ItemType.FILES or ItemType.FOLDERS.
+    :param filter_path: Only paths which contain this string, case-insensitive, will pass.
+    :param filter_size: The size that is used together with filter_size_sign.
+    :param filter_size_sign: A string value ">=" or "<=".
+    :param filter_date: The last change that is used together with filter_date_sign.
+    :param filter_date_sign: A string value ">=" or "<=".
+    :param extension: If provided, only items with this extension (for example ".txt") will pass.
+    :param parent: If provided, only items directly inside this folder will pass.
+    """
+    conditions = ["item_type = ?", f"size {SIGNS[filter_size_sign]} ?", f"changed {SIGNS[filter_date_sign]} ?"]
+    parameters = [item_type, int(filter_size), _get_nanoseconds(filter_date)]
+    if filter_path:
+        conditions.append("instr(path_lower, ?) > 0")
+        parameters.append(filter_path.lower())
+    if extension is not None:
+        conditions.append("extension = ?")
+        parameters.append(extension.lower())
+    if parent is not None:
+        conditions.append("parent = ?")
+        parameters.append(parent)
+
+    query = (f"SELECT path, changed, size, file_count, newest_change FROM {TABLE} "
+             f"WHERE {' AND '.join(conditions)} ORDER BY rowid")
+    with _connect(path) as connection:
+        rows = connection.execute(query, parameters).fetchall()
+    connection.close()
+
+    return _get_dataframe(rows, item_type)
+
+
+# endregion
+
+# region Private functions
+def _connect(path: str) -> sqlite3.Connection:
+    """
+    Opens the SQLite database.
+
+    :param path: The path of the SQLite database.
+    """
+    return sqlite3.connect(path)
+
+
+def _get_rows(container: pd.DataFrame, item_type: str):
+    """
+    Converts the dataframe into rows of the index table.
+
+    :param container: The dataframe with the crawled items.
+    :param item_type: The type of the items in the dataframe.
+    """
+    if container.empty:
+        return []
+
+    paths = container[CN.PATH]
+    parents = paths.str.rpartition(os.sep)[0]
+    extensions = [os.path.splitext(path)[1].lower() for path in paths]
+    changes = container[CN.CHANGED].to_numpy(dtype="datetime64[ns]").view(np.int64).tolist()
+    sizes = container[CN.SIZE_BYTES].astype(np.int64).tolist()
+
+    file_counts = newest_changes = [None] * len(container)
+    if CN.FILE_COUNT in container:
+        file_counts = container[CN.FILE_COUNT].astype(np.int64).tolist()
+        newest_changes = container[CN.NEWEST_CHANGE].to_numpy(dtype="datetime64[ns]").view(np.int64).tolist()
+
+    return zip(paths, paths.str.lower(), [item_type] * len(container), parents, extensions,
+               sizes, changes, file_counts, newest_changes)
+
+
+def _get_dataframe(rows: list[tuple], item_type: str) -> pd.DataFrame:
+    """
+    Converts the rows returned by the index into a dataframe with the columns of crawled data.
+
+    :param rows: Rows with path, last change, size, number of files and newest change.
+    :param item_type: The type of the items in the rows.
+    """
+    paths, changes, sizes, file_counts, newest_changes = (list(column) for column in zip(*rows)) if rows \
+        else ([], [], [], [], [])
+
+    container = pd.DataFrame({
+        CN.PATH: pd.Series(paths, dtype=object),
+        CN.CHANGED: pd.Series(np.array(changes, dtype=np.int64).view("datetime64[ns]")),
+        CN.SIZE_BYTES: pd.Series(sizes, dtype=np.int64),
+    })
+    if item_type == ItemType.FOLDERS and rows and file_counts[0] is not None:
+        container[CN.FILE_COUNT] = pd.Series(file_counts, dtype=np.int64)
+        container[CN.NEWEST_CHANGE] = np.array(newest_changes, dtype=np.int64).view("datetime64[ns]")
+    return container
+
+
+def _get_nanoseconds(date: datetime.datetime | str) -> int:
+    """
+    Converts the date into nanoseconds since the epoch. Dates outside of the range of datetime64[ns] are clamped,
+    so that for example datetime.min still lets every item pass.
+
+    :param date: The date, or a string which is parsed the same way as by the filters of dataframes, so also
+    partial dates like "2023" or "2023-05" are accepted.
+    """
+    date = pd.Timestamp(date)
+    if date < pd.Timestamp.min:
+        return MIN_NANOSECONDS
+    if date > pd.Timestamp.max:
+        return MAX_NANOSECONDS
+    return date.as_unit("ns").value
+
+# endregion
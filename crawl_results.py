@@ -0,0 +1,170 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from path_tree import PathTree
+from traversal import scan_tree_totals
+from structures import ColumnNames as CN
+
+# region Constants
+NONE = np.nan
+
+MICROSECONDS = 1_000_000
+NANOSECONDS_PER_SECOND = 1_000_000_000
+NANOSECONDS_PER_MICROSECOND = 1_000
+# The offset of the local time zone is looked up once per hour. Only the hours in which the offset changes are looked
+# up second by second.
+OFFSET_PERIOD = 3600
+
+
+# endregion
+
+class CrawlResults:
+    """
+    The CrawlResults class collects the crawled items of one root column by column. The dataframes of files and
+    folders are then built from typed arrays with one constructor call each, without any Python object per row.
+
+    The paths are kept in a PathTree as the id of their directory and their own name, so the directories shared by
+    many items are stored only once. The full paths are rebuilt only for the rows of the returned dataframes.
+    """
+
+    def __init__(self):
+        self.tree = PathTree()
+        self.directory_ids: list[np.ndarray] = []
+        self.names: list[np.ndarray] = []
+        self.is_folder: list[bool] = []
+        self.sizes: list[int | float] = []
+        self.changes: list[float] = []
+        self.folder_totals: dict[str, tuple[int | float, int, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.is_folder)
+
+    def add_records(self, records: list[tuple], folder_totals: dict[str, tuple] = None) -> None:
+        """
+        Adds the records of the crawled items to the columns.
+
+        :param records: Records of the traversal engine: path, is folder, size and last change.
+        :param folder_totals: Size, number of files and newest last change of files of the crawled folders. The size
+        of a folder is replaced by its total size.
+        """
+        if records:
+            paths, is_folder, sizes, changes = zip(*records)
+            directory_ids, names = self.tree.encode(paths)
+            self.directory_ids.append(directory_ids)
+            self.names.append(names)
+            self.is_folder.extend(is_folder)
+            self.sizes.extend(sizes)
+            self.changes.extend(changes)
+        if folder_totals:
+            self.folder_totals.update(folder_totals)
+
+    def get_folder_totals(self) -> dict[str, tuple[int | float, int, float]]:
+        """
+        Returns the total size, the number of files and the newest last change of files of every crawled folder,
+        rolled up from the crawled files along the directory tree. The values are the same as those of
+        aggregate_folder_totals, so all sub-folders must have been crawled. Only symbolic links to folders, which were
+        not entered, are walked.
+        """
+        directory_ids, names = self._get_column(self.directory_ids, np.int64), self._get_column(self.names, object)
+        is_folder = np.fromiter(self.is_folder, dtype=bool, count=len(self))
+        files = directory_ids[~is_folder]
+        sizes = self.tree.aggregate(files, np.array(self.sizes, dtype=np.float64)[~is_folder])
+        file_counts = self.tree.aggregate(files, np.ones(len(files)))
+        newest_changes = self.tree.aggregate(files, np.array(self.changes, dtype=np.float64)[~is_folder], np.fmax,
+                                             NONE)
+
+        folder_totals = {}
+        for folder in self.tree.get_paths(directory_ids[is_folder], names[is_folder]).tolist():
+            directory_id = self.tree.find_directory(folder)
+            if os.path.islink(folder):
+                # The content of a link is not inside its parent folders, so only the link itself gets its totals.
+                folder_totals[folder] = scan_tree_totals(folder)
+            elif directory_id is None:
+                # No item was crawled inside the folder.
+                folder_totals[folder] = (0, 0, NONE)
+            else:
+                folder_totals[folder] = (sizes[directory_id], int(file_counts[directory_id]),
+                                         newest_changes[directory_id])
+        return folder_totals
+
+    def get_items(self, is_folder: bool) -> pd.DataFrame:
+        """
+        Returns the dataframe of the crawled files or folders. Folders have also the columns with the totals of the
+        files inside them. Sizes stay float if any of them is missing, last changes are datetime64.
+
+        :param is_folder: A boolean value that determines whether the folders or the files are returned.
+        """
+        selected = np.fromiter(self.is_folder, dtype=bool, count=len(self)) == is_folder
+        paths = self.tree.get_paths(self._get_column(self.directory_ids, np.int64)[selected],
+                                    self._get_column(self.names, object)[selected])
+        sizes = np.array(self.sizes, dtype=np.float64)[selected]
+        columns = {CN.PATH: paths,
+                   CN.CHANGED: get_local_datetimes(np.array(self.changes, dtype=np.float64)[selected]),
+                   CN.SIZE_BYTES: sizes}
+        if is_folder:
+            # Folders without totals keep their own size and have no files.
+            totals = np.array([self.folder_totals.get(path, (size, 0, NONE)) for path, size in zip(paths, sizes)],
+                              dtype=np.float64).reshape(-1, 3)
+            columns[CN.SIZE_BYTES] = totals[:, 0]
+            columns[CN.FILE_COUNT] = totals[:, 1].astype(np.int64)
+            columns[CN.NEWEST_CHANGE] = get_local_datetimes(totals[:, 2])
+
+        if not np.isnan(columns[CN.SIZE_BYTES]).any():
+            columns[CN.SIZE_BYTES] = columns[CN.SIZE_BYTES].astype(np.int64)
+        return pd.DataFrame(columns)
+
+    @staticmethod
+    def _get_column(chunks: list[np.ndarray], dtype: type) -> np.ndarray:
+        """
+        Joins the chunks of one encoded column, as they were added by add_records.
+
+        :param chunks: The arrays of the column, one per call of add_records.
+        :param dtype: The type of the column.
+        """
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+
+# region Public functions
+def get_local_datetimes(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Converts POSIX timestamps into naive datetime64 values in the local time, the same as datetime.fromtimestamp
+    does for every single timestamp: rounded half to even to microseconds. Missing timestamps become NaT.
+
+    :param timestamps: Float array of POSIX timestamps, missing ones are NONE.
+    """
+    is_missing = np.isnan(timestamps)
+    fractions, seconds = np.modf(np.where(is_missing, 0.0, timestamps))
+    microseconds = np.round(fractions * MICROSECONDS).astype(np.int64)
+    seconds = seconds.astype(np.int64)
+    # Fractions of negative timestamps are negative, and rounding can reach a whole second.
+    seconds += np.floor_divide(microseconds, MICROSECONDS)
+    microseconds %= MICROSECONDS
+
+    periods, inverse = np.unique(np.floor_divide(seconds, OFFSET_PERIOD), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    first_offsets = _get_local_offsets(periods * OFFSET_PERIOD)
+    last_offsets = _get_local_offsets(periods * OFFSET_PERIOD + OFFSET_PERIOD - 1)
+    offsets = first_offsets[inverse]
+    is_changing = (first_offsets != last_offsets)[inverse]
+    offsets[is_changing] = _get_local_offsets(seconds[is_changing])
+
+    nanoseconds = (seconds + offsets) * NANOSECONDS_PER_SECOND + microseconds * NANOSECONDS_PER_MICROSECOND
+    datetimes = nanoseconds.view("datetime64[ns]")
+    datetimes[is_missing] = np.datetime64("NaT")
+    return datetimes
+
+
+# endregion
+
+# region Private functions
+def _get_local_offsets(seconds: np.ndarray) -> np.ndarray:
+    """
+    Returns the offsets of the local time zone from UTC in seconds at the given POSIX timestamps.
+
+    :param seconds: Integer array of POSIX timestamps.
+    """
+    return np.array([time.localtime(second).tm_gmtoff for second in seconds.tolist()], dtype=np.int64)
+
+# endregion
@@ -0,0 +1,247 @@
+import os
+import numpy as np
+import pandas as pd
+
+from typing import Iterator
+from content_search import map_in_pool
+from duplicates import hash_file
+from folder_digests import get_changed_folders, get_parent_folders
+from snapshots import save_snapshot, iter_snapshot, read_snapshot_schema
+from structures import DiffStatus, ColumnNames as CN
+
+# region Constants
+# Columns of the older side of the comparison.
+PREVIOUS_COLUMNS = {CN.PATH: CN.PREVIOUS_PATH, CN.CHANGED: CN.PREVIOUS_CHANGE, CN.SIZE_BYTES: CN.PREVIOUS_SIZE}
+DIFF_COLUMN_NAMES = [CN.STATUS, CN.RELATIVE_PATH, CN.PREVIOUS_RELATIVE_PATH,
+                     CN.PATH, CN.CHANGED, CN.SIZE_BYTES,
+                     CN.PREVIOUS_PATH, CN.PREVIOUS_CHANGE, CN.PREVIOUS_SIZE]
+SNAPSHOT_COLUMN_NAMES = [CN.RELATIVE_PATH, CN.PATH, CN.CHANGED, CN.SIZE_BYTES]
+MERGE_INDICATOR = "_merge"
+MOVE_RANK = "_move_rank"
+
+
+# endregion
+
+# region Public functions
+def diff_crawls(previous: pd.DataFrame, current: pd.DataFrame, previous_root: str, current_root: str,
+                compare_hashes: bool = False, workers: int = 1, chunksize: int = 32,
+                previous_digests: pd.DataFrame = None, current_digests: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Compares two crawls of files by the paths relative to their roots and returns one row for each difference:
+
+    - added: the relative path is only in the current crawl,
+    - removed: the relative path is only in the previous crawl,
+    - modified: the relative path is in both crawls, but the size or the last change differs,
+    - moved: a removed and an added file have the same size and last change (and the same content, if
+      compare_hashes is True). They are reported once, as a move from the previous relative path.
+
+    :param previous: The dataframe with the files of the previous (or the first) crawl.
+    :param current: The dataframe with the files of the current (or the second) crawl.
+    :param previous_root: The crawled root of the previous crawl.
+    :param current_root: The crawled root of the current crawl.
+    :param compare_hashes: A boolean value that determines whether the moved files must have the same content hash.
+    :param workers: The number of processes which hash the files in parallel.
+    :param chunksize: The number of paths which are sent to the pool in one task.
+    :param previous_digests: The digests of the folders of the previous crawl, as returned by get_folder_digests.
+    If both digests are provided, only the files in the folders whose digests differ are compared.
+    :param current_digests: The digests of the folders of the current crawl, as returned by get_folder_digests.
+    """
+    previous = previous[[CN.PATH, CN.CHANGED, CN.SIZE_BYTES]].rename(columns=PREVIOUS_COLUMNS)
+    previous[CN.RELATIVE_PATH] = get_relative_paths(previous[CN.PREVIOUS_PATH], previous_root)
+    current = current[[CN.PATH, CN.CHANGED, CN.SIZE_BYTES]].copy()
+    current[CN.RELATIVE_PATH] = get_relative_paths(current[CN.PATH], current_root)
+
+    if previous_digests is not None and current_digests is not None:
+        # A changed file changes the digest of its folder, so files in the folders with the same digests are skipped.
+        changed_folders = get_changed_folders(previous_digests, current_digests)
+        previous = previous[get_parent_folders(previous[CN.RELATIVE_PATH]).isin(changed_folders)]
+        current = current[get_parent_folders(current[CN.RELATIVE_PATH]).isin(changed_folders)]
+
+    added, removed, modified = _merge_join(previous, current)
+    differences = _get_differences(added, removed, modified, compare_hashes, workers, chunksize)
+    return differences.sort_values(CN.RELATIVE_PATH, kind="stable").reset_index(drop=True)
+
+
+def iter_snapshot_differences(previous_path: str, current_path: str, compare_hashes: bool = False,
+                              workers: int = 1, chunksize: int = 32) -> Iterator[pd.DataFrame]:
+    """
+    Compares two snapshots sorted by relative paths, as written by save_sorted_snapshot, and yields the differences
+    in the same form as diff_crawls. Both snapshots are read one row group after another and merge-joined, so only
+    about one row group of each snapshot is in the memory at a time. Modified files are yielded as soon as they are
+    found. Added and removed files are yielded at the end, because the moves are paired among all of them.
+
+    :param previous_path: The path of the snapshot of the previous (or the first) crawl.
+    :param current_path: The path of the snapshot of the current (or the second) crawl.
+    :param compare_hashes: A boolean value that determines whether the moved files must have the same content hash.
+    :param workers: The number of processes which hash the files in parallel.
+    :param chunksize: The number of paths which are sent to the pool in one task.
+    """
+    for path in (previous_path, current_path):
+        if read_snapshot_schema(path)["metadata"].get("sorted_by") != CN.RELATIVE_PATH:
+            raise ValueError(f"Snapshot '{path}' is not sorted by relative paths.")
+
+    previous_groups = (group.rename(columns=PREVIOUS_COLUMNS)
+                       for group in iter_snapshot(previous_path, SNAPSHOT_COLUMN_NAMES))
+    current_groups = iter_snapshot(current_path, SNAPSHOT_COLUMN_NAMES)
+    previous, previous_is_last = _get_next_group(previous_groups, None)
+    current, current_is_last = _get_next_group(current_groups, None)
+
+    all_added = []
+    all_removed = []
+    while not previous.empty or not current.empty:
+        # Rows up to the smaller of the last loaded relative paths can be joined now. The later rows of the other
+        # side may still have their pairs in the next row group of this side.
+        bounds = [group[CN.RELATIVE_PATH].iat[-1] for group, is_last in
+                  ((previous, previous_is_last), (current, current_is_last)) if not is_last]
+        bound = min(bounds) if bounds else None
+        previous_end = _get_end_of_rows_up_to(previous, bound)
+        current_end = _get_end_of_rows_up_to(current, bound)
+
+        added, removed, modified = _merge_join(previous.iloc[:previous_end], current.iloc[:current_end])
+        all_added.append(added)
+        all_removed.append(removed)
+        if not modified.empty:
+            yield _get_differences(added.iloc[:0], removed.iloc[:0], modified, False, workers, chunksize)
+
+        previous = previous.iloc[previous_end:]
+        current = current.iloc[current_end:]
+        if previous.empty and not previous_is_last:
+            previous, previous_is_last = _get_next_group(previous_groups, previous)
+        if current.empty and not current_is_last:
+            current, current_is_last = _get_next_group(current_groups, current)
+
+    added = pd.concat(all_added, ignore_index=True)
+    removed = pd.concat(all_removed, ignore_index=True)
+    yield _get_differences(added, removed, added.iloc[:0], compare_hashes, workers, chunksize)
+
+
+def save_sorted_snapshot(path: str, files: pd.DataFrame, root: str) -> None:
+    """
+    Saves the files sorted by their paths relative to the root, so that the snapshot can be compared with
+    iter_snapshot_differences.
+
+    :param path: The path of the snapshot.
+    :param files: The dataframe with the crawled files.
+    :param root: The crawled root.
+    """
+    files = files[[CN.PATH, CN.CHANGED, CN.SIZE_BYTES]].copy()
+    files.insert(0, CN.RELATIVE_PATH, get_relative_paths(files[CN.PATH], root))
+    files = files.sort_values(CN.RELATIVE_PATH, kind="stable").reset_index(drop=True)
+    save_snapshot(path, files, {"root": root, "sorted_by": CN.RELATIVE_PATH},
+                  path_columns=[CN.RELATIVE_PATH, CN.PATH])
+
+
+def get_relative_paths(paths: pd.Series, root: str) -> pd.Series:
+    """
+    Returns the paths relative to the root. The root is cut off from all paths at once, without a loop in Python.
+    Paths which are not inside the root are returned unchanged.
+
+    :param paths: The paths of crawled items.
+    :param root: The crawled root.
+    """
+    prefix = root if root.endswith(os.sep) else root + os.sep
+    return paths.where(~paths.str.startswith(prefix), paths.str.slice(len(prefix)))
+
+
+# endregion
+
+# region Private functions
+def _merge_join(previous: pd.DataFrame, current: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Joins the files of both crawls on their relative paths and returns the added, removed and modified files.
+
+    :param previous: Files of the previous crawl with the columns PREVIOUS_COLUMNS and the relative path.
+    :param current: Files of the current crawl with the relative path.
+    """
+    merged = previous.merge(current, on=CN.RELATIVE_PATH, how="outer", indicator=MERGE_INDICATOR, sort=False)
+    both = merged[merged[MERGE_INDICATOR] == "both"]
+    modified = both[(both[CN.SIZE_BYTES] != both[CN.PREVIOUS_SIZE]) | (both[CN.CHANGED] != both[CN.PREVIOUS_CHANGE])]
+    removed = merged[merged[MERGE_INDICATOR] == "left_only"]
+    added = merged[merged[MERGE_INDICATOR] == "right_only"]
+    return added, removed, modified
+
+
+def _get_differences(added: pd.DataFrame, removed: pd.DataFrame, modified: pd.DataFrame, compare_hashes: bool,
+                     workers: int, chunksize: int) -> pd.DataFrame:
+    """
+    Pairs the moved files among the added and removed files and returns all differences with their statuses.
+
+    :param added: Rows of the joined crawls which are only in the current crawl.
+    :param removed: Rows of the joined crawls which are only in the previous crawl.
+    :param modified: Rows of the joined crawls which differ in size or last change.
+    :param compare_hashes: A boolean value that determines whether the moved files must have the same content hash.
+    :param workers: The number of processes which hash the files in parallel.
+    :param chunksize: The number of paths which are sent to the pool in one task.
+    """
+    moved = _pair_moves(removed, added, compare_hashes, workers, chunksize)
+    removed = removed[~removed[CN.RELATIVE_PATH].isin(moved[CN.PREVIOUS_RELATIVE_PATH])]
+    added = added[~added[CN.RELATIVE_PATH].isin(moved[CN.RELATIVE_PATH])]
+
+    differences = pd.concat([added.assign(**{CN.STATUS: DiffStatus.ADDED}),
+                             removed.assign(**{CN.STATUS: DiffStatus.REMOVED}),
+                             modified.assign(**{CN.STATUS: DiffStatus.MODIFIED}),
+                             moved.assign(**{CN.STATUS: DiffStatus.MOVED})], ignore_index=True)
+    differences[CN.PREVIOUS_RELATIVE_PATH] = differences[CN.PREVIOUS_RELATIVE_PATH].fillna("")
+    differences[[CN.PATH, CN.PREVIOUS_PATH]] = differences[[CN.PATH, CN.PREVIOUS_PATH]].fillna("")
+    return differences[DIFF_COLUMN_NAMES]
+
+
+def _get_next_group(groups: Iterator[pd.DataFrame], last_group: pd.DataFrame | None) -> tuple[pd.DataFrame, bool]:
+    """
+    Returns the next row group with rows and False, or an empty dataframe and True if there are no more rows.
+
+    :param groups: Row groups of a snapshot.
+    :param last_group: The last returned row group. Its columns are used for the empty dataframe.
+    """
+    for group in groups:
+        last_group = group
+        if not group.empty:
+            return group, False
+    return last_group.iloc[:0], True
+
+
+def _get_end_of_rows_up_to(group: pd.DataFrame, bound: str | None) -> int:
+    """
+    Returns the number of rows of the row group whose relative paths are not greater than the bound.
+
+    :param group: Row group sorted by relative paths.
+    :param bound: The greatest relative path, or None for all rows.
+    """
+    if bound is None:
+        return len(group)
+    return int(np.searchsorted(group[CN.RELATIVE_PATH].to_numpy(dtype=object), bound, side="right"))
+
+
+def _pair_moves(removed: pd.DataFrame, added: pd.DataFrame, compare_hashes: bool, workers: int,
+                chunksize: int) -> pd.DataFrame:
+    """
+    Pairs the removed files with the added files which have the same size and last change. If more files have the same
+    size and last change, they are paired in the order of their relative paths.
+
+    :param removed: Rows of the merged crawls which are only in the previous crawl.
+    :param added: Rows of the merged crawls which are only in the current crawl.
+    :param compare_hashes: A boolean value that determines whether the paired files must have the same content hash.
+    :param workers: The number of processes which hash the files in parallel.
+    :param chunksize: The number of paths which are sent to the pool in one task.
+    """
+    previous_keys = [CN.PREVIOUS_SIZE, CN.PREVIOUS_CHANGE]
+    current_keys = [CN.SIZE_BYTES, CN.CHANGED]
+
+    removed = removed[[CN.RELATIVE_PATH] + list(PREVIOUS_COLUMNS.values())].sort_values(CN.RELATIVE_PATH)
+    removed = removed.rename(columns={CN.RELATIVE_PATH: CN.PREVIOUS_RELATIVE_PATH})
+    removed[MOVE_RANK] = removed.groupby(previous_keys).cumcount()
+    added = added[[CN.RELATIVE_PATH, CN.PATH, CN.CHANGED, CN.SIZE_BYTES]].sort_values(CN.RELATIVE_PATH)
+    added[MOVE_RANK] = added.groupby(current_keys).cumcount()
+
+    moved = removed.merge(added, left_on=previous_keys + [MOVE_RANK], right_on=current_keys + [MOVE_RANK])
+    if compare_hashes and not moved.empty:
+        sizes = moved[CN.SIZE_BYTES].astype(np.int64).tolist()
+        previous_hashes = list(map_in_pool(hash_file, list(zip(moved[CN.PREVIOUS_PATH], sizes)), workers, chunksize))
+        current_hashes = list(map_in_pool(hash_file, list(zip(moved[CN.PATH], sizes)), workers, chunksize))
+        is_same = [previous_hash is not None and previous_hash == current_hash
+                   for previous_hash, current_hash in zip(previous_hashes, current_hashes)]
+        moved = moved[is_same]
+
+    return moved.drop(columns=MOVE_RANK)
+
+# endregion
@@ -0,0 +1,205 @@
+import hashlib
+import sqlite3
+import numpy as np
+import pandas as pd
+
+from content_search import map_in_pool
+from structures import ColumnNames as CN
+
+# region Constants
+# Only this many bytes from the beginning and from the end of a file are hashed in the first round. Files which are
+# not longer than two such parts are hashed completely already in the first round.
+PARTIAL_SIZE = 4 * 1024
+HASH_BLOCK_SIZE = 1024 * 1024
+HASH_DIGEST_SIZE = 16
+
+PARTIAL = "partial"
+FULL = "full"
+DIGEST_COLUMN = "_digest"
+
+# Number of paths which are looked up in the cache in one query. SQLite limits the number of query parameters.
+CACHE_QUERY_SIZE = 500
+
+CACHE_SCHEMA = ("CREATE TABLE IF NOT EXISTS hashes ("
+                "path TEXT NOT NULL, kind TEXT NOT NULL, size INTEGER NOT NULL, changed INTEGER NOT NULL, "
+                "digest TEXT NOT NULL, PRIMARY KEY (path, kind)) WITHOUT ROWID")
+
+
+# endregion
+
+# region Public functions
+def find_duplicates(files: pd.DataFrame, cache_path: str = None, workers: int = 1,
+                    chunksize: int = 32) -> pd.DataFrame:
+    """
+    Returns the files which have the same content as at least one other file. The files are first grouped by their
+    sizes, so files with a unique size are never opened. Files with the same size are compared by the hash of their
+    first and last bytes, and only the files which still match are hashed completely. Empty files are ignored.
+
+    The returned dataframe has the columns of the files plus the column with the number of the duplicate group.
+    Files in one group have the same content. The groups are sorted from the largest files.
+
+    :param files: The dataframe with the crawled files. Sizes must be int64 and last changes datetime64.
+    :param cache_path: The path of the SQLite database where the hashes are cached per path, size and last change.
+    If None, nothing is cached.
+    :param workers: The number of processes which hash the files in parallel.
+    :param chunksize: The number of paths which are sent to the pool in one task.
+    """
+    candidates = files[(files[CN.SIZE_BYTES] > 0) & files[CN.SIZE_BYTES].duplicated(keep=False)]
+
+    connection = _connect_cache(cache_path)
+    digests = _get_digests(candidates, PARTIAL, connection, workers, chunksize)
+    candidates = _keep_same_digests(candidates, digests)
+
+    # Files which fit into the partial hash completely were already compared by their whole content.
+    is_whole = candidates[CN.SIZE_BYTES] <= 2 * PARTIAL_SIZE
+    digests = pd.concat([candidates.loc[is_whole, DIGEST_COLUMN],
+                         _get_digests(candidates[~is_whole], FULL, connection, workers, chunksize)])
+    candidates = _keep_same_digests(candidates, digests)
+    if connection is not None:
+        connection.close()
+
+    candidates = candidates.sort_values([CN.SIZE_BYTES, DIGEST_COLUMN, CN.PATH], ascending=[False, True, True])
+    groups = candidates.groupby([CN.SIZE_BYTES, DIGEST_COLUMN], sort=False).ngroup().astype(np.int64)
+    return candidates.assign(**{CN.DUPLICATE_GROUP: groups}).drop(columns=DIGEST_COLUMN).reset_index(drop=True)
+
+
+def get_reclaimable_size(duplicates: pd.DataFrame) -> int:
+    """
+    Returns the number of bytes which would be freed if only one file from each duplicate group was kept.
+
+    :param duplicates: The dataframe returned by find_duplicates.
+    """
+    group_sizes = duplicates.groupby(CN.DUPLICATE_GROUP)[CN.SIZE_BYTES]
+    return int((group_sizes.sum() - group_sizes.first()).sum())
+
+
+def hash_file_partially(path_and_size: tuple[str, int]) -> str | None:
+    """
+    Returns the hash of the first and the last PARTIAL_SIZE bytes of the file, or of the whole file if it is not
+    longer than that. Returns None if the file cannot be read. This function runs in the pool workers.
+
+    :param path_and_size: The path of the file and its size from the crawl.
+    """
+    path, size = path_and_size
+    hasher = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+    try:
+        with open(path, "rb") as file:
+            hasher.update(file.read(PARTIAL_SIZE))
+            if size > PARTIAL_SIZE:
+                file.seek(max(PARTIAL_SIZE, size - PARTIAL_SIZE))
+                hasher.update(file.read(PARTIAL_SIZE))
+    except OSError:
+        return None
+    return hasher.hexdigest()
+
+
+def hash_file(path_and_size: tuple[str, int]) -> str | None:
+    """
+    Returns the hash of the whole content of the file, or None if the file cannot be read.
+    This function runs in the pool workers.
+
+    :param path_and_size: The path of the file and its size from the crawl.
+    """
+    path, _ = path_and_size
+    hasher = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+    try:
+        with open(path, "rb") as file:
+            while block := file.read(HASH_BLOCK_SIZE):
+                hasher.update(block)
+    except OSError:
+        return None
+    return hasher.hexdigest()
+
+
+HASH_FUNCTIONS = {PARTIAL: hash_file_partially, FULL: hash_file}
+
+
+# endregion
+
+# region Private functions
+def _keep_same_digests(candidates: pd.DataFrame, digests: pd.Series) -> pd.DataFrame:
+    """
+    Sets the digests to the candidates and keeps only the candidates which have the same size and digest as at least
+    one other candidate.
+
+    :param candidates: The files which were hashed.
+    :param digests: The digests indexed the same as the candidates. Files which could not be read are missing.
+    """
+    candidates = candidates.loc[digests.index].assign(**{DIGEST_COLUMN: digests})
+    return candidates[candidates.duplicated([CN.SIZE_BYTES, DIGEST_COLUMN], keep=False)]
+
+
+def _get_digests(candidates: pd.DataFrame, kind: str, connection: sqlite3.Connection | None, workers: int,
+                 chunksize: int) -> pd.Series:
+    """
+    Returns the digests of the candidates, indexed the same as the candidates. Cached digests are used if the size and
+    the last change of the file did not change. Files which cannot be read are left out.
+
+    :param candidates: The files which need to be hashed.
+    :param kind: PARTIAL or FULL.
+    :param connection: The connection to the cache of hashes, or None.
+    :param workers: The number of processes which hash the files in parallel.
+    :param chunksize: The number of paths which are sent to the pool in one task.
+    """
+    paths = candidates[CN.PATH].tolist()
+    sizes = candidates[CN.SIZE_BYTES].tolist()
+    changes = candidates[CN.CHANGED].to_numpy(dtype="datetime64[ns]").view(np.int64).tolist()
+
+    digests = _get_cached_digests(connection, paths, kind, sizes, changes)
+    missing = [index for index, digest in enumerate(digests) if digest is None]
+    computed = map_in_pool(HASH_FUNCTIONS[kind], [(paths[index], sizes[index]) for index in missing],
+                           workers, chunksize)
+    for index, digest in zip(missing, computed):
+        digests[index] = digest
+
+    if connection is not None:
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?)",
+                                   [(paths[index], kind, sizes[index], changes[index], digests[index])
+                                    for index in missing if digests[index] is not None])
+
+    return pd.Series(digests, index=candidates.index, dtype=object).dropna()
+
+
+def _connect_cache(path: str | None) -> sqlite3.Connection | None:
+    """
+    Opens the cache of hashes and creates its table if it does not exist.
+
+    :param path: The path of the SQLite database, or None if nothing is cached.
+    """
+    if path is None:
+        return None
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(CACHE_SCHEMA)
+    return connection
+
+
+def _get_cached_digests(connection: sqlite3.Connection | None, paths: list[str], kind: str, sizes: list[int],
+                        changes: list[int]) -> list[str | None]:
+    """
+    Returns the cached digest for each path, or None if it is not cached or the file changed since it was hashed.
+
+    :param connection: The connection to the cache of hashes, or None.
+    :param paths: Paths of the files.
+    :param kind: PARTIAL or FULL.
+    :param sizes: Sizes of the files from the crawl.
+    :param changes: Last changes of the files from the crawl, in nanoseconds.
+    """
+    if connection is None:
+        return [None] * len(paths)
+
+    cached = {}
+    for start in range(0, len(paths), CACHE_QUERY_SIZE):
+        chunk = paths[start:start + CACHE_QUERY_SIZE]
+        query = (f"SELECT path, size, changed, digest FROM hashes "
+                 f"WHERE kind = ? AND path IN ({', '.join('?' * len(chunk))})")
+        cached.update((row[0], row[1:]) for row in connection.execute(query, (kind, *chunk)))
+
+    digests = []
+    for path, size, changed in zip(paths, sizes, changes):
+        row = cached.get(path)
+        digests.append(row[2] if row is not None and row[:2] == (size, changed) else None)
+    return digests
+
+# endregion
@@ -1,19 +1,43 @@
 import datetime
 import os
-import shutil
+import sys
 import time
 import pandas as pd
 import numpy as np
 
 from tabulate import tabulate
-from structures import ItemType, SavedCrawls, Messages, FileOps, ColorFormatting, ByteSize, ColumnNames as CN
+from background_writer import BackgroundWriter, write_atomically
+from content_index import update_content_index, query_content_index
+from content_search import search_files, map_in_pool
+from crawl_index import build_crawl_index, query_crawl_index
+from crawl_results import CrawlResults
+from diff_engine import diff_crawls, iter_snapshot_differences, save_sorted_snapshot, get_relative_paths, \
+    PREVIOUS_COLUMNS
+from copy_engine import copy_files, remove_other_files, COPY_WORKERS
+from itertools import islice
+from duplicates import find_duplicates, get_reclaimable_size
+from folder_digests import get_folder_digests, get_root_digest
+from metrics import CrawlMetrics
+from snapshots import save_snapshot, load_snapshot, read_snapshot_schema, iter_snapshot, merge_sorted_snapshots
+from stream_writers import write_table, write_csv, write_ndjson
+from traversal import scan_roots_by_device, scan_items, scan_items_incremental, scan_tree_totals, \
+    scan_tree_totals_batch, unpack_totals_batch, FolderTotalsAggregator, \
+    RECORD_PATH, RECORD_IS_FOLDER, RECORD_SIZE, ROTATIONAL_DEVICE_WORKERS
+from structures import ItemType, DiffStatus, CopyStatus, OutputFormat, Phase, SavedCrawls, Messages, FileOps, \
+    ColorFormatting, ByteSize, ColumnNames as CN
 from multiprocessing import Pool
 from colorama import init, Fore, Back, Style
+from typing import Iterable, Iterator, TextIO
 
 # region Constants
 NONE = np.nan
 
+# Columns of the printed tables. The readable size is computed only when the table is printed.
 COLUMN_NAMES = [CN.PATH, CN.CHANGED, CN.SIZE_READABLE, CN.SIZE_BYTES]
+# Columns of the stored dataframes. Sizes are int64 and last changes are datetime64.
+DATA_COLUMN_NAMES = [CN.PATH, CN.CHANGED, CN.SIZE_BYTES]
+# Folders carry also the totals of the files which are inside them.
+FOLDER_DATA_COLUMN_NAMES = DATA_COLUMN_NAMES + [CN.FILE_COUNT, CN.NEWEST_CHANGE]
 
 # If you want to add more, check which can be opened with the current implementation.
 ALLOWED_FILE_EXTENSIONS = (".txt",
@@ -24,14 +48,25 @@ ALLOWED_FILE_EXTENSIONS = (".txt",
 # SWITCHED_COLUMN_NAMES = ["Path", "Size bytes", "Size readable", "Changed"]
 
 INITIAL_DATAFRAME = {
-    COLUMN_NAMES[0]: [],
-    COLUMN_NAMES[1]: [],
-    COLUMN_NAMES[2]: [],
-    COLUMN_NAMES[3]: []
+    DATA_COLUMN_NAMES[0]: pd.Series(dtype=object),
+    DATA_COLUMN_NAMES[1]: pd.Series(dtype="datetime64[ns]"),
+    DATA_COLUMN_NAMES[2]: pd.Series(dtype=np.int64)
 }
 TABLE_HEADER = "keys"
 TABLE_FORMAT = "psql"
 
+# Number of paths which are sent to the multiprocessing pool in one task.
+POOL_CHUNKSIZE = 32
+# Number of crawled items in one batch of the streamed crawl.
+STREAM_BATCH_SIZE = 1000
+# A crawl with a memory budget spills the buffered files when they take this part of the budget. The rest is left for
+# the folders, the skipped items and the dataframes which are built from one batch.
+SPILL_BUDGET_FRACTION = 0.25
+# Spilled chunks are read back one row group after another while they are merged.
+SPILL_ROW_GROUP_SIZE = 10_000
+# Paths are stored in the snapshots tree-encoded, every directory only once.
+SNAPSHOT_PATH_COLUMNS = [CN.PATH]
+
 
 # endregion
 
@@ -45,6 +80,7 @@ class FolderCrawler:
     def __init__(self,
                  path: str,
                  path2: str = "",
+                 more_paths: tuple[str, ...] = (),
                  crawl=True, crawl_deep=True,
                  print_files=True, print_folders=True, print_skipped_items=True,
                  filter_path="",
@@ -52,12 +88,27 @@ class FolderCrawler:
                  filter_date=datetime.datetime.min, filter_date_sign=">=",
                  read_out_file_contents=True, filter_file_content="",
                  symmetric_difference=True,
-                 copy_diffs_to_folder=True
+                 copy_diffs_to_folder=True,
+                 copy_workers=COPY_WORKERS,
+                 workers=1,
+                 rotational_workers=ROTATIONAL_DEVICE_WORKERS,
+                 chunksize=POOL_CHUNKSIZE,
+                 export_csv=False,
+                 incremental=False,
+                 restat_unchanged_files=True,
+                 use_index=False,
+                 find_duplicates=False,
+                 streaming_compare=False,
+                 digest_file_contents=False,
+                 metrics_path="",
+                 memory_budget=0
                  ):
         """
         This is the constructor for the FolderCrawler class.
 
         :param path: The path of the folder that needs to be crawled.
+        :param path2: The path of the folder that is crawled together with path and compared with it.
+        :param more_paths: Paths of more folders that are crawled together with path and compared with it.
         :param crawl: A boolean value that determines whether to crawl or not.
         :param crawl_deep: A boolean value that determines whether to crawl deep into subdirectories or not.
         :param print_files: A boolean value that determines whether to print files that were found during the crawling.
@@ -70,10 +121,41 @@ class FolderCrawler:
         :param filter_date_sign: A string value that is used together with parameter filter_date.
         :param read_out_file_contents: A boolean value that determines whether to read out text lines from all files.
         :param filter_file_content: A string value that is used to filter the text lines in files.
+        :param copy_workers: The number of threads which copy the differences into the folder of differences.
+        :param workers: The number of workers which list the folders in parallel during a deep crawl and which
+        search the content of files.
+        :param rotational_workers: The highest number of workers which list the folders of one spinning disk.
+        Roots on different devices are crawled at the same time, each device with its own workers.
+        :param chunksize: The number of paths which are sent to the multiprocessing pool in one task.
+        :param export_csv: A boolean value that determines whether to export the crawled data also into csv files.
+        :param incremental: A boolean value that determines whether a deep crawl reuses the listings of unchanged
+        folders from the previous crawl of the same path.
+        :param restat_unchanged_files: A boolean value that determines whether the files in unchanged folders are
+        stat-ed again during an incremental crawl. If False, their previous sizes and last changes are trusted.
+        :param use_index: A boolean value that determines whether to build a SQLite index of the crawl and to run the
+        path, size and date filters as queries on it, when a saved crawl is reused instead of loading all the crawled
+        data. The content of files is then also indexed, so that only files which can contain filter_file_content are
+        read.
+        :param find_duplicates: A boolean value that determines whether to find and print the files with the same
+        content.
+        :param streaming_compare: A boolean value that determines whether the crawls of path and path2 are compared
+        by streaming both snapshots, instead of loading both of them into the memory.
+        :param digest_file_contents: A boolean value that determines whether the digests of folders, which let the
+        comparison skip the same sub-trees, include the hashes of the contents of files. Otherwise files are compared
+        only by their sizes and last changes.
+        :param metrics_path: The path of the file where the measurements of the phases of the crawl are saved.
+        Files ending with ".prom" are written in the Prometheus text format, other files as JSON. If empty, the
+        measurements are only kept in self.metrics.
+        :param memory_budget: The number of bytes which the crawled files may take in the memory. When they reach a
+        part of it, they are sorted and spilled to the disk, and at the end they are merged into the snapshot of files,
+        which is sorted by the paths. The files are then printed and searched from the snapshot. 0 means no budget.
+        It can be used only with one root and without the index, the incremental crawl and finding duplicates.
         """
 
         self.path = path
         self.path2 = path2
+        # All crawled roots. The first root is compared with each of the others.
+        self.paths = [root for root in (path, path2, *more_paths) if root]
         self.crawl = crawl
         self.crawl_deep = crawl_deep
         self.print_files = print_files
@@ -88,9 +170,30 @@ class FolderCrawler:
         self.filter_file_content = filter_file_content
         self.symmetric_difference = symmetric_difference
         self.copy_difs_to_folder = copy_diffs_to_folder
+        self.copy_workers = copy_workers
+        self.workers = workers
+        self.rotational_workers = rotational_workers
+        self.chunksize = chunksize
+        self.export_csv = export_csv
+        self.incremental = incremental
+        self.restat_unchanged_files = restat_unchanged_files
+        self.use_index = use_index
+        self.find_duplicates = find_duplicates
+        self.streaming_compare = streaming_compare
+        self.digest_file_contents = digest_file_contents
+        self.metrics_path = metrics_path
+        self.memory_budget = memory_budget
+        if memory_budget and (len(self.paths) > 1 or use_index or incremental or find_duplicates):
+            raise ValueError("The memory budget can be used only with one root and without the index, "
+                             "the incremental crawl and finding duplicates.")
+        # Describes the last crawl. It is saved together with the snapshot of files.
+        self.crawl_metadata = {}
 
         # start the timer for performance measurement
         self.timer = time.perf_counter()
+        # Measurements of the single phases: walk, stat, dataframe building, saving, loading, filtering, ...
+        self.metrics = CrawlMetrics()
+        self.writer = BackgroundWriter()
 
         self.crawl_folders_method_calls = 0
 
@@ -98,6 +201,10 @@ class FolderCrawler:
         self.files = pd.DataFrame(INITIAL_DATAFRAME)
         self.folders = pd.DataFrame(INITIAL_DATAFRAME)
         self.skipped = pd.DataFrame(INITIAL_DATAFRAME)
+        # The files and folders of a saved crawl which passed the filters in the crawl index. They are only printed,
+        # finding duplicates and the content search use all crawled files.
+        self.queried_files = None
+        self.queried_folders = None
 
         # Initialize colorama
         init(autoreset=True)
@@ -107,37 +214,82 @@ class FolderCrawler:
 
     # region Public Methods
     def main__(self) -> None:
-        for path in (self.path, self.path2):
-            if path:
-                self.crawl_folders(path)
+        # All roots are crawled at the same time. Their results are then saved and printed one after another.
+        crawled_roots = [None] * self._check_how_many_roots_to_crawl()
+        if self.crawl and len(crawled_roots) > 1:
+            crawled_roots = self._crawl_roots(self.paths, self.crawl_deep)
+        for path, crawled_root in zip(self.paths, crawled_roots):
+            self.crawl_folders(path, crawled_root)
 
         self.file_content_operations(enable=self.read_out_file_contents)
-        self.compare_saved_crawls()
+        self.find_duplicate_files(enable=self.find_duplicates)
+        for other_root in range(1, self._check_how_many_roots_to_crawl()):
+            self.compare_saved_crawls(other_root)
+        self._save_metrics()
 
     def file_content_operations(self, enable: bool = False) -> None:
         if enable:
             self._read_content_of_multiple_files(self.filter_path, self.filter_file_content)
 
-    def crawl_folders(self, path_: str) -> None:
+    def find_duplicate_files(self, enable: bool = True) -> pd.DataFrame | None:
+        """
+        This method finds the crawled files which have the same content and prints them grouped together with the
+        size which would be freed by keeping only one file from each group. The hashes of files are cached, so files
+        which did not change are not read again.
+
+        :param enable: A boolean value that determines whether to find the duplicates or not.
+        """
+        if not enable:
+            return None
+
+        print(self._get_current_time(), Messages.FINDING_DUPLICATES)
+        with self.metrics.measure(Phase.DUPLICATES) as metrics:
+            duplicates = find_duplicates(self.files, SavedCrawls.HASH_CACHE, self.workers, self.chunksize)
+            metrics.items += len(self.files)
+
+        print(Messages.DUPLICATES)
+        print(self._tabulate_data(self._format_sizes_for_print(duplicates)))
+        size_readable, size_raw = self._convert_bytes_to_readable_format(
+            get_reclaimable_size(duplicates), ColorFormatting.COLORS, ColorFormatting.UNITS, Style.RESET_ALL,
+            self._color_format_string)
+        print(*self._get_crawl_summary(True, Messages.RECLAIMABLE_SIZE, size_readable, size_raw))
+
+        return duplicates
+
+    def crawl_folders(self, path_: str = "", crawled_root: tuple[CrawlResults, dict] = None) -> None:
         """
         This method is responsible for crawling the folders and printing the paths with its properties.
 
-        :param path_: The path of the folder that needs to be crawled.
+        :param path_: The path of the folder that needs to be crawled. If not provided, self.path is crawled.
+        :param crawled_root: The crawled items and the crawl metadata of the path, if it was already crawled
+        together with other roots. Then the path is not crawled again.
         """
+        path_ = path_ or self.path
+        if self.crawl and not os.path.exists(path_):
+            raise FileNotFoundError(f"Path '{path_}' does not exist.")
 
         # Prepare the storage for the crawled results.
-        self._initialize_storage(SavedCrawls.ROOT,
-                                 *(SavedCrawls.FILES, SavedCrawls.FOLDERS, SavedCrawls.SKIPPED))
+        self._initialize_storage(SavedCrawls.ROOT)
+        self.queried_files = self.queried_folders = None
         if self.crawl:
             # Crawl
-            dataframe = self._crawl_items(path_, self.crawl_deep)
+            if self.memory_budget:
+                self._crawl_within_budget(path_)
+            elif crawled_root is None:
+                crawl_results = self._crawl_items(path_, self.crawl_deep)
+            else:
+                crawl_results, self.crawl_metadata = crawled_root
             # Prepare dataframes
-            self._prepare_dataframes(dataframe)
-            # Save dataframes
-            self._save_dataframes()
-            self._make_temp_file_storages(self.path2)
+            if not self.memory_budget:
+                with self.metrics.measure(Phase.DATAFRAME) as metrics:
+                    self._prepare_dataframes(crawl_results)
+                    metrics.items += len(self.files) + len(self.folders) + len(self.skipped)
+            # The dataframes are saved in the background, while they are printed from memory.
+            print(self._get_current_time(), Messages.SAVING_IN_BACKGROUND)
+            self.writer.submit(self._save_crawled_data)
+        else:
+            self._load_saved_data()
 
-        self._load_dataframes()
         self._print_dataframes(self.print_folders, self.print_files, self.print_skipped_items, self.filter_path,
                                self.filter_size,
                                self.filter_size_sign, self.filter_date, self.filter_date_sign, self.crawl_deep)
@@ -146,131 +298,477 @@ class FolderCrawler:
         time_performance = self._get_time_performance(self.timer)
         print(Messages.CRAWLING_TIME, self._format_timestamp(time_performance), end="\n\n")
 
+        # The storages of this crawl must be complete before the next crawl or the comparison reads them.
+        self.writer.wait()
         # This variable helps to track how many times this method was called. This info is used later in code.
         self.crawl_folders_method_calls += 1
-
-    def compare_saved_crawls(self):
+        self._save_metrics()
+
+    def iter_crawl(self, path_: str = "", batch_size: int = STREAM_BATCH_SIZE) -> Iterator[tuple[str, pd.DataFrame]]:
+        """
+        Crawls the folder and yields the crawled items in small batches as soon as they are found, instead of
+        collecting the whole crawl first. Each batch is a dataframe of one item type, filtered by the filters of the
+        crawler. Only the item types which are printed are yielded. Files come while the folders are walked.
+        Folders come at the end, because their totals are known only when all their files were found. Skipped items
+        come last, because a skipped folder is filtered out if any later skipped item is inside of it, the same as in
+        a normal crawl. Only the folders and the skipped items are kept in the memory, so the memory use does not grow
+        with the number of files.
+
+        :param path_: The path of the folder that needs to be crawled. If not provided, self.path is crawled.
+        :param batch_size: The highest number of crawled items in one batch.
+        """
+        printed = {ItemType.FILES: self.print_files, ItemType.FOLDERS: self.print_folders,
+                   ItemType.SKIPPED: self.print_skipped_items}
+        skipped = []
+        for item_type, container in self._iter_crawled_items(path_ or self.path, batch_size, self.print_folders):
+            if not printed[item_type]:
+                continue
+            if item_type == ItemType.SKIPPED:
+                skipped.append(container)
+                continue
+            yield from self._iter_filtered_batches(container, item_type, batch_size)
+
+        if skipped:
+            yield from self._iter_filtered_batches(pd.concat(skipped, ignore_index=True), ItemType.SKIPPED, batch_size)
+
+    def _iter_filtered_batches(self, container: pd.DataFrame, item_type: str,
+                               batch_size: int) -> Iterator[tuple[str, pd.DataFrame]]:
+        """
+        Filters the crawled items by the filters of the crawler and yields the item type and the items which are left,
+        in batches of at most batch_size rows.
+
+        :param container: The crawled items of one item type.
+        :param item_type: The type of the crawled items.
+        :param batch_size: The highest number of crawled items in one batch.
+        """
+        container = self._global_dataframe_filter(container, self.filter_date, self.filter_date_sign,
+                                                  self.filter_path, self.filter_size, self.filter_size_sign,
+                                                  item_type, container[CN.SIZE_BYTES]).reset_index(drop=True)
+        for start in range(0, len(container), batch_size):
+            yield item_type, container.iloc[start:start + batch_size].reset_index(drop=True)
+
+    def stream_crawl(self, output_format: str = OutputFormat.TABLE, file: TextIO = None, path_: str = "") -> int:
+        """
+        Crawls the folder and writes the crawled items in the output format as soon as they are found. Nothing is
+        saved, so the crawl cannot be compared or searched later. Returns the number of written items.
+
+        :param output_format: One of OutputFormat: a printed table, csv or one JSON object per line.
+        :param file: The text stream where the items are written. If not provided, they are printed to the console.
+        :param path_: The path of the folder that needs to be crawled. If not provided, self.path is crawled.
+        """
+        file = file or sys.stdout
+        batches = self.iter_crawl(path_)
+        if output_format == OutputFormat.TABLE:
+            return write_table(batches, file, lambda batch: self._tabulate_data(self._format_sizes_for_print(batch)))
+        if output_format == OutputFormat.CSV:
+            return write_csv(batches, file)
+        if output_format == OutputFormat.NDJSON:
+            return write_ndjson(batches, file)
+        raise ValueError(f"Output format '{output_format}' is not supported.")
+
+    def compare_saved_crawls(self, other_root: int = 1):
         """
         This method compares crawled data from 2 root locations and prints the differences.
+
+        :param other_root: The index of the root in self.paths which is compared with the first root.
         """
 
-        # If the 2nd path, for the folder crawler, was not provided, we know that we have nothing to compare
+        # If the other path, for the folder crawler, was not provided, we know that we have nothing to compare
         # against. Therefore, this method makes no sense to execute.
-        if not self.path2:
+        if other_root >= self._check_how_many_roots_to_crawl():
             return
 
-        filtered = self._subtract_datasets()
+        with self.metrics.measure(Phase.COMPARE) as metrics:
+            filtered = self._subtract_datasets(other_root)
+            metrics.items += len(filtered)
 
         if self.print_files:
             print(self._tabulate_data(filtered))
 
-        self._copy_diffs_to_folder(filtered)
+        # The differences of path2 go into the folder of differences, the differences of more paths get a number.
+        differences_folder = SavedCrawls.DIFFERENCES + (str(other_root + 1) if other_root > 1 else "")
+        self._copy_diffs_to_folder(filtered, differences_folder)
 
         return filtered
 
-    def _subtract_datasets(self):
-        df1 = pd.read_csv(SavedCrawls.FILES_TEMP_1)
-        df2 = pd.read_csv(SavedCrawls.FILES_TEMP_2)
-        # Extract just a file name from the complete path
-        df1[CN.FILE_NAME] = df1[CN.PATH].apply(lambda x: os.path.basename(x))
-        df2[CN.FILE_NAME] = df2[CN.PATH].apply(lambda x: os.path.basename(x))
+    def _subtract_datasets(self, other_root: int = 1):
+        # Files are matched by their paths relative to the crawled roots, so that files with the same name in
+        # different sub-folders are not mixed up and moved files are recognized.
+        first_path, other_path = self.paths[0], self.paths[other_root]
+        first_files, other_files = SavedCrawls.FILES_TEMP.format(1), SavedCrawls.FILES_TEMP.format(other_root + 1)
+        previous_digests = load_snapshot(SavedCrawls.DIGESTS_TEMP.format(1))
+        current_digests = load_snapshot(SavedCrawls.DIGESTS_TEMP.format(other_root + 1))
+        if get_root_digest(previous_digests) == get_root_digest(current_digests):
+            # The same digests of the roots mean the same trees, so no file has to be compared.
+            no_files = pd.DataFrame(INITIAL_DATAFRAME)
+            differences = diff_crawls(no_files, no_files, first_path, other_path)
+        elif self.streaming_compare:
+            # Both snapshots are merge-joined row group by row group, only the differences are kept in the memory.
+            differences = pd.concat(iter_snapshot_differences(first_files, other_files,
+                                                              workers=self.workers, chunksize=self.chunksize),
+                                    ignore_index=True)
+            differences = differences.sort_values(CN.RELATIVE_PATH, kind="stable").reset_index(drop=True)
+        else:
+            columns = [CN.PATH, CN.CHANGED, CN.SIZE_BYTES]
+            df1 = load_snapshot(first_files, columns)
+            df2 = load_snapshot(other_files, columns)
+            differences = diff_crawls(df1, df2, first_path, other_path, workers=self.workers,
+                                      chunksize=self.chunksize, previous_digests=previous_digests,
+                                      current_digests=current_digests)
         subtracted: pd.DataFrame = pd.DataFrame()
         # Symmetric difference. List only items that are different in both DataFrames
         if self.symmetric_difference:
-            subtracted = self._symmetric_difference(df1, df2)  # , subtracted)
+            subtracted = self._symmetric_difference(differences)
 
         # One-sided difference. List only items that are missing in df2 compared to df1
         else:
-            subtracted = self._one_side_difference(df1, df2)
+            subtracted = self._one_side_difference(differences)
+        # Extract just a file name from the complete path
+        subtracted[CN.FILE_NAME] = subtracted[CN.PATH].str.split(os.sep).str[-1]
         return subtracted
 
     @staticmethod
-    def _one_side_difference(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
-        cols = [CN.FILE_NAME, CN.CHANGED]  # columns that define uniqueness
-        merged = df1.merge(df2[cols], on=cols, how="left", indicator=True)
-        filtered = merged[merged["_merge"] == "left_only"].drop(columns="_merge")
-        return filtered
+    def _one_side_difference(differences: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the files of the first crawl which are missing in the second crawl or which are different there.
+        Moved files are not missing, they are only at another relative path.
+
+        :param differences: The differences returned by diff_crawls.
+        """
+        is_missing = differences[CN.STATUS].isin([DiffStatus.REMOVED, DiffStatus.MODIFIED])
+        filtered = differences.loc[is_missing, [CN.STATUS, CN.RELATIVE_PATH, CN.PREVIOUS_PATH, CN.PREVIOUS_CHANGE,
+                                                CN.PREVIOUS_SIZE]]
+        return filtered.rename(columns={value: key for key, value in PREVIOUS_COLUMNS.items()})
 
     @staticmethod
-    def _symmetric_difference(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
-        # Concatenate the two DataFrames
-        concatenated = pd.concat([df1, df2], ignore_index=True)
-        # Drop duplicates that exist in both DataFrames
-        symmetric_difference = concatenated.drop_duplicates(subset=[CN.CHANGED, CN.FILE_NAME], keep=False)
-        # If there exist files with the same file name but one of them is newer, drop the older
-        filtered = symmetric_difference.sort_values(CN.CHANGED).drop_duplicates(subset=[CN.FILE_NAME], keep="last")
-        return filtered
+    def _symmetric_difference(differences: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the files which are only in one of the crawls and the newer versions of the files which were modified.
+        Moved files have the same content in both crawls, therefore they are not listed.
+
+        :param differences: The differences returned by diff_crawls.
+        """
+        filtered = differences[differences[CN.STATUS] != DiffStatus.MOVED].copy()
+        # If there exist files at the same relative path but one of them is newer, take the newer
+        is_previous_newer = (filtered[CN.STATUS] == DiffStatus.REMOVED) | (
+                (filtered[CN.STATUS] == DiffStatus.MODIFIED) & (filtered[CN.PREVIOUS_CHANGE] > filtered[CN.CHANGED]))
+        for column, previous_column in PREVIOUS_COLUMNS.items():
+            filtered[column] = filtered[column].where(~is_previous_newer, filtered[previous_column])
+        return filtered[[CN.STATUS, CN.RELATIVE_PATH, CN.PATH, CN.CHANGED, CN.SIZE_BYTES]]
 
-    def _copy_diffs_to_folder(self, filtered: pd.DataFrame) -> None:
-        if self.copy_difs_to_folder:
-            DIFF_FOLDER = "saved_crawls/differences"
-
-            # Remove previous differences folder if it exists
-            if os.path.exists(DIFF_FOLDER):
-                number_of_previous_files = len(os.listdir(DIFF_FOLDER))
-                for file in os.listdir(DIFF_FOLDER):
-                    file_path = os.path.join(DIFF_FOLDER, file)
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
-                print(f"\nRemoved previous contents of '{DIFF_FOLDER}'. Files removed: {number_of_previous_files}",
-                      end="\n\n")
-
-            if not os.path.exists(DIFF_FOLDER):
-                os.mkdir(DIFF_FOLDER)
-
-            for path, file_name in zip(filtered[CN.PATH], filtered[CN.FILE_NAME]):
-                # copy file from A to B
-                shutil.copy(path, os.path.join(DIFF_FOLDER, file_name))
-                print(f"Copied '{file_name}' to '{DIFF_FOLDER}'")
-            print(f"\nNumber of files copied to '{DIFF_FOLDER}': {len(filtered)}")
+    def _copy_diffs_to_folder(self, filtered: pd.DataFrame, folder: str = SavedCrawls.DIFFERENCES) -> None:
+        """
+        Copies the differences into the folder, at the same relative paths as in the crawled roots. Files which were
+        copied there by a previous run and did not change since are not copied again, files which are no longer
+        different are removed.
+
+        :param filtered: The differences returned by _subtract_datasets.
+        :param folder: The folder where the differences are copied to.
+        """
+        if not self.copy_difs_to_folder:
+            return
+
+        print(self._get_current_time(), Messages.COPYING_DIFFERENCES, folder)
+        targets = [os.path.normpath(os.path.join(folder, relative_path))
+                   for relative_path in filtered[CN.RELATIVE_PATH]]
+        if os.path.exists(folder):
+            number_of_removed_files = remove_other_files(folder, set(targets))
+            print(f"\nRemoved files which are no longer different: {number_of_removed_files}")
+        else:
+            os.mkdir(folder)
+
+        with self.metrics.measure(Phase.COPY, include_threads=True) as metrics:
+            statuses = pd.Series(copy_files(filtered[CN.PATH].tolist(), targets, self.copy_workers), dtype=object,
+                                 index=filtered.index)
+            is_copied = statuses == CopyStatus.COPIED
+            metrics.items += int(is_copied.sum())
+            metrics.bytes_read += int(filtered.loc[is_copied, CN.SIZE_BYTES].sum())
+            metrics.errors += int((statuses == CopyStatus.FAILED).sum())
+        for status in (CopyStatus.COPIED, CopyStatus.SKIPPED, CopyStatus.FAILED):
+            print(f"Number of files {status} to '{folder}': {(statuses == status).sum()}")
 
     # endregion
 
     # region Private OOP Methods
-    def _check_how_many_roots_to_crawl(self, path2: str) -> int:
-        if not path2:
-            return 1
-        else:
-            return 2
+    def _check_how_many_roots_to_crawl(self) -> int:
+        return len(self.paths)
+
+    def _save_metrics(self):
+        """
+        Saves the measurements of the phases into the file self.metrics_path, if it is set.
+        """
+        if self.metrics_path:
+            self.metrics.save(self.metrics_path)
+
+    def _save_crawled_data(self):
+        """
+        Saves the crawled dataframes, the temp storages for the comparison and optionally the crawl index.
+        """
+        with self.metrics.measure(Phase.SAVE) as metrics:
+            self._save_dataframes()
+            self._make_temp_file_storages()
+            if self.use_index:
+                print(self._get_current_time(), Messages.BUILDING_INDEX)
+                build_crawl_index(SavedCrawls.INDEX, self.files, self.folders)
+            metrics.items += len(self.files) + len(self.folders) + len(self.skipped)
+
+    def _load_saved_data(self):
+        """
+        Loads the saved dataframes, either all of them from the snapshots or only the filtered ones from the index.
+        """
+        with self.metrics.measure(Phase.LOAD) as metrics:
+            if self.use_index:
+                self._query_dataframes()
+            else:
+                self._load_dataframes()
+                metrics.bytes_read += sum(os.path.getsize(path) for path in (
+                    SavedCrawls.FILES_SNAPSHOT, SavedCrawls.FOLDERS_SNAPSHOT, SavedCrawls.SKIPPED_SNAPSHOT)
+                                          if os.path.exists(path))
+            metrics.items += len(self.files) + len(self.folders) + len(self.skipped)
 
-    def _make_temp_file_storages(self, path2: str):
-        if path2:
-            if self.crawl_folders_method_calls == 0:
-                shutil.copy(SavedCrawls.FILES, SavedCrawls.FILES_TEMP_1)
-            elif self.crawl_folders_method_calls == 1:
-                shutil.copy(SavedCrawls.FILES, SavedCrawls.FILES_TEMP_2)
+    def _make_temp_file_storages(self):
+        # The files are saved sorted by their relative paths, so that the crawls can be compared by streaming.
+        # The digests of folders are saved next to them, so that the comparison can skip the same sub-trees.
+        roots = self._check_how_many_roots_to_crawl()
+        if 1 < roots and self.crawl_folders_method_calls < roots:
+            number = self.crawl_folders_method_calls + 1
+            self._save_temp_file_storage(SavedCrawls.FILES_TEMP.format(number),
+                                         SavedCrawls.DIGESTS_TEMP.format(number))
 
-    def _prepare_dataframes(self, dataframe):
+    def _save_temp_file_storage(self, files_path: str, digests_path: str):
+        """
+        Saves the crawled files sorted by their relative paths and the digests of the folders which contain them.
+
+        :param files_path: The path of the snapshot of files.
+        :param digests_path: The path of the snapshot of digests of folders.
+        """
+        root = self.crawl_metadata["root"]
+        save_sorted_snapshot(files_path, self.files, root)
+        files = self.files.assign(**{CN.RELATIVE_PATH: get_relative_paths(self.files[CN.PATH], root)})
+        digests = get_folder_digests(files, self.digest_file_contents, self.workers, self.chunksize)
+        save_snapshot(digests_path, digests, {"root": root})
+
+    def _prepare_dataframes(self, crawl_results: CrawlResults):
         """
         This high-level wrapper method is used to prepare the crawled data into the dataframes.
         """
-        self.folders = self._get_crawled_data(dataframe, is_folder=True)
-        self.files = self._get_crawled_data(dataframe, is_folder=False)
+        print(self._get_current_time(), Messages.DATAFRAME_PREPARATION)
+        self.folders = self._get_crawled_data(crawl_results, is_folder=True)
+        self.files = self._get_crawled_data(crawl_results, is_folder=False)
         self.files, self.folders, self.skipped = self._filter_data(
-            self.files, self.folders, empty_dataframe=INITIAL_DATAFRAME, column=COLUMN_NAMES[3])
+            self.files, self.folders, empty_dataframe=INITIAL_DATAFRAME, column=CN.SIZE_BYTES)
+        # The rows keep the same index as if the dataframes were loaded from the snapshots.
+        self.files = self._set_column_types(self.files).reset_index(drop=True)
+        self.folders = self._set_column_types(self.folders).reset_index(drop=True)
+        self.skipped = self._set_column_types(self.skipped).reset_index(drop=True)
 
     def _save_dataframes(self):
         """
-        This high-level wrapper method is used to save the crawled data into the files.
+        This high-level wrapper method is used to save the crawled data into the snapshots and optionally into the
+        csv files.
         """
         item_types = (ItemType.FILES, ItemType.FOLDERS, ItemType.SKIPPED)
         containers = (self.files, self.folders, self.skipped)
-        paths = (SavedCrawls.FILES, SavedCrawls.FOLDERS, SavedCrawls.SKIPPED)
-
-        for item_type, container, path in zip(item_types, containers, paths):
-            print(self._get_current_time(), Messages.SAVING_RESULTS, item_type.upper())
-            self._save_result(path, container)
+        snapshot_paths = (SavedCrawls.FILES_SNAPSHOT, SavedCrawls.FOLDERS_SNAPSHOT, SavedCrawls.SKIPPED_SNAPSHOT)
+        csv_paths = (SavedCrawls.FILES, SavedCrawls.FOLDERS, SavedCrawls.SKIPPED)
+
+        for item_type, container, snapshot_path, csv_path in zip(item_types, containers, snapshot_paths, csv_paths):
+            if item_type == ItemType.FILES and self.memory_budget:
+                # The files were already merged into their snapshot, they are not in the memory.
+                if self.export_csv:
+                    self._save_snapshot_as_csv(snapshot_path, csv_path)
+                continue
+            save_snapshot(snapshot_path, container, self.crawl_metadata if item_type == ItemType.FILES else None,
+                          path_columns=SNAPSHOT_PATH_COLUMNS)
+            if self.export_csv:
+                self._save_result(csv_path, container)
 
     def _load_dataframes(self):
         """
-        This high-level wrapper method is used to load the crawled data.
+        This high-level wrapper method is used to load the crawled data. With a memory budget, the files stay in
+        their snapshot.
         """
-        self.files = self.load_crawled_data(self.files, ItemType.FILES,
-                                            SavedCrawls.ROOT, SavedCrawls.EXTENSION)
+        if not self.memory_budget:
+            self.files = self.load_crawled_data(self.files, ItemType.FILES,
+                                                SavedCrawls.ROOT, SavedCrawls.SNAPSHOT_EXTENSION)
         self.folders = self.load_crawled_data(self.folders, ItemType.FOLDERS,
-                                              SavedCrawls.ROOT, SavedCrawls.EXTENSION)
+                                              SavedCrawls.ROOT, SavedCrawls.SNAPSHOT_EXTENSION)
         self.skipped = self.load_crawled_data(self.skipped, ItemType.SKIPPED,
-                                              SavedCrawls.ROOT, SavedCrawls.EXTENSION)
+                                              SavedCrawls.ROOT, SavedCrawls.SNAPSHOT_EXTENSION)
+
+        # Saved csv files are read as text, so the sizes and dates have to get their types back.
+        self.files = self._set_column_types(self.files)
+        self.folders = self._set_column_types(self.folders)
+        self.skipped = self._set_column_types(self.skipped)
+
+    def _query_dataframes(self):
+        """
+        This high-level wrapper method is used to load only the files and folders which pass the filters, by querying
+        the crawl index. All files and folders are loaded from their snapshots only if finding duplicates or the
+        content search needs them. Skipped items are not in the index, so they are loaded from their snapshot.
+        """
+        print(self._get_current_time(), Messages.QUERYING_INDEX)
+        filters = (self.filter_path, self.filter_size, self.filter_size_sign, self.filter_date, self.filter_date_sign)
+        self.queried_files = query_crawl_index(SavedCrawls.INDEX, ItemType.FILES, *filters)
+        self.queried_folders = query_crawl_index(SavedCrawls.INDEX, ItemType.FOLDERS, *filters)
+        if self.find_duplicates or self.read_out_file_contents:
+            self._load_dataframes()
+            return
+
+        self.files = pd.DataFrame(INITIAL_DATAFRAME)
+        self.folders = pd.DataFrame(INITIAL_DATAFRAME)
+        self.skipped = self.load_crawled_data(self.skipped, ItemType.SKIPPED,
+                                              SavedCrawls.ROOT, SavedCrawls.SNAPSHOT_EXTENSION)
+        self.skipped = self._set_column_types(self.skipped)
+
+    def _iter_crawled_items(self, path: str, batch_size: int,
+                            with_folders: bool = True) -> Iterator[tuple[str, pd.DataFrame]]:
+        """
+        Crawls the folder and yields the item type and the dataframe of each batch of crawled items, without any
+        filter. Files and skipped items come while the folders are walked. Folders come at the end, because their
+        totals are known only when all their files were found. Only the folders are kept in the memory.
+
+        :param path: The path of the folder that needs to be crawled.
+        :param batch_size: The highest number of crawled items in one batch.
+        :param with_folders: A boolean value that determines whether the folders are yielded.
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Path '{path}' does not exist.")
+
+        aggregator = FolderTotalsAggregator()
+        folder_records = []
+        for records in self._iter_batches(scan_items(path, self.crawl_deep), batch_size):
+            if with_folders:
+                folder_records.extend(record for record in records if record[RECORD_IS_FOLDER])
+                if self.crawl_deep:
+                    aggregator.add_records(records)
+            yield from self._get_item_batches(records, is_folder=False)
+
+        if not folder_records:
+            return
+        if self.crawl_deep:
+            folder_totals = iter(aggregator.get_totals()[record[RECORD_PATH]] for record in folder_records)
+        else:
+            # Only the first level was crawled, so the content of each folder is walked now.
+            folder_totals = map_in_pool(scan_tree_totals, [record[RECORD_PATH] for record in folder_records],
+                                        self.workers, self.chunksize)
+        for records in self._iter_batches(folder_records, batch_size):
+            totals = {record[RECORD_PATH]: next(folder_totals) for record in records}
+            yield from self._get_item_batches(records, is_folder=True, folder_totals=totals)
+
+    def _get_item_batches(self, records: list[tuple], is_folder: bool,
+                          folder_totals: dict = None) -> Iterator[tuple[str, pd.DataFrame]]:
+        """
+        Converts one batch of records into the dataframes of crawled items and skipped items and yields those which
+        are not empty.
+
+        :param records: Records of the crawled items, as yielded by scan_items.
+        :param is_folder: A boolean value that determines whether the folders or the files are taken from the records.
+        :param folder_totals: Size, number of files and newest last change of files of the folders in the records.
+        """
+        crawl_results = CrawlResults()
+        crawl_results.add_records(records, folder_totals)
+        items = crawl_results.get_items(is_folder)
+        is_missing = items[CN.SIZE_BYTES].isna()
+        item_type = ItemType.FOLDERS if is_folder else ItemType.FILES
+
+        for item_type, container in ((item_type, items[~is_missing]), (ItemType.SKIPPED, items[is_missing])):
+            if not container.empty:
+                yield item_type, self._set_column_types(container).reset_index(drop=True)
+
+    def _crawl_within_budget(self, path: str):
+        """
+        Crawls the folder with at most about self.memory_budget bytes of crawled files in the memory. When the buffered
+        files reach their part of the budget, they are sorted by their paths and spilled into a chunk snapshot. At the
+        end, the chunks are merged into the snapshot of files, which is then read one row group after another.
+        Folders and skipped items stay in the memory, self.files stays empty.
+
+        :param path: The path of the folder that needs to be crawled.
+        """
+        print(self._get_current_time(), Messages.DEEP_CRAWL if self.crawl_deep else Messages.SHALLOW_CRAWL)
+        self.crawl_metadata = {"root": path, "deep": self.crawl_deep,
+                               "root_changed": self._get_last_change_of_item(path).isoformat()}
+        os.makedirs(SavedCrawls.SPILL, exist_ok=True)
+
+        chunks = []
+        buffered = []
+        buffered_bytes = 0
+        kept = {ItemType.FOLDERS: [], ItemType.SKIPPED: []}
+        with self.metrics.measure(Phase.WALK, include_threads=True) as metrics:
+            for item_type, container in self._iter_crawled_items(path, STREAM_BATCH_SIZE):
+                metrics.items += len(container)
+                if item_type == ItemType.SKIPPED:
+                    metrics.errors += len(container)
+                if item_type != ItemType.FILES:
+                    kept[item_type].append(container)
+                    continue
+                buffered.append(container)
+                buffered_bytes += container.memory_usage(deep=True).sum()
+                if buffered_bytes >= self.memory_budget * SPILL_BUDGET_FRACTION:
+                    chunks.append(self._spill_files(buffered, len(chunks)))
+                    buffered, buffered_bytes = [], 0
+            if buffered or not chunks:
+                chunks.append(self._spill_files(buffered, len(chunks)))
+
+        print(self._get_current_time(), Messages.MERGING_SPILLED_FILES, len(chunks))
+        with self.metrics.measure(Phase.SAVE) as metrics:
+            metrics.items += merge_sorted_snapshots(chunks, SavedCrawls.FILES_SNAPSHOT, CN.PATH, self.crawl_metadata)
+            for chunk in chunks:
+                os.remove(chunk)
+            os.rmdir(SavedCrawls.SPILL)
+
+        self.files = pd.DataFrame(INITIAL_DATAFRAME)
+        self.folders, self.skipped = (pd.concat(kept[item_type], ignore_index=True) if kept[item_type]
+                                      else pd.DataFrame(INITIAL_DATAFRAME)
+                                      for item_type in (ItemType.FOLDERS, ItemType.SKIPPED))
+
+    @staticmethod
+    def _spill_files(containers: list[pd.DataFrame], number: int) -> str:
+        """
+        Saves the buffered files sorted by their paths into a chunk snapshot and returns its path.
+
+        :param containers: The buffered dataframes of files.
+        :param number: The number of the chunk.
+        """
+        files = pd.concat(containers, ignore_index=True) if containers else pd.DataFrame(INITIAL_DATAFRAME)
+        path = SavedCrawls.SPILL_CHUNK.format(number)
+        save_snapshot(path, files.sort_values(CN.PATH, kind="stable"), row_group_size=SPILL_ROW_GROUP_SIZE,
+                      path_columns=SNAPSHOT_PATH_COLUMNS)
+        return path
+
+    def _print_saved_files(self, filter_path: str, filter_size: int, filter_size_sign: str,
+                           filter_date: datetime.datetime, filter_date_sign: str, crawl_deep: bool):
+        """
+        Prints the files from their snapshot one row group after another, so that they do not have to be in the
+        memory at once. For parameter description, check out the main method.
+        """
+        total_size = 0
+
+        def iter_filtered_files():
+            nonlocal total_size
+            for files in iter_snapshot(SavedCrawls.FILES_SNAPSHOT):
+                total_size += files[CN.SIZE_BYTES].sum()
+                files = self._global_dataframe_filter(files, filter_date, filter_date_sign, filter_path,
+                                                      filter_size, filter_size_sign, ItemType.FILES,
+                                                      files[CN.SIZE_BYTES])
+                if not files.empty:
+                    yield ItemType.FILES, files
+
+        with self.metrics.measure(Phase.RENDER) as metrics:
+            metrics.items += write_table(iter_filtered_files(), sys.stdout,
+                                         lambda files: self._tabulate_data(self._format_sizes_for_print(files)))
+            self._print_crawl_summary(crawl_deep, ItemType.FILES, pd.Series([total_size], dtype=np.int64))
+
+    def _iter_file_paths(self) -> Iterator[str]:
+        """
+        Yields the paths of the crawled files. With a memory budget, they are read from the snapshot of files one row
+        group after another.
+        """
+        if self.memory_budget and os.path.exists(SavedCrawls.FILES_SNAPSHOT):
+            for files in iter_snapshot(SavedCrawls.FILES_SNAPSHOT, [CN.PATH]):
+                yield from files[CN.PATH]
+        else:
+            yield from self.files[CN.PATH]
 
     def _print_dataframes(self, print_folders: bool, print_files: bool, print_skipped_items: bool,
                           filter_path: str, filter_size: int, filter_size_sign: str,
@@ -280,17 +778,22 @@ class FolderCrawler:
         Regarding parameter description, check out the main method.
         """
 
-        if print_files:
-            self._print_data(self.files, filter_path, filter_size, filter_size_sign,
+        if print_files and self.memory_budget:
+            self._print_saved_files(filter_path, filter_size, filter_size_sign, filter_date, filter_date_sign,
+                                    crawl_deep)
+        elif print_files:
+            files = self.files if self.queried_files is None else self.queried_files
+            self._print_data(files, filter_path, filter_size, filter_size_sign,
                              filter_date, filter_date_sign, ItemType.FILES, crawl_deep)
         if print_folders:
-            self._print_data(self.folders, filter_path, filter_size, filter_size_sign,
+            folders = self.folders if self.queried_folders is None else self.queried_folders
+            self._print_data(folders, filter_path, filter_size, filter_size_sign,
                              filter_date, filter_date_sign, ItemType.FOLDERS, crawl_deep)
         if print_skipped_items:
             self._print_data(self.skipped, filter_path, filter_size, filter_size_sign,
                              filter_date, filter_date_sign, ItemType.SKIPPED, crawl_deep)
 
-    def _crawl_items(self, path: str, go_deep: bool):
+    def _crawl_items(self, path: str, go_deep: bool) -> CrawlResults:
         """
         Crawls through the folder at the given path, with the option to go deeper into subdirectories,
         using multiprocessing.
@@ -298,48 +801,140 @@ class FolderCrawler:
         :param path: The path of the folder that needs to be crawled.
         :param go_deep: A boolean value that determines whether to go deep into subdirectories or not.
         """
+        crawl_results, self.crawl_metadata = self._crawl_roots([path], go_deep)[0]
+        return crawl_results
 
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"Path '{path}' does not exist.")
+    def _crawl_roots(self, paths: list[str], go_deep: bool) -> list[tuple[CrawlResults, dict]]:
+        """
+        Crawls through the folders at the given paths at the same time. The folders of all roots are listed by the
+        same workers and the totals of folders of a shallow crawl are walked in one multiprocessing pool. Returns
+        the crawled items and the crawl metadata of each root separately.
+
+        :param paths: The paths of the folders that need to be crawled.
+        :param go_deep: A boolean value that determines whether to go deep into subdirectories or not.
+        """
+        for path in paths:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Path '{path}' does not exist.")
 
         if go_deep:
             print(self._get_current_time(), Messages.DEEP_CRAWL)
-            paths = self._crawl_deep(path)
         else:
             print(self._get_current_time(), Messages.SHALLOW_CRAWL)
-            paths = self._crawl_shallow(path)
 
-        # Use multiprocessing Pool to handle item processing
-        print(self._get_current_time(), Messages.STARTING_MULTI_PROCESSING)
+        metadata = [{"root": path, "deep": go_deep,
+                     "root_changed": self._get_last_change_of_item(path).isoformat()} for path in paths]
 
-        # How this works:
-        # Into the pool.map method we pass the method which performs the operations and as a second parameter items to
-        # pass into function at first parameter.
-        # The pool then distributes the items to the available cores and processes them in parallel.
-        # Result will be just as if you normally put the items into the function.
-        with Pool() as pool:
-            results = pool.map(self._get_path_with_properties, paths)
+        with self.metrics.measure(Phase.WALK, include_threads=True) as metrics:
+            records_of_roots = self._scan_roots(paths, go_deep)
+            metrics.items += sum(len(records) for records in records_of_roots)
+            # The size of a file is missing only if it could not be stat-ed.
+            metrics.errors += sum(not record[RECORD_IS_FOLDER] and record[RECORD_SIZE] is NONE
+                                  for records in records_of_roots for record in records)
 
-        print(self._get_current_time(), Messages.DATAFRAME_PREPARATION)
-        return pd.DataFrame(results)
+        with self.metrics.measure(Phase.STAT) as metrics:
+            results = [CrawlResults() for _ in paths]
+            for crawl_results, records in zip(results, records_of_roots):
+                crawl_results.add_records(records)
+                metrics.items += len(records)
+            folder_totals = self._get_folder_totals(records_of_roots, results, go_deep)
+            for crawl_results in results:
+                crawl_results.add_records([], folder_totals)
+        return list(zip(results, metadata))
 
-    def _get_path_with_properties(self, path_tuple: tuple[str, bool]) -> tuple[tuple, bool]:
+    def _scan_roots(self, paths: list[str], go_deep: bool) -> list[list[tuple]]:
         """
-        This method gets all the properties of the path and returns them as a tuple with a boolean value.
+        Returns the records of the items of each root. Roots with a previous crawl are crawled incrementally, if
+        enabled, the others are listed by the scandir engine.
 
-        :param path_tuple: Tuple containing path+it's properties and boolean which determines if the path is a file or
-        a folder.
+        :param paths: The paths of the folders that need to be crawled.
+        :param go_deep: A boolean value that determines whether to go deep into subdirectories or not.
         """
-        path, is_folder = path_tuple
-        item_path = os.path.join(self.path, path) if self.path not in path else path
-        last_change = self._get_last_change_of_item(item_path)
-        size = self._get_size_of_item(item_path, get_size_folder=is_folder)
-        size_readable, size_total = self._convert_bytes_to_readable_format(size, ColorFormatting.COLORS,
-                                                                           ColorFormatting.UNITS, Style.RESET_ALL,
-                                                                           function=self._color_format_string)
-        data_complete = (item_path, last_change, size_readable, size_total)
+        records_of_roots = [None] * len(paths)
+        for index, path in enumerate(paths):
+            previous_crawl = self._load_previous_crawl(path) if self.incremental and go_deep else None
+            if previous_crawl is not None:
+                # Only folders which changed since the previous crawl are listed again.
+                print(self._get_current_time(), Messages.INCREMENTAL_CRAWL)
+                records_of_roots[index] = list(scan_items_incremental(path, *previous_crawl,
+                                                                      restat_files=self.restat_unchanged_files))
+
+        # The scandir engine already returns the size and the last change of each item, so no item has to be
+        # stat-ed again. With more workers, the folders are listed in parallel. Roots on different devices are
+        # listed at the same time.
+        indexes = [index for index, records in enumerate(records_of_roots) if records is None]
+        scanned = scan_roots_by_device([paths[index] for index in indexes], go_deep, self.workers,
+                                       self.rotational_workers)
+        for index, records in zip(indexes, scanned):
+            records_of_roots[index] = records
+        return records_of_roots
+
+    def _get_folder_totals(self, records_of_roots: list[list[tuple]], results: list[CrawlResults],
+                           go_deep: bool) -> dict[str, tuple]:
+        """
+        Returns the size, the number of files and the newest last change of files of each crawled folder.
+
+        :param records_of_roots: The records of the items of each root.
+        :param results: The crawled items of each root.
+        :param go_deep: A boolean value that determines whether all sub-folders were crawled.
+        """
+        folder_totals = {}
+        if go_deep:
+            # All files under every folder were crawled, so the totals of folders are rolled up from them along the
+            # directory tree of each root.
+            for crawl_results in results:
+                folder_totals.update(crawl_results.get_folder_totals())
+        else:
+            # Only the first level was crawled, so the content of each folder must be walked in the pool.
+            folder_paths = [record[RECORD_PATH] for records in records_of_roots for record in records
+                            if record[RECORD_IS_FOLDER]]
+
+            # Use multiprocessing Pool to handle item processing
+            print(self._get_current_time(), Messages.STARTING_MULTI_PROCESSING)
+
+            if folder_paths:
+                totals_batch = self._map_in_batches(scan_tree_totals_batch, folder_paths, self.chunksize)
+                folder_totals = dict(zip(folder_paths, unpack_totals_batch(*totals_batch)))
+        return folder_totals
+
+    def _load_previous_crawl(self, path: str) -> tuple[dict, dict] | None:
+        """
+        Loads the listings and the last changes of folders from the saved snapshots, so that they can be reused by an
+        incremental crawl. Returns None if there is no previous deep crawl of the same path.
 
-        return data_complete, is_folder
+        :param path: The path of the folder that needs to be crawled.
+        """
+        if not os.path.exists(SavedCrawls.FILES_SNAPSHOT):
+            return None
+        metadata = read_snapshot_schema(SavedCrawls.FILES_SNAPSHOT)["metadata"]
+        if metadata.get("root") != path or not metadata.get("deep"):
+            return None
+
+        files = load_snapshot(SavedCrawls.FILES_SNAPSHOT, [CN.PATH, CN.CHANGED, CN.SIZE_BYTES])
+        folders = load_snapshot(SavedCrawls.FOLDERS_SNAPSHOT, [CN.PATH, CN.CHANGED])
+        skipped = load_snapshot(SavedCrawls.SKIPPED_SNAPSHOT, [CN.PATH])
+
+        previous_changes = dict(zip(folders[CN.PATH], [change.to_pydatetime() for change in folders[CN.CHANGED]]))
+        previous_changes[path] = datetime.datetime.fromisoformat(metadata["root_changed"])
+        previous_listings = {folder: ([], []) for folder in previous_changes}
+
+        # The last changes are stored in the local time, so they are converted back as local times, not as UTC.
+        file_changes = [NONE if pd.isna(change) else time.mktime(change.timetuple()) + change.microsecond / 1e6
+                        for change in files[CN.CHANGED]]
+        for file_path, size, last_change in zip(files[CN.PATH], files[CN.SIZE_BYTES].tolist(), file_changes):
+            listing = previous_listings.get(file_path.rpartition(os.sep)[0])
+            if listing is not None:
+                listing[0].append((file_path, False, size, last_change))
+        for folder_path in folders[CN.PATH]:
+            listing = previous_listings.get(folder_path.rpartition(os.sep)[0])
+            if listing is not None:
+                listing[1].append(folder_path)
+
+        # Skipped items are not in the listings above, so the folders which contain them are listed again.
+        for skipped_path in skipped[CN.PATH]:
+            previous_listings.pop(skipped_path.rpartition(os.sep)[0], None)
+
+        return previous_listings, previous_changes
 
     def _print_data(self, container: pd.DataFrame, filter_path: str, filter_size: int, filter_size_sign: str,
                     filter_date: datetime.datetime, filter_date_sign: str, item_type: str, crawl_deep: bool):
@@ -353,16 +948,20 @@ class FolderCrawler:
 
         path_sizes = None
         if item_type != ItemType.SKIPPED:
-            path_sizes = self._get_ints_from_str_dataframe_column(container, COLUMN_NAMES[3])
-
-        container = self._global_dataframe_filter(container, filter_date, filter_date_sign, filter_path,
-                                                  filter_size, filter_size_sign, item_type, path_sizes)
-        container = container.reset_index(drop=True)
-        print(item_type.upper())
-        # Uncomment if you want to have the table with switched columns
-        # print(self._tabulate_data(container[SWITCHED_COLUMN_NAMES]))
-        print(self._tabulate_data(container))
-        self._print_crawl_summary(crawl_deep, item_type, path_sizes)
+            path_sizes = container[CN.SIZE_BYTES]
+
+        with self.metrics.measure(Phase.FILTER) as metrics:
+            metrics.items += len(container)
+            container = self._global_dataframe_filter(container, filter_date, filter_date_sign, filter_path,
+                                                      filter_size, filter_size_sign, item_type, path_sizes)
+        with self.metrics.measure(Phase.RENDER) as metrics:
+            metrics.items += len(container)
+            container = self._format_sizes_for_print(container.reset_index(drop=True))
+            print(item_type.upper())
+            # Uncomment if you want to have the table with switched columns
+            # print(self._tabulate_data(container[SWITCHED_COLUMN_NAMES]))
+            print(self._tabulate_data(container))
+            self._print_crawl_summary(crawl_deep, item_type, path_sizes)
 
     def _print_crawl_summary(self, crawl_deep, item_type: str, path_sizes: pd.Series):
         """
@@ -386,13 +985,13 @@ class FolderCrawler:
         This is a helper method to group all the filters in one place.
         """
         if item_type == ItemType.SKIPPED:
-            container = self._filter_subdirectories(container, COLUMN_NAMES[0])
+            container = self._filter_subdirectories(container, CN.PATH)
 
-        container = self._filter_paths(container, filter_path, COLUMN_NAMES[0])
+        container = self._filter_paths(container, filter_path, CN.PATH)
 
         if item_type != ItemType.SKIPPED:
             container = self._filter_sizes(container, filter_size, filter_size_sign, path_sizes)
-            container = self._filter_last_change(container, filter_date, filter_date_sign, COLUMN_NAMES[1])
+            container = self._filter_last_change(container, filter_date, filter_date_sign, CN.CHANGED)
 
         return container
 
@@ -414,32 +1013,65 @@ class FolderCrawler:
 
         file_contents_from_all_filtered_paths = []
 
-        # Read out the content of the files
-        for path in self.files[COLUMN_NAMES[0]]:
-            path = path.lower()
-            if filter_path.lower() in path and path.endswith(ALLOWED_FILE_EXTENSIONS):
-                try:
-                    content_of_one_file = self._read_content_of_one_file(path, filter_file_content, print_=False)
-                    file_contents_from_all_filtered_paths.append(content_of_one_file)
-
-                    # Optionally print the content of the files
-                    for i, line in enumerate(content_of_one_file):
-                        if not i:
-                            print(path)
-                        print(f"Row {i}", line, sep=": ")
-                    if content_of_one_file:
-                        print(Messages.SEPARATOR)
-                except UnicodeDecodeError:
-                    print(f"File at '{path}' is not readable with encoding '{FileOps.ENCODING}'. Skipping this file.")
-                    print(Messages.SEPARATOR)
-                    continue
-            elif not path.endswith(ALLOWED_FILE_EXTENSIONS):
+        # Select the files which will be read. Only the comparison is case-insensitive, the paths stay as they are.
+        paths_to_read = []
+        for path in self._iter_file_paths():
+            path_lower = path.lower()
+            if filter_path.lower() in path_lower and path_lower.endswith(ALLOWED_FILE_EXTENSIONS):
+                paths_to_read.append(path)
+            elif not path_lower.endswith(ALLOWED_FILE_EXTENSIONS):
                 print(f"File type at path {path} is not enabled for reading.\n"
                       f"Add it's extension to ALLOWED_FILE_EXTENSIONS: {ALLOWED_FILE_EXTENSIONS}.\n"
                       f"Then verify if the program is able to read such file.")
 
+        if self.use_index:
+            paths_to_read = self._get_indexed_candidates(paths_to_read, filter_file_content)
+
+        # The files are searched in the pool and the results are printed as soon as they arrive.
+        with self.metrics.measure(Phase.CONTENT_SEARCH) as metrics:
+            metrics.items += len(paths_to_read)
+            if CN.SIZE_BYTES in self.files.columns:
+                # Every searched file is read completely.
+                sizes = dict(zip(self.files[CN.PATH], self.files[CN.SIZE_BYTES].tolist()))
+                metrics.bytes_read += sum(sizes.get(path, 0) for path in paths_to_read)
+            for path, content_of_one_file in search_files(paths_to_read, filter_file_content, self.workers,
+                                                          self.chunksize):
+                if content_of_one_file is None:
+                    metrics.errors += 1
+                    print(f"File at '{path}' is not readable with encoding '{FileOps.ENCODING}'. Skipping this file.")
+                    print(Messages.SEPARATOR)
+                    continue
+                file_contents_from_all_filtered_paths.append(content_of_one_file)
+
+                # Optionally print the content of the files
+                for i, line in enumerate(content_of_one_file):
+                    if not i:
+                        print(path)
+                    print(f"Row {i}", line, sep=": ")
+                if content_of_one_file:
+                    print(Messages.SEPARATOR)
+
         return file_contents_from_all_filtered_paths
 
+    def _get_indexed_candidates(self, paths: list[str], filter_file_content: str) -> list[str]:
+        """
+        Updates the content index with the files which changed since they were indexed and returns only the paths
+        of files which can contain the filter string.
+
+        :param paths: Paths of the files which would be read.
+        :param filter_file_content: Filter string that filters out the lines in each file.
+        """
+        files = self.files.set_index(CN.PATH).loc[paths]
+        changes = files[CN.CHANGED].to_numpy(dtype="datetime64[ns]").view(np.int64).tolist()
+        print(self._get_current_time(), Messages.UPDATING_CONTENT_INDEX)
+        update_content_index(SavedCrawls.CONTENT_INDEX, paths, files[CN.SIZE_BYTES].tolist(), changes,
+                             self.workers, self.chunksize)
+
+        candidates = query_content_index(SavedCrawls.CONTENT_INDEX, filter_file_content)
+        if candidates is None:
+            return paths
+        return [path for path in paths if path in candidates]
+
     # endregion
 
     # region Private Static Methods
@@ -491,12 +1123,13 @@ class FolderCrawler:
 
         filter_ = object  # I just put it here because at return it does not see the filter_ variable
 
-        container[column] = container[column].apply(pd.to_datetime).copy()
+        # The column is already datetime64, unless the dataframe was loaded from an older saved crawl.
+        last_changes = pd.to_datetime(container[column])
 
         if sign == ">=":
-            filter_ = container[column] >= filter_date
+            filter_ = last_changes >= filter_date
         elif sign == "<=":
-            filter_ = container[column] <= filter_date
+            filter_ = last_changes <= filter_date
 
         return container[filter_]
 
@@ -504,6 +1137,7 @@ class FolderCrawler:
     def _get_ints_from_str_dataframe_column(container: pd.DataFrame, column: str) -> pd.Series:
         """
         This method is used to extract integers from the strings in a column of a given dataframe.
+        Older saved crawls stored the sizes as color formatted strings, therefore they are converted with this method.
 
         :param container: The dataframe that contains the data.
         :param column: The column in which the integers are extracted.
@@ -516,7 +1150,7 @@ class FolderCrawler:
     @staticmethod
     def load_crawled_data(container: pd.DataFrame, item_type: str, path: str, extension: str) -> pd.DataFrame:
         """
-        This will read out a data from csv.
+        This will read out a data from a snapshot or from csv, depending on the extension.
 
         :param container: Dataframe that is going to be checked if it is empty.
         :param item_type: A string value that determines which file to read out.
@@ -525,6 +1159,8 @@ class FolderCrawler:
         """
         if container.empty:
             item_path = os.path.join(path, f"{item_type}{extension}")
+            if extension == SavedCrawls.SNAPSHOT_EXTENSION:
+                return load_snapshot(item_path)
             return pd.read_csv(item_path)
         return container
 
@@ -539,7 +1175,7 @@ class FolderCrawler:
         :param size_raw: The raw size that is printed.
         """
         if print_:
-            return message, size_readable, size_raw
+            return message, size_readable, size_raw, "\n\n"
         else:
             return "\n",
 
@@ -572,20 +1208,100 @@ class FolderCrawler:
         return files, folders, skipped_items
 
     @staticmethod
-    def _get_crawled_data(dataframe: pd.DataFrame, is_folder: bool):
+    def _get_crawled_data(crawl_results: CrawlResults, is_folder: bool) -> pd.DataFrame:
         """
-        This method is used to unpack the dataframe that contains the crawled data.
+        This method is used to get the dataframe of the crawled files or folders from the columns of crawled data.
 
-        :param dataframe: The dataframe that contains the crawled data.
-        :param is_folder: A boolean value that determines whether the dataframe should filter folders or files.
+        :param crawl_results: The crawled data of one root.
+        :param is_folder: A boolean value that determines whether the dataframe should contain folders or files.
         """
-        column_with_bools = dataframe[1]
-        filter_ = column_with_bools == is_folder
-        items = dataframe[filter_].copy()
-        items = items.drop(columns=1)
-        unpacked = items[0].apply(pd.Series)
-        unpacked.columns = COLUMN_NAMES
-        return pd.DataFrame(unpacked).reset_index(drop=True)
+        return crawl_results.get_items(is_folder)
+
+    @staticmethod
+    def _set_column_types(container: pd.DataFrame) -> pd.DataFrame:
+        """
+        This method converts the columns of the given dataframe to their types: the last changes to datetime64 and
+        the sizes and numbers of files to int64. Columns with missing values (skipped items) stay float.
+        The readable size from older saved crawls is dropped, because it is computed only when printing.
+
+        :param container: The dataframe whose columns need to be converted.
+        """
+        container = container.drop(columns=CN.SIZE_READABLE, errors="ignore")
+
+        for column in (CN.CHANGED, CN.NEWEST_CHANGE):
+            if column in container.columns:
+                container[column] = pd.to_datetime(container[column], errors="coerce")
+
+        if CN.SIZE_BYTES in container.columns and container[CN.SIZE_BYTES].dtype == object:
+            not_missing = container[CN.SIZE_BYTES].notna()
+            sizes = pd.Series(NONE, index=container.index)
+            sizes[not_missing] = FolderCrawler._get_ints_from_str_dataframe_column(
+                container[not_missing].astype({CN.SIZE_BYTES: str}), CN.SIZE_BYTES)
+            container[CN.SIZE_BYTES] = sizes
+
+        for column in (CN.SIZE_BYTES, CN.FILE_COUNT):
+            if column in container.columns and not container[column].isna().any():
+                container[column] = container[column].astype(np.int64)
+
+        return container
+
+    @staticmethod
+    def _format_sizes_for_print(container: pd.DataFrame) -> pd.DataFrame:
+        """
+        This method returns a copy of the dataframe with color formatted sizes, as they are printed into the console.
+        The readable size is inserted in front of the raw size. Missing sizes stay missing.
+
+        :param container: The dataframe with int64 sizes in bytes.
+        """
+        if CN.SIZE_BYTES not in container.columns:
+            return container
+
+        sizes = container[CN.SIZE_BYTES]
+        not_missing = sizes.notna().to_numpy()
+        known_sizes = sizes[not_missing].to_numpy(dtype=np.float64)
+
+        # Index of the unit for each size. 0 is bytes, 1 is kilobytes, ...
+        thresholds = [ByteSize.KILOBYTE ** power for power in range(1, len(ColorFormatting.UNITS))]
+        unit_indexes = np.searchsorted(thresholds, known_sizes, side="right")
+        sizes_adjusted = known_sizes / np.power(float(ByteSize.KILOBYTE), unit_indexes)
+
+        readable = np.full(len(sizes), NONE, dtype=object)
+        raw = np.full(len(sizes), NONE, dtype=object)
+        readable[not_missing] = [
+            FolderCrawler._color_format_string(ColorFormatting.COLORS[unit_index], size_adjusted,
+                                               ColorFormatting.UNITS[unit_index], Style.RESET_ALL, False)
+            for unit_index, size_adjusted in zip(unit_indexes, sizes_adjusted)]
+        raw[not_missing] = [
+            FolderCrawler._color_format_string(ColorFormatting.COLORS[unit_index], size, None, Style.RESET_ALL, True)
+            for unit_index, size in zip(unit_indexes, sizes[not_missing])]
+
+        container = container.copy()
+        container[CN.SIZE_BYTES] = raw
+        container.insert(container.columns.get_loc(CN.SIZE_BYTES), CN.SIZE_READABLE, readable)
+        return container
+
+    @staticmethod
+    def _map_in_batches(function, items: list, chunksize: int) -> tuple[np.ndarray, ...]:
+        """
+        This method processes the items in a multiprocessing pool in chunks and returns the concatenated results.
+
+        How this works:
+        The items are split into chunks of the given size. Into the pool.map method we pass the function which performs
+        the operations on one chunk and the chunks. The pool then distributes the chunks to the available cores and
+        processes them in parallel. Because the function lives at module level, only its name and the chunk are
+        pickled, not the whole FolderCrawler with its dataframes.
+
+        :param function: Module level function which takes a list of items and returns a tuple of parallel arrays.
+        :param items: The items that need to be processed.
+        :param chunksize: The number of items in one chunk.
+        """
+        chunks = [items[index:index + chunksize] for index in range(0, len(items), max(1, chunksize))]
+        if not chunks:
+            return ()
+
+        with Pool() as pool:
+            batches = pool.map(function, chunks)
+        return tuple(np.concatenate(column) for column in zip(*batches))
 
     @staticmethod
     def _crawl_shallow(path: str) -> list[tuple[str, bool]]:
@@ -594,13 +1310,7 @@ class FolderCrawler:
 
         :param path: The path of the folder that needs to be crawled.
         """
-        result = []
-        items = os.listdir(path)
-        for item in items:
-            item_path = os.path.join(path, item)
-            is_folder = os.path.isdir(item_path)
-            result.append((item_path, is_folder))
-        return result
+        return [record[:RECORD_SIZE] for record in scan_items(path, go_deep=False)]
 
     @staticmethod
     def _crawl_deep(path: str) -> list[tuple[str, bool]]:
@@ -609,28 +1319,33 @@ class FolderCrawler:
 
         :param path: The path of the folder that needs to be crawled.
         """
-        result = []
-        for root, folders, files in os.walk(path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                result.append((file_path, False))
-            for folder in folders:
-                folder_path = os.path.join(root, folder)
-                result.append((folder_path, True))
-        return result
+        return [record[:RECORD_SIZE] for record in scan_items(path, go_deep=True)]
+
+    @staticmethod
+    def _save_snapshot_as_csv(snapshot_path: str, path: str) -> None:
+        """
+        This method is used to export the snapshot into a csv file one row group after another.
+
+        :param snapshot_path: The path of the snapshot.
+        :param path: The path of the csv file.
+        """
+        def write(temp_path: str) -> None:
+            with open(temp_path, FileOps.WRITE_MODE, encoding=FileOps.ENCODING, newline="") as file:
+                for number, container in enumerate(iter_snapshot(snapshot_path)):
+                    container.to_csv(file, header=number == 0, index=False)
+
+        write_atomically(path, write)
 
     @staticmethod
     def _save_result(path: str, container: pd.DataFrame) -> None:
         """
-        This method is used to save the dataframe into a csv file.
+        This method is used to save the dataframe into a csv file. An existing file is replaced only when the new one
+        is completely written.
 
         :param path: The path of the file where the dataframe needs to be saved.
         :param container: Dataframe that needs to be saved.
         """
-
-        if os.path.exists(path):
-            os.remove(path)
-        container.to_csv(path, index=False)
+        write_atomically(path, lambda temp_path: container.to_csv(temp_path, index=False))
 
     @staticmethod
     def _get_size_of_item(path: str, get_size_folder: bool) -> int | float:
@@ -646,10 +1361,7 @@ class FolderCrawler:
         size_bytes = 0
         try:
             if get_size_folder:
-                for root, _, files in os.walk(path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        size_bytes += os.path.getsize(file_path)
+                size_bytes, _, _ = scan_tree_totals(path)
             else:
                 # get size of file
                 size_bytes = os.path.getsize(path)
@@ -657,6 +1369,18 @@ class FolderCrawler:
             return NONE
         return size_bytes
 
+    @staticmethod
+    def _iter_batches(items: Iterable, batch_size: int) -> Iterator[list]:
+        """
+        Yields the items in lists of at most batch_size items, as soon as each list is full.
+
+        :param items: The items that need to be batched.
+        :param batch_size: The highest number of items in one list.
+        """
+        items = iter(items)
+        while batch := list(islice(items, batch_size)):
+            yield batch
+
     @staticmethod
     def _tabulate_data(container: pd.DataFrame) -> str:
         """
@@ -682,8 +1406,8 @@ class FolderCrawler:
     @staticmethod
     def _filter_subdirectories(container: pd.DataFrame, column: str) -> pd.DataFrame:
         """
-        This method filters a given row if a path at that row is contained
-        as a substring in any other path in the dataframe.
+        This method filters a given row if a path at that row is a parent folder of any other path in the dataframe.
+        Only whole path components are compared, therefore "C:/Users/a" is not a parent of "C:/Users/ab".
 
         Example when we want to filter entries in column "Path":
         index, Path, Column2, Column3, ...
@@ -691,28 +1415,27 @@ class FolderCrawler:
         1, C:/Users/Subfolder, X, X, ...            <- This row will be filtered.
         2, C:/Users/Subfolder/Subfolder2, X, X, ...
 
+        The separators are replaced by the NUL character, which sorts before any other character. After sorting,
+        all paths inside a folder come right after the folder, so it is enough to compare each path with the next one.
+        The rows which are kept stay in their original order.
 
         :param container: The dataframe to filter.
-        """
-
-        # Sort dataframe by paths column to ensure that shorter paths come before their potential subdirectories
-        container = container.sort_values(by=column, ascending=True)
-
-        # get only the paths from the dataframe as a list
-        paths = container[column].tolist().copy()
-
-        # Remove paths that are subdirectories of other paths
-        for i, path in enumerate(paths):
-            path: str
-            # Here we are checking if a previous path is a substring of any following path in the list
-            for path_following in paths[i + 1:]:
-                if path in path_following:
-                    # Drop complete row in original dataframe
-                    filter_ = container[column] == path
-                    index = container[filter_].index
-                    container.drop(index, inplace=True)
-
-        return container
+        :param column: The column with the paths.
+        """
+        paths = container[column].str.replace("\\", "/", regex=False).str.rstrip("/")
+        keys = paths.str.replace("/", "\0", regex=False)
+        order = np.argsort(keys.to_numpy(dtype=object), kind="stable")
+        sorted_keys = keys.to_numpy(dtype=object)[order]
+
+        # A path is filtered if the next path is inside of it, or if the next path is the same path.
+        is_parent = np.zeros(len(sorted_keys), dtype=bool)
+        is_parent[:-1] = [following == key or following.startswith(key + "\0")
+                          for key, following in zip(sorted_keys[:-1], sorted_keys[1:])]
+
+        # The mask is put back to the original positions, so the rows keep their order.
+        mask = np.empty(len(order), dtype=bool)
+        mask[order] = ~is_parent
+        return container[mask]
 
     @staticmethod
     def _get_time_performance(timer_start) -> float:
@@ -0,0 +1,114 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+from collections import defaultdict
+from content_search import map_in_pool
+from duplicates import hash_file, HASH_DIGEST_SIZE
+from structures import ColumnNames as CN
+
+# region Constants
+# The digest of a folder is the hash of the sorted entries of its direct children. A file entry holds the name, the
+# size, the last change and optionally the hash of the content of the file. A folder entry holds the name and the
+# digest of the sub-folder. Two folders have the same digest only if the whole trees below them are the same.
+FIELD_SEPARATOR = "\0"
+# Names cannot contain the NUL character, so the end of an entry cannot be mistaken for a part of a name.
+ENTRY_END = "\0\n"
+ROOT_FOLDER = ""
+STRING_ENCODING = "utf-8"
+STRING_ERRORS = "surrogateescape"
+
+
+# endregion
+
+# region Public functions
+def get_folder_digests(files: pd.DataFrame, hash_contents: bool = False, workers: int = 1,
+                       chunksize: int = 32) -> pd.DataFrame:
+    """
+    Returns the digest of every folder which contains a file, directly or in a sub-folder. The digests are computed
+    bottom-up, from the deepest folders to the root, whose relative path is an empty string.
+
+    :param files: The dataframe with the crawled files and their paths relative to the crawled root.
+    :param hash_contents: A boolean value that determines whether the hashes of the contents of files are included
+    in the digests. Without them, files are compared only by their sizes and last changes.
+    :param workers: The number of processes which hash the files in parallel.
+    :param chunksize: The number of paths which are sent to the pool in one task.
+    """
+    changes = files[CN.CHANGED].to_numpy(dtype="datetime64[ns]").view(np.int64).tolist()
+    sizes = files[CN.SIZE_BYTES].tolist()
+    if hash_contents:
+        contents = list(map_in_pool(hash_file, list(zip(files[CN.PATH], sizes)), workers, chunksize))
+    else:
+        contents = [""] * len(files)
+
+    entries = defaultdict(list)
+    for relative_path, size, changed, content in zip(files[CN.RELATIVE_PATH], sizes, changes, contents):
+        parent, _, name = relative_path.rpartition(os.sep)
+        entries[parent].append(FIELD_SEPARATOR.join((name, str(size), str(changed), content or "")) + ENTRY_END)
+    # Folders which contain only sub-folders have no file entries, but they need a digest as well.
+    for folder in list(entries):
+        while folder != ROOT_FOLDER:
+            folder = folder.rpartition(os.sep)[0]
+            entries.setdefault(folder, [])
+    entries.setdefault(ROOT_FOLDER, [])
+
+    digests = {}
+    for folder in sorted(entries, key=get_folder_depth, reverse=True):
+        hasher = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+        for entry in sorted(entries[folder]):
+            hasher.update(entry.encode(STRING_ENCODING, STRING_ERRORS))
+        digests[folder] = hasher.hexdigest()
+        if folder != ROOT_FOLDER:
+            parent, _, name = folder.rpartition(os.sep)
+            entries[parent].append(FIELD_SEPARATOR.join((name + os.sep, digests[folder])) + ENTRY_END)
+
+    digests = pd.DataFrame({CN.RELATIVE_PATH: list(digests), CN.DIGEST: list(digests.values())})
+    return digests.sort_values(CN.RELATIVE_PATH).reset_index(drop=True)
+
+
+def get_changed_folders(previous_digests: pd.DataFrame, current_digests: pd.DataFrame) -> pd.Series:
+    """
+    Returns the relative paths of the folders whose digests differ, or which are only in one of the crawls.
+    Files of all the other folders are the same in both crawls, so they do not have to be compared.
+
+    :param previous_digests: The digests of the folders of the previous crawl, as returned by get_folder_digests.
+    :param current_digests: The digests of the folders of the current crawl, as returned by get_folder_digests.
+    """
+    if get_root_digest(previous_digests) == get_root_digest(current_digests):
+        return pd.Series([], dtype=object)
+    merged = previous_digests.merge(current_digests, on=CN.RELATIVE_PATH, how="outer", suffixes=("_1", "_2"))
+    is_changed = merged[f"{CN.DIGEST}_1"] != merged[f"{CN.DIGEST}_2"]
+    return merged.loc[is_changed, CN.RELATIVE_PATH].reset_index(drop=True)
+
+
+def get_root_digest(digests: pd.DataFrame) -> str | None:
+    """
+    Returns the digest of the crawled root, or None if the dataframe has no digests.
+
+    :param digests: The digests of the folders, as returned by get_folder_digests.
+    """
+    root = digests.loc[digests[CN.RELATIVE_PATH] == ROOT_FOLDER, CN.DIGEST]
+    return root.iat[0] if len(root) else None
+
+
+def get_parent_folders(relative_paths: pd.Series) -> pd.Series:
+    """
+    Returns the relative paths of the folders which contain the items.
+
+    :param relative_paths: The paths of the items relative to the crawled root.
+    """
+    if relative_paths.empty:
+        return relative_paths.copy()
+    return relative_paths.str.rpartition(os.sep)[0]
+
+
+def get_folder_depth(folder: str) -> int:
+    """
+    Returns the number of folders between the crawled root and the folder. The root has the depth 0.
+
+    :param folder: The path of the folder relative to the crawled root.
+    """
+    return folder.count(os.sep) + 1 if folder != ROOT_FOLDER else 0
+
+# endregion
@@ -1,17 +1,18 @@
 from folder_crawler import FolderCrawler
 from cmd_args import command_line_arguments_parser, resolve_default_values
-from structures import SavedCrawls
+from structures import SavedCrawls, ByteSize
 
 # PERFORMANCE (JUST FOR REFERENCE):
 # With multiprocessing implemented in this code, you can crawl bunch of data.
 # 4.57 GHz 8Core (equals 100% utilization at my machine) will crawl and save all paths from 715GB in ~4.5 minutes.
 # Extracted data (in form of text) after the crawl mentioned above were ~260MB.
+# The crawled data are now stored in compressed columnar snapshots (.npz). Csv export is optional.
 
 # HOW TO ADD A NEW COLUMN INTO TABLE:
-# 1. In "folder_crawler.py", add a new item into "COLUMN_NAMES" at last position.
+# 1. In "folder_crawler.py", add a new item into "DATA_COLUMN_NAMES" (and "COLUMN_NAMES" to print it) at last position.
 # 2. Create a new method in "FolderCrawler" class which will compute the new property.
-# 3. In "folder_crawler.py", put the result of the above method at last position into "data_complete" tuple in method
-#  "_get_path_with_properties".
+# 3. In "crawl_results.py", collect the result of the above method into a new column of "CrawlResults" and add it
+#  at last position into the dataframe built in method "get_items".
 
 if __name__ == '__main__':
     ####################################################################################################################
@@ -22,7 +23,14 @@ if __name__ == '__main__':
     # cmd_args = command_line_arguments_parser()
     # default_values = resolve_default_values(cmd_args)
     #
-    # cr = FolderCrawler(path=fr"{cmd_args.path}")
+    # cr = FolderCrawler(path=fr"{cmd_args.path}", workers=cmd_args.workers, export_csv=cmd_args.csv,
+    #                    incremental=cmd_args.incremental, use_index=cmd_args.index,
+    #                    find_duplicates=cmd_args.duplicates, streaming_compare=cmd_args.stream,
+    #                    digest_file_contents=cmd_args.hash, metrics_path=cmd_args.metrics,
+    #                    memory_budget=cmd_args.memory * ByteSize.MEGABYTE)
+    # # Streamed items are written while crawling, nothing is saved.
+    # if cmd_args.output:
+    #     cr.stream_crawl(output_format=cmd_args.output)
     # cr.main(
     #     crawl=cmd_args.crawl,
     #     crawl_deep=not cmd_args.shallow,
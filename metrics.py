@@ -0,0 +1,116 @@
+import json
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Iterator
+
+# region Constants
+METRICS_VERSION = 1
+PROMETHEUS_PREFIX = "folder_crawler_phase"
+# Field of PhaseMetrics -> (suffix of the Prometheus metric, its type, its help text).
+PROMETHEUS_METRICS = {
+    "wall_seconds": ("wall_seconds_total", "counter", "Wall time spent in the phase."),
+    "cpu_seconds": ("cpu_seconds_total", "counter", "CPU time of the crawling process spent in the phase."),
+    "calls": ("calls_total", "counter", "Number of times the phase ran."),
+    "items": ("items_total", "counter", "Number of items processed by the phase."),
+    "items_per_second": ("items_per_second", "gauge", "Items processed per second of wall time."),
+    "bytes_read": ("bytes_read_total", "counter", "Number of bytes read from files by the phase."),
+    "errors": ("errors_total", "counter", "Number of items which the phase could not process."),
+}
+PROMETHEUS_EXTENSION = ".prom"
+
+
+# endregion
+
+@dataclass
+class PhaseMetrics:
+    """
+    Measurements of one phase of the crawl. The values are summed over all the runs of the phase.
+    """
+    phase: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    calls: int = 0
+    items: int = 0
+    bytes_read: int = 0
+    errors: int = 0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.wall_seconds if self.wall_seconds else 0.0
+
+
+class CrawlMetrics:
+    """
+    The CrawlMetrics class collects the measurements of the phases of a crawl, so that a slow phase can be found
+    without a profiler. CPU time is measured only in the crawling process, the time of pool workers is not included.
+    By default, only the CPU time of the thread which runs the phase is counted, so a phase which runs in the
+    background (saving) and the phases which run at the same time in the main thread do not count each other's time.
+    """
+
+    def __init__(self):
+        self.phases: dict[str, PhaseMetrics] = {}
+
+    @contextmanager
+    def measure(self, phase: str, include_threads: bool = False) -> Iterator[PhaseMetrics]:
+        """
+        Measures the wall and CPU time of the block and adds it to the phase. The block can add the numbers of items,
+        read bytes and errors to the yielded PhaseMetrics.
+
+        :param phase: The name of the phase, one of structures.Phase.
+        :param include_threads: A boolean value that determines whether the CPU time of the whole process is counted,
+        for phases which run their own threads. Such a phase must not overlap with other phases, otherwise it counts
+        their CPU time as well.
+        """
+        metrics = self.get_phase(phase)
+        cpu_time = time.process_time if include_threads else time.thread_time
+        wall_start, cpu_start = time.perf_counter(), cpu_time()
+        try:
+            yield metrics
+        finally:
+            metrics.wall_seconds += time.perf_counter() - wall_start
+            metrics.cpu_seconds += cpu_time() - cpu_start
+            metrics.calls += 1
+
+    def get_phase(self, phase: str) -> PhaseMetrics:
+        """
+        Returns the measurements of the phase. A phase which was not measured yet is created with zeros.
+
+        :param phase: The name of the phase.
+        """
+        return self.phases.setdefault(phase, PhaseMetrics(phase))
+
+    def to_dict(self) -> dict:
+        """
+        Returns the measurements as a JSON serializable dictionary.
+        """
+        return {"version": METRICS_VERSION,
+                "phases": [dict(asdict(metrics), items_per_second=metrics.items_per_second)
+                           for metrics in self.phases.values()]}
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the measurements in the Prometheus text format, one metric per field with the phase as a label.
+        """
+        lines = []
+        for field, (suffix, metric_type, help_text) in PROMETHEUS_METRICS.items():
+            name = f"{PROMETHEUS_PREFIX}_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for metrics in self.phases.values():
+                lines.append(f'{name}{{phase="{metrics.phase}"}} {getattr(metrics, field)}')
+        return "\n".join(lines) + "\n"
+
+    def save(self, path: str) -> None:
+        """
+        Saves the measurements into a file. Files ending with PROMETHEUS_EXTENSION are written in the Prometheus text
+        format, all other files as JSON.
+
+        :param path: The path of the file.
+        """
+        with open(path, "w") as file:
+            if path.endswith(PROMETHEUS_EXTENSION):
+                file.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), file, indent=2)
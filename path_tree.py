@@ -0,0 +1,166 @@
+import os
+import numpy as np
+import pandas as pd
+
+from typing import Iterable
+
+# region Constants
+# Parent id of the top directories of the tree. A path without any separator has no directory at all.
+NO_PARENT = -1
+NO_DIRECTORY = -1
+SEPARATOR = os.sep
+
+
+# endregion
+
+class PathTree:
+    """
+    The PathTree class stores the directories of paths as a table of (id, parent id, name), so that a directory
+    prefix shared by many paths is stored only once. A path is then encoded as the id of its directory and its own
+    name, and the full path is rebuilt only when it is needed. A path is split only at SEPARATOR and joined with it
+    again, therefore every path is rebuilt exactly as it was encoded.
+
+    A parent directory always gets a smaller id than its sub-directories, so the directories can be processed level
+    after level with integer operations only.
+    """
+
+    def __init__(self):
+        self.parent_ids: list[int] = []
+        self.names: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._paths: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add_directory(self, path: str) -> int:
+        """
+        Adds the directory and all its parent directories which are not in the tree yet and returns its id.
+
+        :param path: The path of the directory.
+        """
+        missing = []
+        while path not in self._ids:
+            parent, separator, name = path.rpartition(SEPARATOR)
+            missing.append((path, name if separator else path))
+            if not separator:
+                break
+            path = parent
+
+        # Without a separator, the last missing directory is a top directory.
+        directory_id = self._ids.get(path, NO_PARENT)
+        for directory, name in reversed(missing):
+            directory_id = self._add(directory, directory_id, name)
+        return directory_id
+
+    def encode(self, paths: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Adds the directories of the paths to the tree and returns the ids of the directories and the names of the
+        paths. A path without any separator gets NO_DIRECTORY and keeps its whole path as its name. Each distinct
+        directory is looked up only once, not once per path.
+
+        :param paths: Paths of files or folders.
+        """
+        paths = pd.Series(list(paths), dtype=object)
+        if paths.empty:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=object)
+
+        parts = paths.str.rpartition(SEPARATOR)
+        has_directory = (parts[1] != "").to_numpy()
+        codes, directories = pd.factorize(parts[0][has_directory])
+        ids = np.array([self.add_directory(directory) for directory in directories], dtype=np.int64)
+        directory_ids = np.full(len(paths), NO_DIRECTORY, dtype=np.int64)
+        directory_ids[has_directory] = ids[codes]
+        return directory_ids, parts[2].to_numpy(dtype=object)
+
+    def get_paths(self, directory_ids: np.ndarray, names: np.ndarray) -> np.ndarray:
+        """
+        Rebuilds the full paths of the encoded rows. Only the paths of the given rows are built. The paths of the
+        directories are built only once for the whole tree.
+
+        :param directory_ids: The ids of the directories of the rows, as returned by encode.
+        :param names: The names of the rows, as returned by encode.
+        """
+        # The last prefix is empty, so that NO_DIRECTORY (-1) selects it.
+        prefixes = np.array([path + SEPARATOR for path in self.get_directory_paths()] + [""], dtype=object)
+        return prefixes[directory_ids] + np.asarray(names, dtype=object)
+
+    def get_directory_paths(self) -> list[str]:
+        """
+        Returns the full paths of all directories, indexed by their ids. The paths are built once and then only
+        extended by the directories which were added since.
+        """
+        for directory_id in range(len(self._paths), len(self)):
+            parent_id = self.parent_ids[directory_id]
+            name = self.names[directory_id]
+            self._paths.append(name if parent_id == NO_PARENT else self._paths[parent_id] + SEPARATOR + name)
+        return self._paths
+
+    def find_directory(self, path: str) -> int | None:
+        """
+        Returns the id of the directory, or None if it is not in the tree.
+
+        :param path: The path of the directory.
+        """
+        return self._ids.get(path)
+
+    def aggregate(self, directory_ids: np.ndarray, values: np.ndarray, ufunc: np.ufunc = np.add,
+                  initial: float = 0) -> np.ndarray:
+        """
+        Returns the values of the rows reduced by the ufunc for every directory, including the rows in all its
+        sub-directories. Rows without a directory are not counted.
+
+        :param directory_ids: The ids of the directories of the rows, as returned by encode.
+        :param values: The values of the rows.
+        :param ufunc: The reduction, for example np.add for sums or np.fmax for maximums which ignore NaN.
+        :param initial: The value of directories without any row.
+        """
+        has_directory = directory_ids != NO_DIRECTORY
+        totals = np.full(len(self), initial, dtype=np.float64)
+        ufunc.at(totals, directory_ids[has_directory], np.asarray(values, dtype=np.float64)[has_directory])
+        parent_ids = np.array(self.parent_ids, dtype=np.int64)
+        depths = self.get_depths()
+        # The deepest directories are added to their parents first, so that every total reaches the top.
+        for depth in range(depths.max(initial=0), 0, -1):
+            level = np.flatnonzero(depths == depth)
+            ufunc.at(totals, parent_ids[level], totals[level])
+        return totals
+
+    def get_depths(self) -> np.ndarray:
+        """
+        Returns the number of parent directories of every directory in the tree.
+        """
+        depths = np.zeros(len(self), dtype=np.int64)
+        # Parents have smaller ids, so their depths are always known before the depths of their sub-directories.
+        for directory_id, parent_id in enumerate(self.parent_ids):
+            if parent_id != NO_PARENT:
+                depths[directory_id] = depths[parent_id] + 1
+        return depths
+
+    @classmethod
+    def from_lists(cls, parent_ids: list[int], names: list[str]) -> "PathTree":
+        """
+        Creates the tree from the directory table, as stored by a snapshot.
+
+        :param parent_ids: The ids of the parent directories, indexed by the ids of the directories.
+        :param names: The names of the directories, indexed by their ids.
+        """
+        tree = cls()
+        for parent_id, name in zip(parent_ids, names):
+            tree._add(name if parent_id == NO_PARENT else tree.get_directory_paths()[parent_id] + SEPARATOR + name,
+                      parent_id, name)
+        return tree
+
+    def _add(self, path: str, parent_id: int, name: str) -> int:
+        """
+        Adds one directory whose parent is already in the tree and returns its id.
+
+        :param path: The full path of the directory.
+        :param parent_id: The id of its parent directory or NO_PARENT.
+        :param name: The name of the directory.
+        """
+        directory_id = len(self.names)
+        self._ids[path] = directory_id
+        self.parent_ids.append(parent_id)
+        self.names.append(name)
+        return directory_id
@@ -0,0 +1,357 @@
+import heapq
+import json
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+
+from background_writer import TEMP_PATH
+from itertools import islice
+from path_tree import PathTree
+from typing import Iterator
+
+# region Constants
+# A snapshot is a compressed .npz archive. The rows are split into row groups and every column of every row group is
+# stored as its own member, therefore a column can be read without decompressing the others and the rows can be read
+# one row group after another. The member SCHEMA_MEMBER holds the names and the types of the columns and the numbers
+# of rows in the row groups. Snapshots of version 1 have all rows in one member per column.
+SNAPSHOT_VERSION = 3
+SCHEMA_MEMBER = "schema"
+COLUMN_MEMBER = "column_{}"
+ROW_GROUP_MEMBER = "column_{}_{}"
+# A path column is stored as a directory table of the whole snapshot and, in every row group, the ids of the
+# directories of the rows (in ROW_GROUP_MEMBER) and their names. Every shared directory prefix is then stored once.
+NAMES_MEMBER = "names_{}_{}"
+TREE_PARENTS_MEMBER = "tree_parents_{}"
+TREE_NAMES_MEMBER = "tree_names_{}"
+ROW_GROUP_SIZE = 100_000
+# numpy stores every array of an .npz archive as a .npy member.
+MEMBER_EXTENSION = ".npy"
+
+STRING_TYPE = "string"
+PATH_TYPE = "path"
+DATETIME_TYPE = "datetime64[ns]"
+NUMERIC_TYPES = ("int64", "float64", "bool")
+
+# Paths cannot contain the NUL character, so all strings of a column are joined with it into one byte array.
+STRING_SEPARATOR = "\0"
+STRING_ENCODING = "utf-8"
+# Paths which are not valid UTF-8 are kept by os as surrogates, this error handler keeps them as they are.
+STRING_ERRORS = "surrogateescape"
+
+
+# endregion
+
+class SnapshotWriter:
+    """
+    The SnapshotWriter class writes a snapshot row group by row group, so that a snapshot does not have to be in the
+    memory at once. The snapshot is written under a temporary name and renamed when it is closed.
+    """
+
+    def __init__(self, path: str, metadata: dict = None, row_group_size: int = None, path_columns: list[str] = ()):
+        self.path = path
+        self.metadata = metadata or {}
+        self.row_group_size = row_group_size or ROW_GROUP_SIZE
+        self.path_columns = path_columns
+        self.columns = None
+        self.row_groups = []
+        # Directory tables of the path columns, by the indexes of the columns.
+        self.trees: dict[int, PathTree] = {}
+        self._temp_path = TEMP_PATH.format(path)
+        self._archive = zipfile.ZipFile(self._temp_path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._archive.close()
+            os.remove(self._temp_path)
+
+    def write(self, container: pd.DataFrame) -> None:
+        """
+        Appends the rows of the dataframe as new row groups. The first written dataframe determines the columns and
+        their types, all the next ones must have the same columns.
+
+        :param container: Dataframe that needs to be saved. Its columns must hold strings, numbers or datetimes.
+        """
+        if self.columns is None:
+            self.columns = [{"name": str(name), "type": get_column_type(column)} for name, column in container.items()]
+            for index, column in enumerate(self.columns):
+                if column["name"] in self.path_columns and column["type"] == STRING_TYPE:
+                    column["type"] = PATH_TYPE
+                    self.trees[index] = PathTree()
+        for start in range(0, len(container), self.row_group_size):
+            rows = container.iloc[start:start + self.row_group_size]
+            group = len(self.row_groups)
+            for index, column in enumerate(self.columns):
+                if column["type"] == PATH_TYPE:
+                    directory_ids, names = self.trees[index].encode(rows.iloc[:, index].tolist())
+                    self._write_member(ROW_GROUP_MEMBER.format(index, group), directory_ids)
+                    self._write_member(NAMES_MEMBER.format(index, group),
+                                       _encode_column(pd.Series(names), STRING_TYPE))
+                else:
+                    self._write_member(ROW_GROUP_MEMBER.format(index, group),
+                                       _encode_column(rows.iloc[:, index], column["type"]))
+            self.row_groups.append(len(rows))
+
+    def close(self) -> None:
+        """
+        Writes the directory tables and the schema and renames the complete snapshot to its path.
+        """
+        for index, tree in self.trees.items():
+            self._write_member(TREE_PARENTS_MEMBER.format(index), np.array(tree.parent_ids, dtype=np.int64))
+            self._write_member(TREE_NAMES_MEMBER.format(index), _encode_column(pd.Series(tree.names), STRING_TYPE))
+        schema = {"version": SNAPSHOT_VERSION, "rows": sum(self.row_groups), "row_groups": self.row_groups,
+                  "columns": self.columns or [], "metadata": self.metadata}
+        self._write_member(SCHEMA_MEMBER, np.frombuffer(json.dumps(schema).encode(STRING_ENCODING), dtype=np.uint8))
+        self._archive.close()
+        os.replace(self._temp_path, self.path)
+
+    def _write_member(self, name: str, array: np.ndarray) -> None:
+        """
+        Writes the array as a member of the archive, the same way as numpy.savez_compressed does.
+
+        :param name: The name of the member.
+        :param array: The array that needs to be written.
+        """
+        with self._archive.open(f"{name}{MEMBER_EXTENSION}", "w", force_zip64=True) as file:
+            np.lib.format.write_array(file, array, allow_pickle=False)
+
+
+# region Public functions
+def save_snapshot(path: str, container: pd.DataFrame, metadata: dict = None, row_group_size: int = None,
+                  path_columns: list[str] = ()) -> None:
+    """
+    Saves the dataframe as a compressed columnar snapshot. The snapshot is replaced only when it is completely written.
+
+    :param path: The path of the snapshot. It must end with ".npz".
+    :param container: Dataframe that needs to be saved. Its columns must hold strings, numbers or datetimes.
+    :param metadata: Optional JSON serializable dictionary which is stored together with the schema.
+    :param row_group_size: The highest number of rows in one row group. If None, ROW_GROUP_SIZE is used.
+    :param path_columns: Names of the string columns with paths, which are stored tree-encoded.
+    """
+    with SnapshotWriter(path, metadata, row_group_size, path_columns) as writer:
+        writer.write(container)
+
+
+def merge_sorted_snapshots(paths: list[str], path: str, column: str, metadata: dict = None) -> int:
+    """
+    Merges snapshots which are sorted by the column into one snapshot sorted by the same column and returns its
+    number of rows. The snapshots are read one row group after another, so only about one row group of each of them
+    is in the memory at a time. Rows with equal values keep the order of the snapshots.
+
+    :param paths: The paths of the sorted snapshots. All of them must have the same columns.
+    :param path: The path of the merged snapshot.
+    :param column: The name of the column by which the snapshots are sorted.
+    :param metadata: Optional JSON serializable dictionary which is stored together with the schema.
+    """
+    schemas = [read_snapshot_schema(snapshot_path) for snapshot_path in paths]
+    columns = schemas[0]["columns"] if schemas else []
+    names = [schema_column["name"] for schema_column in columns]
+    key = names.index(column) if names else 0
+
+    path_columns = [schema_column["name"] for schema_column in columns if schema_column["type"] == PATH_TYPE]
+
+    rows = 0
+    with SnapshotWriter(path, metadata, path_columns=path_columns) as writer:
+        merged = heapq.merge(*(_iter_rows(snapshot_path, names) for snapshot_path in paths),
+                             key=lambda row: row[key])
+        while group := list(islice(merged, ROW_GROUP_SIZE)):
+            writer.write(_get_dataframe_from_rows(group, columns))
+            rows += len(group)
+        if not rows:
+            writer.write(_get_dataframe_from_rows([], columns))
+    return rows
+
+
+def load_snapshot(path: str, columns: list[str] = None) -> pd.DataFrame:
+    """
+    Loads a snapshot into a dataframe. Only the requested columns are decompressed and decoded.
+
+    :param path: The path of the snapshot.
+    :param columns: Names of the columns that need to be loaded. If None, all columns are loaded.
+    """
+    row_groups = list(iter_snapshot(path, columns))
+    if len(row_groups) == 1:
+        return row_groups[0]
+    return pd.concat(row_groups, ignore_index=True)
+
+
+def iter_snapshot(path: str, columns: list[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yields the snapshot one row group after another, so that only one row group is in the memory at a time.
+    A snapshot without rows yields one empty dataframe with the columns. Full paths of the path columns are rebuilt
+    only for the row group which is yielded.
+
+    :param path: The path of the snapshot.
+    :param columns: Names of the columns that need to be loaded. If None, all columns are loaded.
+    """
+    with np.load(path) as archive:
+        schema = _decode_schema(archive[SCHEMA_MEMBER])
+        indexes = {column["name"]: index for index, column in enumerate(schema["columns"])}
+        names = list(indexes) if columns is None else list(columns)
+
+        missing = [name for name in names if name not in indexes]
+        if missing:
+            raise KeyError(f"Columns {missing} are not in the snapshot '{path}'.")
+
+        trees = {indexes[name]: _load_tree(archive, indexes[name]) for name in names
+                 if schema["columns"][indexes[name]]["type"] == PATH_TYPE}
+        for group, rows in enumerate(schema["row_groups"] or [0]):
+            data = {}
+            for name in names:
+                index = indexes[name]
+                column_type = schema["columns"][index]["type"]
+                array = archive[_get_member(schema, index, group)] if rows else np.array([], dtype=np.int64)
+                if column_type == PATH_TYPE:
+                    names_array = archive[NAMES_MEMBER.format(index, group)] if rows else array
+                    data[name] = trees[index].get_paths(array, _decode_column(names_array, STRING_TYPE, rows))
+                else:
+                    data[name] = _decode_column(array, column_type, rows)
+            yield pd.DataFrame(data, columns=names)
+
+
+def read_snapshot_schema(path: str) -> dict:
+    """
+    Reads only the schema of a snapshot: its version, its number of rows, the names and types of its columns and the
+    metadata which were saved with it.
+
+    :param path: The path of the snapshot.
+    """
+    with np.load(path) as archive:
+        return _decode_schema(archive[SCHEMA_MEMBER])
+
+
+def get_column_type(column: pd.Series) -> str:
+    """
+    Returns the type under which the column is stored in a snapshot.
+
+    :param column: The column whose type is needed.
+    """
+    if pd.api.types.is_datetime64_any_dtype(column.dtype):
+        return DATETIME_TYPE
+    if pd.api.types.is_bool_dtype(column.dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(column.dtype):
+        return "int64"
+    if pd.api.types.is_float_dtype(column.dtype):
+        return "float64"
+    if column.map(type).eq(str).all():
+        return STRING_TYPE
+    raise TypeError(f"Column '{column.name}' with dtype '{column.dtype}' cannot be stored in a snapshot.")
+
+
+# endregion
+
+# region Private functions
+def _encode_column(column: pd.Series, column_type: str) -> np.ndarray:
+    """
+    Converts the column into the numpy array which is stored in the snapshot.
+
+    :param column: The column that needs to be encoded.
+    :param column_type: The type of the column as returned by get_column_type.
+    """
+    if column_type == STRING_TYPE:
+        joined = STRING_SEPARATOR.join(column.tolist()).encode(STRING_ENCODING, STRING_ERRORS)
+        return np.frombuffer(joined, dtype=np.uint8)
+    if column_type == DATETIME_TYPE:
+        return column.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return column.to_numpy(dtype=column_type)
+
+
+def _decode_column(array: np.ndarray, column_type: str, rows: int) -> np.ndarray | list[str]:
+    """
+    Converts the stored numpy array back into the values of the column.
+
+    :param array: The array read from the snapshot.
+    :param column_type: The type of the column as stored in the schema.
+    :param rows: The number of rows in the snapshot.
+    """
+    if column_type == STRING_TYPE:
+        if not rows:
+            return []
+        return array.tobytes().decode(STRING_ENCODING, STRING_ERRORS).split(STRING_SEPARATOR)
+    if column_type == DATETIME_TYPE:
+        return array.view("datetime64[ns]")
+    if column_type in NUMERIC_TYPES:
+        return array.astype(column_type, copy=False)
+    raise TypeError(f"Unknown column type '{column_type}' in the snapshot.")
+
+
+def _decode_schema(array: np.ndarray) -> dict:
+    """
+    Decodes the schema stored in the snapshot and checks its version.
+
+    :param array: The array with the JSON schema.
+    """
+    schema = json.loads(array.tobytes().decode(STRING_ENCODING))
+    schema.setdefault("metadata", {})
+    # Snapshots of version 1 have all rows in one row group.
+    schema.setdefault("row_groups", [schema["rows"]] if schema["rows"] else [])
+    if schema["version"] > SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot version {schema['version']} is newer than the supported {SNAPSHOT_VERSION}.")
+    return schema
+
+
+def _iter_rows(path: str, names: list[str]) -> Iterator[tuple]:
+    """
+    Yields the rows of the snapshot as tuples, one row group after another. Datetimes are yielded as nanoseconds,
+    so that no Python object is created for them.
+
+    :param path: The path of the snapshot.
+    :param names: Names of the columns in the order in which they are in the tuples.
+    """
+    for group in iter_snapshot(path, names):
+        columns = [group[name].to_numpy() for name in names]
+        yield from zip(*(column.view(np.int64).tolist() if column.dtype.kind == "M" else column.tolist()
+                         for column in columns))
+
+
+def _get_dataframe_from_rows(rows: list[tuple], columns: list[dict]) -> pd.DataFrame:
+    """
+    Converts the rows yielded by _iter_rows back into a dataframe with the types of the columns in the schema.
+
+    :param rows: The rows of the dataframe.
+    :param columns: The names and the types of the columns, as stored in the schema.
+    """
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    data = {}
+    for column, column_values in zip(columns, values):
+        if column["type"] == DATETIME_TYPE:
+            data[column["name"]] = np.array(column_values, dtype=np.int64).view("datetime64[ns]")
+        elif column["type"] in (STRING_TYPE, PATH_TYPE):
+            data[column["name"]] = pd.Series(column_values, dtype=object)
+        else:
+            data[column["name"]] = np.array(column_values, dtype=column["type"])
+    return pd.DataFrame(data)
+
+
+def _load_tree(archive: np.lib.npyio.NpzFile, index: int) -> PathTree:
+    """
+    Reads the directory table of the path column.
+
+    :param archive: The opened snapshot.
+    :param index: The index of the path column.
+    """
+    names = archive[TREE_NAMES_MEMBER.format(index)]
+    parent_ids = archive[TREE_PARENTS_MEMBER.format(index)]
+    return PathTree.from_lists(parent_ids.tolist(), _decode_column(names, STRING_TYPE, len(parent_ids)))
+
+
+def _get_member(schema: dict, index: int, group: int) -> str:
+    """
+    Returns the name of the member with the column of the row group.
+
+    :param schema: The decoded schema of the snapshot.
+    :param index: The index of the column.
+    :param group: The index of the row group.
+    """
+    if schema["version"] == 1:
+        return COLUMN_MEMBER.format(index)
+    return ROW_GROUP_MEMBER.format(index, group)
+
+
+# endregion
@@ -0,0 +1,75 @@
+import pandas as pd
+
+from typing import Callable, Iterable, TextIO
+from structures import ColumnNames as CN
+
+# region Constants
+# All item types are written into one csv stream, so it has the columns of folders, which include those of files.
+CSV_COLUMNS = [CN.ITEM_TYPE, CN.PATH, CN.CHANGED, CN.SIZE_BYTES, CN.FILE_COUNT, CN.NEWEST_CHANGE]
+NDJSON_DATE_FORMAT = "iso"
+NDJSON_DATE_UNIT = "us"
+
+
+# endregion
+
+# region Public functions
+def write_table(batches: Iterable[tuple[str, pd.DataFrame]], file: TextIO,
+                tabulate_batch: Callable[[pd.DataFrame], str]) -> int:
+    """
+    Writes every batch as a table as soon as it comes, with the item type above the first batch of each type.
+    The rows are numbered through all batches of the type. Returns the number of written rows.
+
+    :param batches: Item types and dataframes of the crawled items, as yielded by FolderCrawler.iter_crawl.
+    :param file: The text stream where the tables are written.
+    :param tabulate_batch: Function which returns the dataframe as a printable table.
+    """
+    rows = 0
+    item_type_rows = 0
+    last_item_type = None
+    for item_type, batch in batches:
+        if item_type != last_item_type:
+            print(item_type.upper(), file=file)
+            last_item_type, item_type_rows = item_type, 0
+        batch = batch.set_axis(range(item_type_rows, item_type_rows + len(batch)))
+        print(tabulate_batch(batch), file=file, flush=True)
+        item_type_rows += len(batch)
+        rows += len(batch)
+    return rows
+
+
+def write_csv(batches: Iterable[tuple[str, pd.DataFrame]], file: TextIO) -> int:
+    """
+    Writes the batches as one csv stream with the columns CSV_COLUMNS. Returns the number of written rows.
+
+    :param batches: Item types and dataframes of the crawled items, as yielded by FolderCrawler.iter_crawl.
+    :param file: The text stream where the csv is written.
+    """
+    rows = 0
+    for item_type, batch in batches:
+        batch = batch.assign(**{CN.ITEM_TYPE: item_type}).reindex(columns=CSV_COLUMNS)
+        batch.to_csv(file, header=rows == 0, index=False)
+        file.flush()
+        rows += len(batch)
+    return rows
+
+
+def write_ndjson(batches: Iterable[tuple[str, pd.DataFrame]], file: TextIO) -> int:
+    """
+    Writes every crawled item as one JSON object per line. Missing values are written as null. Returns the number
+    of written rows.
+
+    :param batches: Item types and dataframes of the crawled items, as yielded by FolderCrawler.iter_crawl.
+    :param file: The text stream where the lines are written.
+    """
+    rows = 0
+    for item_type, batch in batches:
+        batch = batch.assign(**{CN.ITEM_TYPE: item_type})
+        batch = batch[[CN.ITEM_TYPE, *batch.columns.drop(CN.ITEM_TYPE)]]
+        lines = batch.to_json(orient="records", lines=True, date_format=NDJSON_DATE_FORMAT,
+                              date_unit=NDJSON_DATE_UNIT)
+        file.write(lines if lines.endswith("\n") else lines + "\n")
+        file.flush()
+        rows += len(batch)
+    return rows
+
+# endregion
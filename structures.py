@@ -10,6 +10,17 @@ class ColumnNames:
     SIZE_READABLE = "Size readable"
     SIZE_BYTES = "Size bytes"
     FILE_NAME = "File Name"
+    FILE_COUNT = "Files"
+    NEWEST_CHANGE = "Newest change"
+    DUPLICATE_GROUP = "Duplicate group"
+    STATUS = "Status"
+    RELATIVE_PATH = "Relative path"
+    PREVIOUS_RELATIVE_PATH = "Previous relative path"
+    PREVIOUS_PATH = "Previous path"
+    PREVIOUS_CHANGE = "Previous change"
+    PREVIOUS_SIZE = "Previous size bytes"
+    DIGEST = "Digest"
+    ITEM_TYPE = "Type"
 
 
 @dataclass
@@ -20,27 +31,86 @@ class ItemType:
     SKIPPED = "skipped_items"
 
 
+@dataclass
+class DiffStatus:
+    ADDED = "added"
+    REMOVED = "removed"
+    MODIFIED = "modified"
+    MOVED = "moved"
+
+
+@dataclass
+class Phase:
+    WALK = "walk"
+    STAT = "stat"
+    DATAFRAME = "dataframe"
+    SAVE = "save"
+    LOAD = "load"
+    FILTER = "filter"
+    RENDER = "render"
+    CONTENT_SEARCH = "content_search"
+    DUPLICATES = "duplicates"
+    COMPARE = "compare"
+    COPY = "copy"
+
+
+@dataclass
+class CopyStatus:
+    COPIED = "copied"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+@dataclass
+class OutputFormat:
+    TABLE = "table"
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
 @dataclass
 class SavedCrawls:
     ROOT = "saved_crawls"
+    # Csv files are just an optional export. The crawled data are stored in columnar snapshots.
     EXTENSION = ".txt"
+    SNAPSHOT_EXTENSION = ".npz"
     FILES = os.path.join(ROOT, f"{ItemType.FILES}{EXTENSION}")
-    FILES_TEMP_1 = os.path.join(ROOT, f"{ItemType.FILES}1{EXTENSION}")
-    FILES_TEMP_2 = os.path.join(ROOT, f"{ItemType.FILES}2{EXTENSION}")
     FOLDERS = os.path.join(ROOT, f"{ItemType.FOLDERS}{EXTENSION}")
     SKIPPED = os.path.join(ROOT, f"{ItemType.SKIPPED}{EXTENSION}")
+    FILES_SNAPSHOT = os.path.join(ROOT, f"{ItemType.FILES}{SNAPSHOT_EXTENSION}")
+    FOLDERS_SNAPSHOT = os.path.join(ROOT, f"{ItemType.FOLDERS}{SNAPSHOT_EXTENSION}")
+    SKIPPED_SNAPSHOT = os.path.join(ROOT, f"{ItemType.SKIPPED}{SNAPSHOT_EXTENSION}")
+    INDEX = os.path.join(ROOT, "crawl_index.sqlite")
+    CONTENT_INDEX = os.path.join(ROOT, "content_index.sqlite")
+    HASH_CACHE = os.path.join(ROOT, "hash_cache.sqlite")
+    DIFFERENCES = os.path.join(ROOT, "differences")
+    # Every crawled root has its own snapshot of files and digests, numbered from 1 in the order of the roots.
+    FILES_TEMP = os.path.join(ROOT, f"{ItemType.FILES}{{}}{SNAPSHOT_EXTENSION}")
+    DIGESTS_TEMP = os.path.join(ROOT, f"digests{{}}{SNAPSHOT_EXTENSION}")
+    # Chunks of files which a crawl with a memory budget spilled to the disk, before they are merged into FILES_SNAPSHOT.
+    SPILL = os.path.join(ROOT, "spill")
+    SPILL_CHUNK = os.path.join(SPILL, f"{ItemType.FILES}_{{}}{SNAPSHOT_EXTENSION}")
 
 
 @dataclass
 class Messages:
     DEEP_CRAWL = "Option chosen: DEEP CRAWL -> Going deep into sub-folders."
     SHALLOW_CRAWL = "Option chosen: SHALLOW CRAW -> Staying in the inputted folder."
+    INCREMENTAL_CRAWL = "Reusing the previous crawl. Only changed folders are listed again."
     CRAWLING_TIME = "THE CRAWLING PROCESS TOOK:"
     NR_OF_CRAWLED_DATA = "TOTAL CRAWLED DATA:"
-    SAVING_RESULTS = "Saving into csv file:"
+    SAVING_IN_BACKGROUND = "Saving the results in the background."
+    BUILDING_INDEX = "Building the crawl index."
+    QUERYING_INDEX = "Querying the crawl index."
+    UPDATING_CONTENT_INDEX = "Updating the index of file contents."
+    FINDING_DUPLICATES = "Finding duplicate files."
+    DUPLICATES = "DUPLICATE FILES:"
+    RECLAIMABLE_SIZE = "SIZE RECLAIMABLE BY REMOVING DUPLICATES:"
     DATAFRAME_PREPARATION = "Preparing dataframes."
+    MERGING_SPILLED_FILES = "Merging the chunks of files spilled to the disk, number of chunks:"
     STARTING_MULTI_PROCESSING = "Starting multi-processing pool. The crawling starts now."
     READING_CONTENT_OF_FILES = "READING CONTENT OF FILES:"
+    COPYING_DIFFERENCES = "Copying the differences into:"
     SEPARATOR = "-" * 120
 
 
@@ -0,0 +1,65 @@
+import os
+import threading
+import unittest
+
+from background_writer import BackgroundWriter, write_atomically, TEMP_PATH
+
+# region constants
+TEMP_FILE = "temp_background_file.txt"
+OLD_TEXT = "Old content."
+NEW_TEXT = "New content."
+
+
+# endregion
+
+# region Unit tests
+class BackgroundWriterTestsBackgroundWriter(unittest.TestCase):
+    def test_tasks_run_in_order_in_another_thread(self):
+        writer = BackgroundWriter()
+        calls = []
+        for number in range(5):
+            writer.submit(lambda value: calls.append((value, threading.current_thread())), number)
+        writer.wait()
+        self.assertListEqual([value for value, _ in calls], list(range(5)))
+        self.assertNotIn(threading.current_thread(), [thread for _, thread in calls])
+
+    def test_exception_of_task_is_raised_by_wait(self):
+        writer = BackgroundWriter()
+        writer.submit(lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            writer.wait()
+        # The failed task is not raised again.
+        writer.wait()
+
+
+class BackgroundWriterTestsWriteAtomically(unittest.TestCase):
+    def setUp(self):
+        with open(TEMP_FILE, "w") as file:
+            file.write(OLD_TEXT)
+
+    def tearDown(self):
+        os.remove(TEMP_FILE)
+
+    def test_file_is_replaced(self):
+        write_atomically(TEMP_FILE, lambda path: open(path, "w").write(NEW_TEXT))
+        with open(TEMP_FILE) as file:
+            self.assertEqual(file.read(), NEW_TEXT)
+        self.assertFalse(os.path.exists(TEMP_PATH.format(TEMP_FILE)))
+
+    def test_failed_write_keeps_old_file(self):
+        def write_half(path):
+            with open(path, "w") as file:
+                file.write(NEW_TEXT[:3])
+            raise OSError
+
+        with self.assertRaises(OSError):
+            write_atomically(TEMP_FILE, write_half)
+        with open(TEMP_FILE) as file:
+            self.assertEqual(file.read(), OLD_TEXT)
+        self.assertFalse(os.path.exists(TEMP_PATH.format(TEMP_FILE)))
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
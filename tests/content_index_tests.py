@@ -0,0 +1,86 @@
+import os
+import unittest
+from unittest import mock
+
+import content_index
+from content_index import update_content_index, query_content_index, get_trigrams, get_text_trigrams
+from test_helper import TestHelper
+
+# region constants
+TEMP_INDEX = "temp_content_index.sqlite"
+TEMP_FILE_1 = "temp_file1.txt"
+TEMP_FILE_2 = "temp_file2.txt"
+TEST_TEXT_1 = "def crawl_folders(self):\n    return Path"
+TEST_TEXT_2 = "Žluťoučký kůň úpěl ďábelské ódy"
+
+
+# endregion
+
+# region Unit tests
+class ContentIndexTestsQuery(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(TEMP_FILE_1, TEMP_FILE_2)
+        self.test_helper.create_test_paths(TEST_TEXT_1, TEST_TEXT_2, use_the_same_text=False)
+        self.paths = [TEMP_FILE_1, TEMP_FILE_2]
+        self.sizes = [os.path.getsize(path) for path in self.paths]
+        self.changes = [os.stat(path).st_mtime_ns for path in self.paths]
+        update_content_index(TEMP_INDEX, self.paths, self.sizes, self.changes)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+        os.remove(TEMP_INDEX)
+
+    def test_query_returns_only_files_with_all_trigrams(self):
+        self.assertSetEqual(query_content_index(TEMP_INDEX, "CRAWL_folders"), {TEMP_FILE_1})
+        self.assertSetEqual(query_content_index(TEMP_INDEX, "crawl_files"), set())
+
+    def test_query_with_non_ascii_text(self):
+        self.assertSetEqual(query_content_index(TEMP_INDEX, "ĎÁBELSKÉ"), {TEMP_FILE_2})
+
+    def test_query_with_short_text_cannot_narrow_files(self):
+        self.assertIsNone(query_content_index(TEMP_INDEX, "de"))
+
+    def test_unchanged_files_are_not_read_again(self):
+        with mock.patch.object(content_index, "get_trigrams", wraps=get_trigrams) as get_trigrams_mock:
+            number_of_read_files = update_content_index(TEMP_INDEX, self.paths, self.sizes, self.changes)
+        self.assertEqual(number_of_read_files, 0)
+        get_trigrams_mock.assert_not_called()
+
+    def test_changed_file_is_indexed_again(self):
+        with open(TEMP_FILE_2, "w") as file:
+            file.write(TEST_TEXT_1)
+        number_of_read_files = update_content_index(TEMP_INDEX, self.paths, [self.sizes[0], len(TEST_TEXT_1)],
+                                                    [self.changes[0], os.stat(TEMP_FILE_2).st_mtime_ns])
+
+        self.assertEqual(number_of_read_files, 1)
+        self.assertSetEqual(query_content_index(TEMP_INDEX, "crawl_folders"), {TEMP_FILE_1, TEMP_FILE_2})
+        self.assertSetEqual(query_content_index(TEMP_INDEX, "ďábelské"), set())
+
+
+class ContentIndexTestsGetTrigrams(unittest.TestCase):
+    def test_trigrams_across_blocks(self):
+        with open(TEMP_FILE_1, "w") as file:
+            file.write(TEST_TEXT_1)
+        block_size = content_index.BLOCK_SIZE
+        content_index.BLOCK_SIZE = 4
+        try:
+            result = get_trigrams(TEMP_FILE_1)
+        finally:
+            content_index.BLOCK_SIZE = block_size
+
+        expected = get_trigrams(TEMP_FILE_1)
+        os.remove(TEMP_FILE_1)
+        self.assertListEqual(result.tolist(), expected.tolist())
+
+    def test_trigrams_of_non_existing_file(self):
+        self.assertIsNone(get_trigrams("non_existing_file.txt"))
+
+    def test_text_trigrams_are_lowered(self):
+        self.assertListEqual(get_text_trigrams("ABC"), get_text_trigrams("abc"))
+        self.assertEqual(len(get_text_trigrams("abcd")), 2)
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import unittest
+
+import content_search
+from content_search import search_file, search_files
+from test_helper import TestHelper
+
+# region constants
+TEMP_FILE_1 = "temp_file1.txt"
+TEMP_FILE_2 = "temp_file2.txt"
+TEST_LINES = ["First line with Python code", "second line", "", "Žluťoučký kůň and PYTHON", "last line without end"]
+TEST_TEXT = "\n".join(TEST_LINES)
+
+
+# endregion
+
+# region Unit tests
+class ContentSearchTestsSearchFile(unittest.TestCase):
+    def setUp(self):
+        with open(TEMP_FILE_1, "w", encoding="utf-8") as file:
+            file.write(TEST_TEXT)
+
+    def tearDown(self):
+        os.remove(TEMP_FILE_1)
+
+    @staticmethod
+    def _read_lines_as_text(text: str) -> list[str]:
+        with open(TEMP_FILE_1, encoding="utf-8") as file:
+            return [line.strip() for line in file if text.lower() in line.lower()]
+
+    def test_search_is_case_insensitive(self):
+        _, lines = search_file(TEMP_FILE_1, "python")
+        self.assertListEqual(lines, [TEST_LINES[0], TEST_LINES[3]])
+
+    def test_search_returns_same_lines_as_reading_text(self):
+        for text in ("", "line", "LINE", "kůň", "ŽLUŤOUČKÝ", "without end", "not in file"):
+            with self.subTest(text=text):
+                self.assertListEqual(search_file(TEMP_FILE_1, text)[1], self._read_lines_as_text(text))
+
+    def test_line_is_returned_once_with_more_matches(self):
+        _, lines = search_file(TEMP_FILE_1, "i")
+        self.assertListEqual(lines, self._read_lines_as_text("i"))
+
+    def test_lines_across_blocks(self):
+        block_size = content_search.BLOCK_SIZE
+        content_search.BLOCK_SIZE = 7
+        try:
+            for text in ("", "line", "python"):
+                with self.subTest(text=text):
+                    self.assertListEqual(search_file(TEMP_FILE_1, text)[1], self._read_lines_as_text(text))
+        finally:
+            content_search.BLOCK_SIZE = block_size
+
+    def test_unreadable_matching_line(self):
+        with open(TEMP_FILE_1, "wb") as file:
+            file.write(b"python \xff\xfe\n")
+        self.assertEqual(search_file(TEMP_FILE_1, "python"), (TEMP_FILE_1, None))
+
+
+class ContentSearchTestsSearchFiles(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(TEMP_FILE_1, TEMP_FILE_2)
+        self.test_helper.create_test_paths(TEST_TEXT)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+
+    def test_results_are_in_order_of_paths(self):
+        paths = [TEMP_FILE_2, TEMP_FILE_1]
+        result = [path for path, _ in search_files(paths, "python")]
+        self.assertListEqual(result, paths)
+
+    def test_pool_returns_same_results_as_serial_search(self):
+        paths = [TEMP_FILE_1, TEMP_FILE_2] * content_search.MIN_FILES_FOR_POOL
+        result = list(search_files(paths, "line", workers=2, chunksize=8))
+        expected = list(search_files(paths, "line", workers=1))
+        self.assertListEqual(result, expected)
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
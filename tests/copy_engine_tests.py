@@ -0,0 +1,72 @@
+import os
+import shutil
+import unittest
+
+from copy_engine import copy_files, copy_file, is_same_file, remove_other_files
+from test_helper import TestHelper
+from structures import CopyStatus
+
+# region constants
+SOURCE_DIR = "temp_source"
+TARGET_DIR = "temp_target"
+SUB_DIR = "sub_dir"
+FILE_NAME = "temp_file.txt"
+TEST_TEXT = "This is a temporary file for testing."
+
+
+# endregion
+
+# region Unit tests
+class CopyEngineTestsCopyFiles(unittest.TestCase):
+    def setUp(self):
+        # Both files have the same name, they must not overwrite each other.
+        self.sources = [os.path.join(SOURCE_DIR, FILE_NAME), os.path.join(SOURCE_DIR, SUB_DIR, FILE_NAME)]
+        self.targets = [os.path.join(TARGET_DIR, FILE_NAME), os.path.join(TARGET_DIR, SUB_DIR, FILE_NAME)]
+        self.test_helper = TestHelper(SOURCE_DIR, os.path.join(SOURCE_DIR, SUB_DIR), *self.sources)
+        self.test_helper.create_test_paths("first", "second", use_the_same_text=False)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+        if os.path.exists(TARGET_DIR):
+            shutil.rmtree(TARGET_DIR)
+
+    def test_relative_paths_are_kept(self):
+        for workers in (1, 4):
+            with self.subTest(workers=workers):
+                self.assertListEqual(copy_files(self.sources, self.targets, workers), [CopyStatus.COPIED] * 2)
+                for source, target in zip(self.sources, self.targets):
+                    with open(source) as source_file, open(target) as target_file:
+                        self.assertEqual(source_file.read(), target_file.read())
+                shutil.rmtree(TARGET_DIR)
+
+    def test_same_files_are_skipped(self):
+        copy_files(self.sources, self.targets)
+        with open(self.sources[1], "a") as f:
+            f.write(TEST_TEXT)
+
+        self.assertListEqual(copy_files(self.sources, self.targets), [CopyStatus.SKIPPED, CopyStatus.COPIED])
+        self.assertTrue(is_same_file(self.sources[1], self.targets[1]))
+
+    def test_missing_source(self):
+        self.assertEqual(copy_file(os.path.join(SOURCE_DIR, "missing.txt"), self.targets[0]), CopyStatus.FAILED)
+
+
+class CopyEngineTestsRemoveOtherFiles(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(TARGET_DIR)
+
+    def test_only_kept_files_stay(self):
+        kept = os.path.join(TARGET_DIR, FILE_NAME)
+        other = os.path.join(TARGET_DIR, SUB_DIR, FILE_NAME)
+        test_helper = TestHelper(TARGET_DIR, os.path.join(TARGET_DIR, SUB_DIR), kept, other)
+        test_helper.create_test_paths(TEST_TEXT)
+
+        self.assertEqual(remove_other_files(TARGET_DIR, {os.path.normpath(kept)}), 1)
+        self.assertTrue(os.path.exists(kept))
+        self.assertFalse(os.path.exists(os.path.join(TARGET_DIR, SUB_DIR)))
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import unittest
+import datetime
+import numpy as np
+import pandas as pd
+
+from crawl_index import build_crawl_index, query_crawl_index
+from folder_crawler import FolderCrawler
+from structures import ItemType, ColumnNames as CN
+
+# region constants
+TEMP_INDEX = "temp_index.sqlite"
+
+FILES = pd.DataFrame({
+    CN.PATH: [os.path.join("root", "a.txt"), os.path.join("root", "B.PY"), os.path.join("root", "sub", "c.txt")],
+    CN.CHANGED: pd.to_datetime([datetime.datetime(2022, 1, 1), datetime.datetime(2023, 1, 1),
+                                datetime.datetime(2024, 1, 1)]),
+    CN.SIZE_BYTES: np.array([10, 2048, 4096], dtype=np.int64),
+})
+FOLDERS = pd.DataFrame({
+    CN.PATH: [os.path.join("root", "sub")],
+    CN.CHANGED: pd.to_datetime([datetime.datetime(2024, 1, 1)]),
+    CN.SIZE_BYTES: np.array([4096], dtype=np.int64),
+    CN.FILE_COUNT: np.array([1], dtype=np.int64),
+    CN.NEWEST_CHANGE: pd.to_datetime([datetime.datetime(2024, 1, 1)]),
+})
+
+
+# endregion
+
+# region Unit tests
+class CrawlIndexTestsQuery(unittest.TestCase):
+    def setUp(self):
+        build_crawl_index(TEMP_INDEX, FILES, FOLDERS)
+
+    def tearDown(self):
+        os.remove(TEMP_INDEX)
+
+    def test_query_without_filters_returns_all_items(self):
+        pd.testing.assert_frame_equal(query_crawl_index(TEMP_INDEX, ItemType.FILES), FILES)
+        pd.testing.assert_frame_equal(query_crawl_index(TEMP_INDEX, ItemType.FOLDERS), FOLDERS)
+
+    def test_query_returns_same_rows_as_dataframe_filters(self):
+        filter_date = datetime.datetime(2022, 6, 1)
+        result = query_crawl_index(TEMP_INDEX, ItemType.FILES, filter_path="ROOT", filter_size=1024,
+                                   filter_size_sign=">=", filter_date=filter_date, filter_date_sign="<=")
+
+        expected = FolderCrawler._filter_paths(FILES, "ROOT", CN.PATH)
+        expected = FolderCrawler._filter_sizes(expected, 1024, ">=", expected[CN.SIZE_BYTES])
+        expected = FolderCrawler._filter_last_change(expected, filter_date, "<=", CN.CHANGED)
+        pd.testing.assert_frame_equal(result, expected.reset_index(drop=True))
+
+    def test_query_by_extension_and_parent(self):
+        by_extension = query_crawl_index(TEMP_INDEX, ItemType.FILES, extension=".py")
+        by_parent = query_crawl_index(TEMP_INDEX, ItemType.FILES, parent=os.path.join("root", "sub"))
+
+        self.assertListEqual(by_extension[CN.PATH].tolist(), [os.path.join("root", "B.PY")])
+        self.assertListEqual(by_parent[CN.PATH].tolist(), [os.path.join("root", "sub", "c.txt")])
+
+    def test_query_with_date_as_string(self):
+        result = query_crawl_index(TEMP_INDEX, ItemType.FILES, filter_date=str(datetime.datetime.min))
+        self.assertEqual(len(result), len(FILES))
+
+    def test_query_with_partial_date_as_string(self):
+        for filter_date in ("2022", "2022-06"):
+            for sign in (">=", "<="):
+                with self.subTest(filter_date=filter_date, sign=sign):
+                    result = query_crawl_index(TEMP_INDEX, ItemType.FILES, filter_date=filter_date,
+                                               filter_date_sign=sign)
+                    expected = FolderCrawler._filter_last_change(FILES, filter_date, sign, CN.CHANGED)
+                    pd.testing.assert_frame_equal(result, expected.reset_index(drop=True))
+
+    def test_query_without_matching_rows(self):
+        result = query_crawl_index(TEMP_INDEX, ItemType.FILES, filter_path="non_existing")
+        self.assertTrue(result.empty)
+        self.assertListEqual(list(result.columns), list(FILES.columns))
+
+    def test_query_uses_index(self):
+        with sqlite3.connect(TEMP_INDEX) as connection:
+            plan = connection.execute("EXPLAIN QUERY PLAN SELECT path FROM items "
+                                      "WHERE item_type = ? AND size >= ?", (ItemType.FILES, 1024)).fetchall()
+        connection.close()
+        self.assertIn("USING INDEX", str(plan))
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import datetime
+import unittest
+import numpy as np
+import pandas as pd
+
+from test_helper import TestHelper
+from crawl_results import CrawlResults, get_local_datetimes, NONE
+from structures import ColumnNames as CN
+from traversal import scan_items, aggregate_folder_totals
+
+# region constants
+# Whole seconds, negative fractions and fractions which are rounded to the next second.
+TIMESTAMPS = [0.0, 1_700_000_000.123456789, -0.5, -1.0000005, 1.9999995, 1_000_000_000.0000015, 2_000_000_000.75]
+RECORDS = [("root/file1.txt", False, 10, 1.5),
+           ("root/folder", True, NONE, 2.5),
+           ("root/folder/file2.txt", False, 20, 3.5),
+           ("root/unreadable.txt", False, NONE, NONE)]
+FOLDER_TOTALS = {"root/folder": (20, 1, 3.5)}
+TEMP_DIR = "temp_dir"
+TEST_TEXT = "This is a temporary file for testing."
+TEST_PATHS = (TEMP_DIR,
+              os.path.join(TEMP_DIR, "sub_dir1"),
+              os.path.join(TEMP_DIR, "sub_dir1", "sub_dir2"),
+              os.path.join(TEMP_DIR, "empty_dir"),
+              os.path.join(TEMP_DIR, "temp_file1.txt"),
+              os.path.join(TEMP_DIR, "sub_dir1", "temp_file1.txt"),
+              os.path.join(TEMP_DIR, "sub_dir1", "sub_dir2", "temp_file2.txt"))
+
+
+# endregion
+
+# region Unit tests
+class CrawlResultsTestsGetLocalDatetimes(unittest.TestCase):
+    def test_same_as_fromtimestamp(self):
+        expected = [np.datetime64(datetime.datetime.fromtimestamp(timestamp), "ns") for timestamp in TIMESTAMPS]
+        np.testing.assert_array_equal(get_local_datetimes(np.array(TIMESTAMPS)), np.array(expected))
+
+    def test_missing_timestamps_are_not_a_time(self):
+        result = get_local_datetimes(np.array([NONE, 0.0]))
+        self.assertTrue(np.isnat(result[0]))
+        self.assertFalse(np.isnat(result[1]))
+
+    def test_empty(self):
+        self.assertEqual(len(get_local_datetimes(np.array([], dtype=np.float64))), 0)
+
+
+class CrawlResultsTestsGetItems(unittest.TestCase):
+    def setUp(self):
+        self.crawl_results = CrawlResults()
+        self.crawl_results.add_records(RECORDS[:2])
+        self.crawl_results.add_records(RECORDS[2:], FOLDER_TOTALS)
+
+    def test_files(self):
+        files = self.crawl_results.get_items(is_folder=False)
+        self.assertListEqual(list(files.columns), [CN.PATH, CN.CHANGED, CN.SIZE_BYTES])
+        self.assertListEqual(files[CN.PATH].tolist(), [RECORDS[0][0], RECORDS[2][0], RECORDS[3][0]])
+        # The unreadable file keeps its missing size, so the sizes stay float.
+        self.assertEqual(files[CN.SIZE_BYTES].dtype, np.float64)
+        self.assertEqual(files[CN.CHANGED][0], pd.Timestamp(datetime.datetime.fromtimestamp(1.5)))
+
+    def test_folders_have_totals(self):
+        folders = self.crawl_results.get_items(is_folder=True)
+        self.assertListEqual(folders[CN.SIZE_BYTES].tolist(), [20])
+        self.assertEqual(folders[CN.SIZE_BYTES].dtype, np.int64)
+        self.assertListEqual(folders[CN.FILE_COUNT].tolist(), [1])
+        self.assertEqual(folders[CN.NEWEST_CHANGE][0], pd.Timestamp(datetime.datetime.fromtimestamp(3.5)))
+
+    def test_directories_are_stored_once(self):
+        crawl_results = CrawlResults()
+        crawl_results.add_records([(os.path.join(TEMP_DIR, "sub_dir1", name), False, 1, 0.0) for name in "abc"])
+
+        self.assertListEqual(crawl_results.tree.get_directory_paths(), [TEMP_DIR, os.path.join(TEMP_DIR, "sub_dir1")])
+        self.assertListEqual(crawl_results.get_items(is_folder=False)[CN.PATH].tolist(),
+                             [os.path.join(TEMP_DIR, "sub_dir1", name) for name in "abc"])
+
+    def test_no_items(self):
+        crawl_results = CrawlResults()
+        self.assertEqual(len(crawl_results), 0)
+        for is_folder in (True, False):
+            with self.subTest(is_folder=is_folder):
+                self.assertTrue(crawl_results.get_items(is_folder).empty)
+
+
+class CrawlResultsTestsGetFolderTotals(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(*TEST_PATHS)
+        self.test_helper.create_test_paths(TEST_TEXT)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+
+    def test_same_totals_as_aggregated_from_records(self):
+        records = list(scan_items(TEMP_DIR, go_deep=True))
+        crawl_results = CrawlResults()
+        crawl_results.add_records(records)
+
+        result = crawl_results.get_folder_totals()
+
+        self.assertDictEqual(result, aggregate_folder_totals(records))
+        self.assertEqual(result[os.path.join(TEMP_DIR, "sub_dir1")][:2], (2 * len(TEST_TEXT), 2))
+        self.assertEqual(result[os.path.join(TEMP_DIR, "empty_dir")], (0, 0, NONE))
+
+    def test_size_is_missing_if_any_file_is_unreadable(self):
+        folder = os.path.join(TEMP_DIR, "sub_dir1")
+        crawl_results = CrawlResults()
+        crawl_results.add_records([(folder, True, NONE, 0.0), (os.path.join(folder, "a"), False, 10, 1.5),
+                                   (os.path.join(folder, "b"), False, NONE, NONE)])
+
+        size, file_count, newest_change = crawl_results.get_folder_totals()[folder]
+
+        self.assertTrue(np.isnan(size))
+        self.assertEqual((file_count, newest_change), (2, 1.5))
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "Symbolic links are not supported.")
+    def test_content_of_linked_folder_is_not_added_to_parent_folders(self):
+        link = os.path.join(TEMP_DIR, "empty_dir", "link")
+        try:
+            os.symlink(os.path.abspath(os.path.join(TEMP_DIR, "sub_dir1")), link, target_is_directory=True)
+        except OSError:
+            self.skipTest("Symbolic links cannot be created.")
+        try:
+            records = list(scan_items(TEMP_DIR, go_deep=True))
+            crawl_results = CrawlResults()
+            crawl_results.add_records(records)
+            result = crawl_results.get_folder_totals()
+        finally:
+            os.remove(link)
+
+        self.assertEqual(result[link][1], 2)
+        self.assertEqual(result[os.path.join(TEMP_DIR, "empty_dir")][:2], (0, 0))
+
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import os
+import unittest
+import datetime
+import numpy as np
+import pandas as pd
+
+import snapshots
+from diff_engine import diff_crawls, get_relative_paths, iter_snapshot_differences, save_sorted_snapshot
+from folder_crawler import FolderCrawler
+from folder_digests import get_folder_digests
+from test_helper import TestHelper
+from structures import DiffStatus, ColumnNames as CN
+
+# region constants
+TEMP_SNAPSHOT_1 = "temp_snapshot1.npz"
+TEMP_SNAPSHOT_2 = "temp_snapshot2.npz"
+ROOT_1 = "root1"
+ROOT_2 = "root2"
+DATE_1 = datetime.datetime(2022, 1, 1)
+DATE_2 = datetime.datetime(2023, 1, 1)
+
+
+def make_files(root: str, rows: list[tuple[str, datetime.datetime, int]]) -> pd.DataFrame:
+    return pd.DataFrame({
+        CN.PATH: [os.path.join(root, relative_path) for relative_path, _, _ in rows],
+        CN.CHANGED: pd.to_datetime([changed for _, changed, _ in rows]),
+        CN.SIZE_BYTES: np.array([size for _, _, size in rows], dtype=np.int64),
+    })
+
+
+FILES_1 = make_files(ROOT_1, [
+    (os.path.join("a", "same.txt"), DATE_1, 10),
+    (os.path.join("a", "modified.txt"), DATE_1, 10),
+    (os.path.join("a", "removed.txt"), DATE_1, 20),
+    (os.path.join("a", "moved.txt"), DATE_1, 30),
+    (os.path.join("b", "same.txt"), DATE_1, 40),
+])
+FILES_2 = make_files(ROOT_2, [
+    (os.path.join("a", "same.txt"), DATE_1, 10),
+    (os.path.join("a", "modified.txt"), DATE_2, 11),
+    (os.path.join("c", "moved.txt"), DATE_1, 30),
+    (os.path.join("c", "added.txt"), DATE_2, 50),
+    (os.path.join("b", "same.txt"), DATE_1, 40),
+])
+
+
+# endregion
+
+# region Unit tests
+class DiffEngineTestsDiffCrawls(unittest.TestCase):
+    def setUp(self):
+        self.result = diff_crawls(FILES_1, FILES_2, ROOT_1, ROOT_2)
+
+    def _get_status(self, relative_path: str) -> str:
+        return self.result.set_index(CN.RELATIVE_PATH).loc[relative_path, CN.STATUS]
+
+    def test_files_with_same_name_in_different_folders_are_not_mixed_up(self):
+        self.assertNotIn(os.path.join("a", "same.txt"), self.result[CN.RELATIVE_PATH].tolist())
+        self.assertNotIn(os.path.join("b", "same.txt"), self.result[CN.RELATIVE_PATH].tolist())
+
+    def test_statuses(self):
+        self.assertEqual(self._get_status(os.path.join("a", "modified.txt")), DiffStatus.MODIFIED)
+        self.assertEqual(self._get_status(os.path.join("a", "removed.txt")), DiffStatus.REMOVED)
+        self.assertEqual(self._get_status(os.path.join("c", "added.txt")), DiffStatus.ADDED)
+        self.assertEqual(len(self.result), 4)
+
+    def test_moved_file_is_reported_once(self):
+        moved = self.result[self.result[CN.STATUS] == DiffStatus.MOVED]
+        self.assertListEqual(moved[CN.RELATIVE_PATH].tolist(), [os.path.join("c", "moved.txt")])
+        self.assertListEqual(moved[CN.PREVIOUS_RELATIVE_PATH].tolist(), [os.path.join("a", "moved.txt")])
+
+    def test_identical_crawls_have_no_differences(self):
+        self.assertTrue(diff_crawls(FILES_1, FILES_1, ROOT_1, ROOT_1).empty)
+
+    def test_moves_with_different_content_are_not_paired(self):
+        test_helper = TestHelper(ROOT_1, ROOT_2, os.path.join(ROOT_1, "x.txt"), os.path.join(ROOT_2, "y.txt"))
+        test_helper.create_test_paths("first", "other", use_the_same_text=False)
+        files_1 = make_files(ROOT_1, [("x.txt", DATE_1, 5)])
+        files_2 = make_files(ROOT_2, [("y.txt", DATE_1, 5)])
+
+        without_hashes = diff_crawls(files_1, files_2, ROOT_1, ROOT_2)
+        with_hashes = diff_crawls(files_1, files_2, ROOT_1, ROOT_2, compare_hashes=True)
+        test_helper.delete_test_paths()
+
+        self.assertListEqual(without_hashes[CN.STATUS].tolist(), [DiffStatus.MOVED])
+        self.assertListEqual(sorted(with_hashes[CN.STATUS].tolist()), [DiffStatus.ADDED, DiffStatus.REMOVED])
+
+    def test_differences_with_digests_are_same_as_without_digests(self):
+        digests = [get_folder_digests(files.assign(**{CN.RELATIVE_PATH: get_relative_paths(files[CN.PATH], root)}))
+                   for files, root in ((FILES_1, ROOT_1), (FILES_2, ROOT_2))]
+        result = diff_crawls(FILES_1, FILES_2, ROOT_1, ROOT_2, previous_digests=digests[0],
+                             current_digests=digests[1])
+        pd.testing.assert_frame_equal(result, self.result)
+
+    def test_files_in_folders_with_same_digests_are_not_compared(self):
+        digests = get_folder_digests(FILES_1.assign(**{CN.RELATIVE_PATH: get_relative_paths(FILES_1[CN.PATH],
+                                                                                            ROOT_1)}))
+        # The digests claim that the trees are the same, so even the different files are not compared.
+        result = diff_crawls(FILES_1, FILES_2, ROOT_1, ROOT_2, previous_digests=digests, current_digests=digests)
+        self.assertTrue(result.empty)
+
+
+class DiffEngineTestsIterSnapshotDifferences(unittest.TestCase):
+    def setUp(self):
+        self.row_group_size = snapshots.ROW_GROUP_SIZE
+        snapshots.ROW_GROUP_SIZE = 2
+
+    def tearDown(self):
+        snapshots.ROW_GROUP_SIZE = self.row_group_size
+        for path in (TEMP_SNAPSHOT_1, TEMP_SNAPSHOT_2):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _stream(self, files_1: pd.DataFrame, files_2: pd.DataFrame) -> pd.DataFrame:
+        save_sorted_snapshot(TEMP_SNAPSHOT_1, files_1, ROOT_1)
+        save_sorted_snapshot(TEMP_SNAPSHOT_2, files_2, ROOT_2)
+        differences = pd.concat(iter_snapshot_differences(TEMP_SNAPSHOT_1, TEMP_SNAPSHOT_2), ignore_index=True)
+        return differences.sort_values(CN.RELATIVE_PATH, kind="stable").reset_index(drop=True)
+
+    def test_streamed_differences_are_same_as_differences_in_memory(self):
+        expected = diff_crawls(FILES_1, FILES_2, ROOT_1, ROOT_2)
+        pd.testing.assert_frame_equal(self._stream(FILES_1, FILES_2), expected, check_dtype=False)
+
+    def test_streamed_differences_with_random_crawls(self):
+        random = np.random.default_rng(0)
+        names = [os.path.join(f"folder{index % 7}", f"file{index}.txt") for index in range(60)]
+        rows_1 = [(name, DATE_1, int(random.integers(1, 4))) for name in names if random.random() < 0.8]
+        rows_2 = [(name, DATE_1, int(random.integers(1, 4))) for name in names if random.random() < 0.8]
+
+        files_1, files_2 = make_files(ROOT_1, rows_1), make_files(ROOT_2, rows_2)
+        expected = diff_crawls(files_1, files_2, ROOT_1, ROOT_2)
+        pd.testing.assert_frame_equal(self._stream(files_1, files_2), expected, check_dtype=False)
+
+    def test_one_side_is_empty(self):
+        expected = diff_crawls(FILES_1.iloc[:0], FILES_2, ROOT_1, ROOT_2)
+        result = self._stream(FILES_1.iloc[:0], FILES_2)
+        self.assertListEqual(result[CN.RELATIVE_PATH].tolist(), expected[CN.RELATIVE_PATH].tolist())
+        self.assertTrue((result[CN.STATUS] == DiffStatus.ADDED).all())
+
+    def test_snapshot_which_is_not_sorted(self):
+        snapshots.save_snapshot(TEMP_SNAPSHOT_1, FILES_1)
+        snapshots.save_snapshot(TEMP_SNAPSHOT_2, FILES_2)
+        with self.assertRaises(ValueError):
+            list(iter_snapshot_differences(TEMP_SNAPSHOT_1, TEMP_SNAPSHOT_2))
+
+
+class DiffEngineTestsGetRelativePaths(unittest.TestCase):
+    def test_root_is_cut_off(self):
+        paths = pd.Series([os.path.join(ROOT_1, "a", "b.txt"), os.path.join(ROOT_1, "c.txt")])
+        result = get_relative_paths(paths, ROOT_1)
+        self.assertListEqual(result.tolist(), [os.path.join("a", "b.txt"), "c.txt"])
+
+    def test_root_with_separator_at_end(self):
+        paths = pd.Series([os.path.join(ROOT_1, "c.txt")])
+        self.assertListEqual(get_relative_paths(paths, ROOT_1 + os.sep).tolist(), ["c.txt"])
+
+    def test_path_outside_of_root_is_unchanged(self):
+        paths = pd.Series([os.path.join(ROOT_1 + "0", "c.txt")])
+        self.assertListEqual(get_relative_paths(paths, ROOT_1).tolist(), paths.tolist())
+
+
+class DiffEngineTestsDifferences(unittest.TestCase):
+    def setUp(self):
+        self.differences = diff_crawls(FILES_1, FILES_2, ROOT_1, ROOT_2)
+
+    def test_one_side_difference_lists_files_of_first_crawl(self):
+        result = FolderCrawler._one_side_difference(self.differences)
+        self.assertListEqual(sorted(result[CN.PATH].tolist()), [os.path.join(ROOT_1, "a", "modified.txt"),
+                                                                os.path.join(ROOT_1, "a", "removed.txt")])
+
+    def test_symmetric_difference_takes_newer_versions(self):
+        result = FolderCrawler._symmetric_difference(self.differences)
+        self.assertListEqual(sorted(result[CN.PATH].tolist()), [os.path.join(ROOT_1, "a", "removed.txt"),
+                                                                os.path.join(ROOT_2, "a", "modified.txt"),
+                                                                os.path.join(ROOT_2, "c", "added.txt")])
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
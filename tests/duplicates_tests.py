@@ -0,0 +1,114 @@
+import os
+import unittest
+from unittest import mock
+import pandas as pd
+
+import duplicates
+from crawl_results import CrawlResults
+from duplicates import find_duplicates, get_reclaimable_size, hash_file, hash_file_partially, PARTIAL_SIZE
+from folder_crawler import FolderCrawler
+from test_helper import TestHelper
+from traversal import scan_items
+from structures import ColumnNames as CN
+
+# region constants
+TEMP_DIR = "temp_dir"
+TEMP_CACHE = "temp_hash_cache.sqlite"
+SMALL_TEXT = "The same small content."
+LARGE_TEXT = "a" * (3 * PARTIAL_SIZE)
+# Same size and the same first and last bytes as LARGE_TEXT, only the middle differs.
+LARGE_TEXT_CHANGED_MIDDLE = "a" * PARTIAL_SIZE + "b" * PARTIAL_SIZE + "a" * PARTIAL_SIZE
+FILE_CONTENTS = {
+    "small_1.txt": SMALL_TEXT,
+    "small_2.txt": SMALL_TEXT,
+    "small_other.txt": SMALL_TEXT.upper(),
+    "unique_size.txt": "This file has a size which no other file has.",
+    "large_1.txt": LARGE_TEXT,
+    "large_2.txt": LARGE_TEXT,
+    "large_middle.txt": LARGE_TEXT_CHANGED_MIDDLE,
+    "empty_1.txt": "",
+    "empty_2.txt": "",
+}
+
+
+# endregion
+
+# region Unit tests
+class DuplicatesTestsFindDuplicates(unittest.TestCase):
+    def setUp(self):
+        self.paths = [os.path.join(TEMP_DIR, name) for name in FILE_CONTENTS]
+        self.test_helper = TestHelper(TEMP_DIR, *self.paths)
+        self.test_helper.create_test_paths(*FILE_CONTENTS.values(), use_the_same_text=False)
+
+        crawl_results = CrawlResults()
+        crawl_results.add_records(list(scan_items(TEMP_DIR, go_deep=False)))
+        self.files = FolderCrawler._set_column_types(crawl_results.get_items(is_folder=False))
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+        if os.path.exists(TEMP_CACHE):
+            os.remove(TEMP_CACHE)
+
+    def _get_groups(self, result: pd.DataFrame) -> list[list[str]]:
+        return [sorted(os.path.basename(path) for path in group[CN.PATH])
+                for _, group in result.groupby(CN.DUPLICATE_GROUP)]
+
+    def test_only_files_with_same_content_are_grouped(self):
+        result = find_duplicates(self.files)
+        self.assertListEqual(self._get_groups(result), [["large_1.txt", "large_2.txt"],
+                                                        ["small_1.txt", "small_2.txt"]])
+
+    def test_files_with_unique_size_are_never_opened(self):
+        with mock.patch.object(duplicates, "HASH_FUNCTIONS", {
+            duplicates.PARTIAL: mock.Mock(wraps=hash_file_partially),
+            duplicates.FULL: mock.Mock(wraps=hash_file)
+        }) as hash_functions:
+            find_duplicates(self.files)
+
+        partially_hashed = {os.path.basename(call.args[0][0])
+                            for call in hash_functions[duplicates.PARTIAL].call_args_list}
+        fully_hashed = {os.path.basename(call.args[0][0]) for call in hash_functions[duplicates.FULL].call_args_list}
+        self.assertNotIn("unique_size.txt", partially_hashed | fully_hashed)
+        self.assertNotIn("empty_1.txt", partially_hashed)
+        # Small files are compared completely by the partial hash and files with other first bytes drop out.
+        self.assertSetEqual(fully_hashed, {"large_1.txt", "large_2.txt", "large_middle.txt"})
+
+    def test_cached_hashes_are_used_for_unchanged_files(self):
+        expected = find_duplicates(self.files, TEMP_CACHE)
+        with mock.patch.object(duplicates, "map_in_pool", wraps=duplicates.map_in_pool) as map_in_pool:
+            result = find_duplicates(self.files, TEMP_CACHE)
+
+        pd.testing.assert_frame_equal(result, expected)
+        for call in map_in_pool.call_args_list:
+            self.assertListEqual(call.args[1], [])
+
+    def test_reclaimable_size(self):
+        result = find_duplicates(self.files)
+        self.assertEqual(get_reclaimable_size(result), len(SMALL_TEXT) + len(LARGE_TEXT))
+
+    def test_no_duplicates(self):
+        result = find_duplicates(self.files.iloc[:1])
+        self.assertTrue(result.empty)
+        self.assertEqual(get_reclaimable_size(result), 0)
+
+
+class DuplicatesTestsHashFile(unittest.TestCase):
+    def test_partial_hash_of_small_file_is_hash_of_whole_file(self):
+        test_helper = TestHelper("temp_file.txt")
+        test_helper.create_test_paths("a" * (PARTIAL_SIZE + 10))
+        path_and_size = ("temp_file.txt", PARTIAL_SIZE + 10)
+
+        partial, full = hash_file_partially(path_and_size), hash_file(path_and_size)
+        test_helper.delete_test_paths()
+
+        self.assertEqual(partial, full)
+
+    def test_hash_of_non_existing_file(self):
+        self.assertIsNone(hash_file(("non_existing_file.txt", 1)))
+        self.assertIsNone(hash_file_partially(("non_existing_file.txt", 1)))
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,22 @@
+import io
 import os
+import json
 import time
 import unittest
+from unittest import mock
 import datetime
+import numpy as np
 import pandas as pd
 
 from tabulate import tabulate
 from colorama import Style, Fore
 from test_helper import TestHelper
-from folder_crawler import FolderCrawler, NONE, COLUMN_NAMES, TABLE_HEADER, TABLE_FORMAT
-from structures import SavedCrawls, Messages, ColorFormatting, ByteSize, ItemType, ByteUnit, ColoredBytes
+from crawl_results import CrawlResults
+from folder_crawler import FolderCrawler, NONE, COLUMN_NAMES, DATA_COLUMN_NAMES, TABLE_HEADER, TABLE_FORMAT
+from structures import OutputFormat, Phase, SavedCrawls, Messages, ColorFormatting, ByteSize, ItemType, ByteUnit, \
+    ColoredBytes, ColumnNames as CN
+from traversal import scan_tree_totals_batch
+from snapshots import load_snapshot
 
 # region constants
 TEMP_DIR = "temp_dir"
@@ -50,7 +58,7 @@ class FolderCrawlerTestsMain(unittest.TestCase):
         # Run test
         self.fc.crawl_folders()
         path_result = self.fc.files[COLUMN_NAMES[0]][0]
-        size_raw_result = self.fc.files[COLUMN_NAMES[3]][0]
+        size_raw_result = self.fc.files[CN.SIZE_BYTES][0]
 
         # Clean up the test environment
         test_helper.delete_test_paths()
@@ -58,7 +66,7 @@ class FolderCrawlerTestsMain(unittest.TestCase):
 
         # Evaluate
         self.assertEqual(path_result, os.path.join(TEMP_DIR, TEMP_FILE_1))
-        self.assertEqual(size_raw_result, ColoredBytes.THIRTYSEVEN_BYTES_RAW)
+        self.assertEqual(size_raw_result, len(TEST_TEXT))
 
     def test_main_2(self):
         # Prepare the test environment
@@ -70,9 +78,9 @@ class FolderCrawlerTestsMain(unittest.TestCase):
         # Run test
         self.fc.crawl_folders()
         file_path_result = self.fc.files[COLUMN_NAMES[0]][0]
-        file_size_raw_result = self.fc.files[COLUMN_NAMES[3]][0]
+        file_size_raw_result = self.fc.files[CN.SIZE_BYTES][0]
         folder_path_result = self.fc.folders[COLUMN_NAMES[0]][0]
-        folder_size_raw_result = self.fc.folders[COLUMN_NAMES[3]][0]
+        folder_size_raw_result = self.fc.folders[CN.SIZE_BYTES][0]
 
         # Clean up the test environment
         test_helper.delete_test_paths()
@@ -80,9 +88,11 @@ class FolderCrawlerTestsMain(unittest.TestCase):
 
         # Evaluate
         self.assertEqual(file_path_result, os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_1))
-        self.assertEqual(file_size_raw_result, ColoredBytes.THIRTYSEVEN_BYTES_RAW)
+        self.assertEqual(file_size_raw_result, len(TEST_TEXT))
         self.assertEqual(folder_path_result, os.path.join(TEMP_DIR, SUB_DIR_1))
-        self.assertEqual(folder_size_raw_result, ColoredBytes.THIRTYSEVEN_BYTES_RAW)
+        self.assertEqual(folder_size_raw_result, len(TEST_TEXT))
+        self.assertEqual(self.fc.files[CN.SIZE_BYTES].dtype, np.int64)
+        self.assertEqual(self.fc.folders[CN.CHANGED].dtype, "datetime64[ns]")
         self.assertTrue(self.fc.skipped.empty)
 
     def test_main_non_existing_path(self):
@@ -93,58 +103,6 @@ class FolderCrawlerTestsMain(unittest.TestCase):
             self.fc.crawl_folders()
 
 
-class FolderCrawlerTestsGetPathWithProperties(unittest.TestCase):
-    """
-    In these tests we are not really focusing on details which the method returns.
-    We just focus if the method returns the correct number of items and if the second item is boolean.
-    """
-
-    def setUp(self):
-        self.fc = FolderCrawler(path=CURRENT_DIRECTORY)
-
-    def test_get_path_with_properties_with_no_subdirectories1(self):
-        # Prepare the test environment
-        test_helper = TestHelper(TEMP_DIR, os.path.join(TEMP_DIR, TEMP_FILE_1))
-        test_helper.create_test_paths(TEST_TEXT)
-        is_directory = True
-
-        # Run test
-        result_tuple = self.fc._get_path_with_properties((TEMP_DIR, is_directory))
-        nr_of_properties = len(result_tuple[0])
-        is_directory_ = result_tuple[1]
-        resulting_tuple = (nr_of_properties, is_directory_)
-        expected_tuple = (len(COLUMN_NAMES), is_directory)
-
-        # Clean up the test environment
-        test_helper.delete_test_paths()
-
-        # Evaluate
-        self.assertEqual(resulting_tuple, expected_tuple)
-
-    def test_get_path_with_properties_with_no_subdirectories2(self):
-        # Prepare the test environment
-        test_helper = TestHelper(TEMP_FILE_1)
-        test_helper.create_test_paths(TEST_TEXT)
-        is_directory = False
-
-        # Run test
-        result_tuple = self.fc._get_path_with_properties((TEMP_FILE_1, is_directory))
-        nr_of_properties = len(result_tuple[0])
-        is_directory_ = result_tuple[1]
-        resulting_tuple = (nr_of_properties, is_directory_)
-        expected_tuple = (len(COLUMN_NAMES), is_directory)
-
-        # Clean up the test environment
-        test_helper.delete_test_paths()
-
-        # Evaluate
-        self.assertEqual(resulting_tuple, expected_tuple)
-
-
-# endregion
-
-# region Unit tests
-
 class FolderCrawlerTestsGetIntsFromStrDataFrameColumn(unittest.TestCase):
     def setUp(self):
         self.fc = FolderCrawler(path=CURRENT_DIRECTORY)
@@ -277,24 +235,70 @@ class FolderCrawlerTestsFilterData(unittest.TestCase):
 class FolderCrawlerTestsGetCrawledData(unittest.TestCase):
     def setUp(self):
         self.folder_crawler = FolderCrawler(path=CURRENT_DIRECTORY)
-        self.unprocessedDataframe = pd.DataFrame([(('path1', 'change1', 'size1', 'bytes1'), True),
-                                                  (('path2', 'change2', 'size2', 'bytes2'), False)])
+        self.crawl_results = CrawlResults()
+        self.crawl_results.add_records([('path1', True, 1024, 0.0), ('path2', False, 2048, 0.0)],
+                                       {'path1': (4096, 2, 0.0)})
+        self.change = datetime.datetime.fromtimestamp(0.0)
 
     # do not put @staticmethod decorator here, else the test will not work
     def test_get_crawled_data_with_folder(self):
-        result = FolderCrawler._get_crawled_data(self.unprocessedDataframe, is_folder=True)
-        expected = pd.DataFrame({COLUMN_NAMES[0]: ['path1'], COLUMN_NAMES[1]: ['change1'],
-                                 COLUMN_NAMES[2]: ['size1'], COLUMN_NAMES[3]: ['bytes1']})
+        result = FolderCrawler._get_crawled_data(self.crawl_results, is_folder=True)
+        expected = pd.DataFrame({DATA_COLUMN_NAMES[0]: ['path1'], DATA_COLUMN_NAMES[1]: [self.change],
+                                 DATA_COLUMN_NAMES[2]: [4096], CN.FILE_COUNT: [2], CN.NEWEST_CHANGE: [self.change]})
 
         pd.testing.assert_frame_equal(result.reset_index(), expected.reset_index())
 
     # do not put @staticmethod decorator here, else the test will not work
     def test_get_crawled_data_with_file(self):
-        result = FolderCrawler._get_crawled_data(self.unprocessedDataframe, is_folder=False)
-        expected = pd.DataFrame({COLUMN_NAMES[0]: ['path2'], COLUMN_NAMES[1]: ['change2'],
-                                 COLUMN_NAMES[2]: ['size2'], COLUMN_NAMES[3]: ['bytes2']})
+        result = FolderCrawler._get_crawled_data(self.crawl_results, is_folder=False)
+        expected = pd.DataFrame({DATA_COLUMN_NAMES[0]: ['path2'], DATA_COLUMN_NAMES[1]: [self.change],
+                                 DATA_COLUMN_NAMES[2]: [2048]})
         pd.testing.assert_frame_equal(result, expected)
 
+    def test_get_crawled_data_with_missing_size(self):
+        self.crawl_results.add_records([('path3', False, NONE, NONE)])
+        result = FolderCrawler._get_crawled_data(self.crawl_results, is_folder=False)
+        self.assertEqual(result[CN.SIZE_BYTES].dtype, np.float64)
+        self.assertTrue(pd.isna(result[CN.CHANGED][1]))
+
+
+class FolderCrawlerTestsSetColumnTypes(unittest.TestCase):
+    def test_set_column_types_of_crawled_data(self):
+        container = pd.DataFrame({CN.PATH: ['file1'], CN.CHANGED: ['2022-01-01 10:00:00'], CN.SIZE_BYTES: [1024]})
+        result = FolderCrawler._set_column_types(container)
+        self.assertEqual(result[CN.CHANGED].dtype, "datetime64[ns]")
+        self.assertEqual(result[CN.SIZE_BYTES].dtype, np.int64)
+
+    def test_set_column_types_of_older_saved_crawl(self):
+        result = FolderCrawler._set_column_types(TEST_DATAFRAME.copy())
+        self.assertNotIn(CN.SIZE_READABLE, result.columns)
+        pd.testing.assert_series_equal(result[CN.SIZE_BYTES], RAW_INTEGERS_SERIES)
+
+    def test_set_column_types_keeps_missing_sizes(self):
+        container = pd.DataFrame({CN.PATH: ['file1', 'file2'], CN.CHANGED: [NONE, NONE],
+                                  CN.SIZE_BYTES: [NONE, ColoredBytes.ONE_KB_RAW]})
+        result = FolderCrawler._set_column_types(container)
+        self.assertTrue(np.isnan(result[CN.SIZE_BYTES][0]))
+        self.assertEqual(result[CN.SIZE_BYTES][1], ByteSize.KILOBYTE)
+
+
+class FolderCrawlerTestsFormatSizesForPrint(unittest.TestCase):
+    def test_format_sizes_for_print(self):
+        container = pd.DataFrame({CN.PATH: ['a', 'b', 'c'], CN.SIZE_BYTES: RAW_INTEGERS_SERIES})
+        result = FolderCrawler._format_sizes_for_print(container)
+        self.assertListEqual(list(result.columns), [CN.PATH, CN.SIZE_READABLE, CN.SIZE_BYTES])
+        self.assertListEqual(result[CN.SIZE_READABLE].tolist(), TEST_DATAFRAME[CN.SIZE_READABLE].tolist())
+        self.assertListEqual(result[CN.SIZE_BYTES].tolist(), TEST_DATAFRAME[CN.SIZE_BYTES].tolist())
+
+    def test_format_sizes_for_print_matches_convert_bytes(self):
+        sizes = [0, 37, ByteSize.MEGABYTE, 5 * ByteSize.GIGABYTE, ByteSize.TERABYTE]
+        result = FolderCrawler._format_sizes_for_print(pd.DataFrame({CN.SIZE_BYTES: sizes}))
+        expected = [FolderCrawler._convert_bytes_to_readable_format(size, ColorFormatting.COLORS,
+                                                                    ColorFormatting.UNITS, Style.RESET_ALL,
+                                                                    FolderCrawler._color_format_string)
+                    for size in sizes]
+        self.assertListEqual(list(zip(result[CN.SIZE_READABLE], result[CN.SIZE_BYTES])), expected)
+
 
 class FolderCrawlerTestsCrawlShallow(unittest.TestCase):
     def setUp(self):
@@ -509,6 +513,390 @@ class FolderCrawlerTestsCrawlDeep(unittest.TestCase):
         self.assertEqual(len(result), nr_of_found_items_expected)
 
 
+class FolderCrawlerTestsMapInBatches(unittest.TestCase):
+    def test_map_in_batches_concatenates_chunks(self):
+        paths = [NOT_EXISTING_FOLDER] * 5
+        sizes, file_counts, _ = FolderCrawler._map_in_batches(scan_tree_totals_batch, paths, chunksize=2)
+        self.assertListEqual(sizes.tolist(), [0] * 5)
+        self.assertListEqual(file_counts.tolist(), [0] * 5)
+
+    def test_map_in_batches_without_items(self):
+        result = FolderCrawler._map_in_batches(scan_tree_totals_batch, [], chunksize=2)
+        self.assertEqual(result, ())
+
+
+class FolderCrawlerTestsCrawlItems(unittest.TestCase):
+    def setUp(self):
+        self.fc = FolderCrawler(path=CURRENT_DIRECTORY)
+        self.test_helper = TestHelper(TEMP_DIR,
+                                      os.path.join(TEMP_DIR, SUB_DIR_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2, TEMP_FILE_2))
+        self.test_helper.create_test_paths(TEST_TEXT)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+
+    def test_folder_size_is_the_same_in_deep_and_shallow_crawl(self):
+        deep = FolderCrawler._get_crawled_data(self.fc._crawl_items(TEMP_DIR, go_deep=True), is_folder=True)
+        shallow = FolderCrawler._get_crawled_data(self.fc._crawl_items(TEMP_DIR, go_deep=False), is_folder=True)
+
+        deep_row = deep[deep[COLUMN_NAMES[0]] == os.path.join(TEMP_DIR, SUB_DIR_1)].reset_index(drop=True)
+        pd.testing.assert_frame_equal(deep_row, shallow)
+        self.assertEqual(shallow[CN.FILE_COUNT][0], 2)
+
+
+class FolderCrawlerTestsIncrementalCrawl(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(TEMP_DIR,
+                                      os.path.join(TEMP_DIR, SUB_DIR_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2, TEMP_FILE_2))
+        self.test_helper.create_test_paths(TEST_TEXT)
+        self.fc = FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False, print_skipped_items=False,
+                                incremental=True)
+        self.fc.crawl_folders()
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+        TestHelper.delete_saved_crawls()
+
+    def test_incremental_crawl_returns_same_data_as_full_crawl(self):
+        new_file = os.path.join(TEMP_DIR, TEMP_FILE_1)
+        with open(new_file, "w") as f:
+            f.write(TEST_TEXT)
+        with open(os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2, TEMP_FILE_2), "a") as f:
+            f.write(TEST_TEXT)
+
+        self.fc.crawl_folders()
+        incremental_files, incremental_folders = self.fc.files, self.fc.folders
+        full_crawler = FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False, print_skipped_items=False)
+        full_crawler.crawl_folders()
+        os.remove(new_file)
+
+        pd.testing.assert_frame_equal(incremental_files, full_crawler.files)
+        pd.testing.assert_frame_equal(incremental_folders, full_crawler.folders)
+
+    def test_phases_are_measured(self):
+        metrics_path = "temp_metrics.json"
+        fc = FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False, print_skipped_items=False,
+                           metrics_path=metrics_path)
+        fc.crawl_folders()
+        with open(metrics_path) as f:
+            saved = {phase["phase"]: phase for phase in json.load(f)["phases"]}
+        os.remove(metrics_path)
+
+        self.assertEqual(saved[Phase.WALK]["items"], len(fc.files) + len(fc.folders))
+        self.assertEqual(saved[Phase.WALK]["errors"], 0)
+        for phase in (Phase.STAT, Phase.DATAFRAME, Phase.SAVE):
+            self.assertEqual(saved[phase]["calls"], 1)
+        # The crawled dataframes are printed from memory, they are not loaded back from the snapshots.
+        self.assertNotIn(Phase.LOAD, saved)
+
+    def test_saved_crawl_is_the_same_as_crawl_in_memory(self):
+        fc = FolderCrawler(path=TEMP_DIR, crawl=False, print_files=False, print_folders=False,
+                           print_skipped_items=False)
+        fc.crawl_folders()
+
+        pd.testing.assert_frame_equal(fc.files, self.fc.files)
+        pd.testing.assert_frame_equal(fc.folders, self.fc.folders)
+        self.assertGreater(fc.metrics.get_phase(Phase.LOAD).bytes_read, 0)
+
+    @unittest.skipUnless(hasattr(time, "tzset"), "The time zone can be changed only on Unix.")
+    def test_trusted_last_changes_do_not_shift_in_local_time_zone(self):
+        previous_time_zone = os.environ.get("TZ")
+        os.environ["TZ"] = "Europe/Prague"
+        time.tzset()
+        try:
+            fc = FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False, print_skipped_items=False,
+                               incremental=True, restat_unchanged_files=False)
+            # The first crawl lists everything again, the next ones reuse the previous crawl.
+            for _ in range(3):
+                fc.crawl_folders()
+            full_crawler = FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False,
+                                         print_skipped_items=False)
+            full_crawler.crawl_folders()
+        finally:
+            if previous_time_zone is None:
+                del os.environ["TZ"]
+            else:
+                os.environ["TZ"] = previous_time_zone
+            time.tzset()
+
+        pd.testing.assert_frame_equal(fc.files, full_crawler.files)
+
+    def test_previous_crawl_of_other_path_is_not_used(self):
+        self.assertIsNotNone(self.fc._load_previous_crawl(TEMP_DIR))
+        self.assertIsNone(self.fc._load_previous_crawl(os.path.join(TEMP_DIR, SUB_DIR_1)))
+
+
+class FolderCrawlerTestsIterCrawl(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(TEMP_DIR,
+                                      os.path.join(TEMP_DIR, SUB_DIR_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2),
+                                      os.path.join(TEMP_DIR, TEMP_FILE_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2, TEMP_FILE_2))
+        self.test_helper.create_test_paths(TEST_TEXT)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+        # Only the first test saves a crawl, streamed crawls are not saved.
+        if os.path.exists(SavedCrawls.ROOT):
+            TestHelper.delete_saved_crawls()
+
+    def test_streamed_items_are_the_same_as_crawled_items(self):
+        for crawl_deep in (True, False):
+            with self.subTest(crawl_deep=crawl_deep):
+                fc = FolderCrawler(path=TEMP_DIR, crawl_deep=crawl_deep, print_files=False, print_folders=False,
+                                   print_skipped_items=False)
+                fc.crawl_folders()
+                fc.print_files = fc.print_folders = True
+                batches = list(fc.iter_crawl(batch_size=1))
+
+                self.assertTrue(all(len(batch) == 1 for _, batch in batches))
+                for item_type, expected in ((ItemType.FILES, fc.files), (ItemType.FOLDERS, fc.folders)):
+                    streamed = pd.concat([batch for type_, batch in batches if type_ == item_type],
+                                         ignore_index=True)
+                    pd.testing.assert_frame_equal(streamed, expected)
+
+    def test_only_printed_and_filtered_items_are_streamed(self):
+        fc = FolderCrawler(path=TEMP_DIR, print_folders=False, filter_path=SUB_DIR_2)
+        batches = list(fc.iter_crawl())
+
+        self.assertListEqual([item_type for item_type, _ in batches], [ItemType.FILES])
+        self.assertListEqual(batches[0][1][CN.PATH].tolist(), [os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2,
+                                                                            TEMP_FILE_2)])
+
+    def test_skipped_parent_is_filtered_by_skipped_item_of_later_batch(self):
+        parent = os.path.join(TEMP_DIR, SUB_DIR_1)
+        child = os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2)
+        fc = FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False)
+        batches = [batch for path in (parent, child)
+                   for batch in fc._get_item_batches([(path, True, NONE, NONE)], is_folder=True)]
+
+        with mock.patch.object(FolderCrawler, "_iter_crawled_items", return_value=iter(batches)):
+            streamed = list(fc.iter_crawl(batch_size=1))
+
+        self.assertListEqual([item_type for item_type, _ in streamed], [ItemType.SKIPPED])
+        self.assertListEqual(streamed[0][1][CN.PATH].tolist(), [child])
+
+    def test_stream_crawl_writes_every_item(self):
+        fc = FolderCrawler(path=TEMP_DIR)
+        file = io.StringIO()
+        rows = fc.stream_crawl(OutputFormat.NDJSON, file)
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+
+        self.assertEqual(rows, 5)
+        self.assertEqual(len(lines), rows)
+        self.assertFalse(os.path.exists(SavedCrawls.FILES_SNAPSHOT))
+
+    def test_stream_crawl_with_unknown_format(self):
+        with self.assertRaises(ValueError):
+            FolderCrawler(path=TEMP_DIR).stream_crawl("xml", io.StringIO())
+
+
+class FolderCrawlerTestsMemoryBudget(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(TEMP_DIR,
+                                      os.path.join(TEMP_DIR, SUB_DIR_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2),
+                                      os.path.join(TEMP_DIR, TEMP_FILE_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, SUB_DIR_2, TEMP_FILE_2))
+        self.test_helper.create_test_paths(TEST_TEXT)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+        if os.path.exists(SavedCrawls.ROOT):
+            TestHelper.delete_saved_crawls()
+
+    def test_spilled_files_are_merged_sorted_by_paths(self):
+        fc = FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False, print_skipped_items=False)
+        fc.crawl_folders()
+        expected_files = fc.files.sort_values(CN.PATH, ignore_index=True)
+        expected_folders = fc.folders
+        fc = FolderCrawler(path=TEMP_DIR, filter_file_content=TEST_TEXT, memory_budget=1)
+        with mock.patch("folder_crawler.STREAM_BATCH_SIZE", 1):
+            fc.crawl_folders()
+
+        self.assertTrue(fc.files.empty)
+        self.assertFalse(os.path.exists(SavedCrawls.SPILL))
+        pd.testing.assert_frame_equal(load_snapshot(SavedCrawls.FILES_SNAPSHOT), expected_files)
+        pd.testing.assert_frame_equal(fc.folders, expected_folders)
+        self.assertListEqual(list(fc._iter_file_paths()), expected_files[CN.PATH].tolist())
+        self.assertEqual(fc.metrics.get_phase(Phase.SAVE).items, len(expected_files) + len(expected_folders))
+
+    def test_memory_budget_with_not_supported_options(self):
+        for options in ({"path2": SUB_DIR_1}, {"use_index": True}, {"incremental": True},
+                        {"find_duplicates": True}):
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    FolderCrawler(path=TEMP_DIR, memory_budget=1, **options)
+
+
+class FolderCrawlerTestsCrawlRoots(unittest.TestCase):
+    def setUp(self):
+        self.roots = (os.path.join(TEMP_DIR, SUB_DIR_1), os.path.join(TEMP_DIR, SUB_DIR_2))
+        self.test_helper = TestHelper(TEMP_DIR, *self.roots, os.path.join(self.roots[0], TEMP_FILE_1),
+                                      os.path.join(self.roots[1], TEMP_FILE_2))
+        self.test_helper.create_test_paths(TEST_TEXT)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+
+    def test_roots_crawled_together_are_same_as_roots_crawled_separately(self):
+        for crawl_deep in (True, False):
+            with self.subTest(crawl_deep=crawl_deep):
+                fc = FolderCrawler(path=self.roots[0], path2=self.roots[1], workers=2)
+                together = fc._crawl_roots(list(self.roots), crawl_deep)
+                separately = [fc._crawl_roots([root], crawl_deep)[0] for root in self.roots]
+                for (crawl_results, metadata), (expected_results, expected_metadata) in zip(together, separately):
+                    for is_folder in (True, False):
+                        pd.testing.assert_frame_equal(crawl_results.get_items(is_folder),
+                                                      expected_results.get_items(is_folder))
+                    self.assertDictEqual(metadata, expected_metadata)
+
+
+class FolderCrawlerTestsCompareSavedCrawls(unittest.TestCase):
+    def setUp(self):
+        self.roots = (os.path.join(TEMP_DIR, SUB_DIR_1), os.path.join(TEMP_DIR, SUB_DIR_2))
+        self.files = [os.path.join(root, TEMP_FILE_1) for root in self.roots]
+        self.test_helper = TestHelper(TEMP_DIR, *self.roots, *self.files)
+        self.test_helper.create_test_paths(TEST_TEXT)
+        # Both copies of the file must have the same last change, otherwise they would differ.
+        for path in self.files:
+            os.utime(path, (0, 0))
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+        TestHelper.delete_saved_crawls()
+
+    def _compare(self, streaming_compare: bool = False) -> pd.DataFrame:
+        fc = FolderCrawler(path=self.roots[0], path2=self.roots[1], print_files=False, print_folders=False,
+                           print_skipped_items=False, read_out_file_contents=False, copy_diffs_to_folder=False,
+                           streaming_compare=streaming_compare)
+        for path in self.roots:
+            fc.crawl_folders(path)
+        return fc.compare_saved_crawls()
+
+    def test_same_trees_have_no_differences(self):
+        for streaming_compare in (False, True):
+            with self.subTest(streaming_compare=streaming_compare):
+                self.assertTrue(self._compare(streaming_compare).empty)
+
+    def test_changed_file(self):
+        with open(self.files[1], "a") as f:
+            f.write(TEST_TEXT)
+        for streaming_compare in (False, True):
+            with self.subTest(streaming_compare=streaming_compare):
+                result = self._compare(streaming_compare)
+                self.assertListEqual(result[CN.RELATIVE_PATH].tolist(), [TEMP_FILE_1])
+                self.assertListEqual(result[CN.PATH].tolist(), [self.files[1]])
+
+    def test_main_crawls_both_roots(self):
+        fc = FolderCrawler(path=self.roots[0], path2=self.roots[1], print_files=False, print_folders=False,
+                           print_skipped_items=False, read_out_file_contents=False, copy_diffs_to_folder=False)
+        with mock.patch.object(fc, "_crawl_roots", wraps=fc._crawl_roots) as crawl_roots:
+            fc.main__()
+
+        crawl_roots.assert_called_once_with(list(self.roots), True)
+        self.assertEqual(fc.crawl_folders_method_calls, 2)
+        self.assertListEqual(fc.files[CN.PATH].tolist(), [self.files[1]])
+
+    def test_first_root_is_compared_with_each_other_root(self):
+        third_root = os.path.join(TEMP_DIR, "sub_dir3")
+        test_helper = TestHelper(third_root, os.path.join(third_root, TEMP_FILE_2))
+        test_helper.create_test_paths(TEST_TEXT)
+        fc = FolderCrawler(path=self.roots[0], path2=self.roots[1], more_paths=(third_root,), print_files=False,
+                           print_folders=False, print_skipped_items=False, read_out_file_contents=False)
+        fc.main__()
+        test_helper.delete_test_paths()
+
+        self.assertEqual(fc.crawl_folders_method_calls, 3)
+        self.assertListEqual(os.listdir(SavedCrawls.DIFFERENCES), [])
+        self.assertListEqual(sorted(os.listdir(f"{SavedCrawls.DIFFERENCES}3")), [TEMP_FILE_1, TEMP_FILE_2])
+
+    def test_differences_are_copied_at_their_relative_paths(self):
+        with open(self.files[1], "a") as f:
+            f.write(TEST_TEXT)
+        fc = FolderCrawler(path=self.roots[0], path2=self.roots[1], print_files=False, print_folders=False,
+                           print_skipped_items=False, read_out_file_contents=False)
+        for path in self.roots:
+            fc.crawl_folders(path)
+        fc.compare_saved_crawls()
+
+        with open(os.path.join(SavedCrawls.DIFFERENCES, TEMP_FILE_1)) as f:
+            self.assertEqual(f.read(), TEST_TEXT * 2)
+
+
+class FolderCrawlerTestsUseIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(TEMP_DIR,
+                                      os.path.join(TEMP_DIR, SUB_DIR_1),
+                                      os.path.join(TEMP_DIR, TEMP_FILE_1),
+                                      os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_2))
+        self.test_helper.create_test_paths(TEST_TEXT)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+        TestHelper.delete_saved_crawls()
+
+    def test_index_returns_only_filtered_items_of_saved_crawl(self):
+        FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False, print_skipped_items=False,
+                      use_index=True).crawl_folders()
+        fc = FolderCrawler(path=TEMP_DIR, crawl=False, print_files=False, print_folders=False,
+                           print_skipped_items=False, read_out_file_contents=False, filter_path=SUB_DIR_1,
+                           use_index=True)
+        fc.crawl_folders()
+
+        self.assertTrue(os.path.exists(SavedCrawls.INDEX))
+        self.assertListEqual(fc.queried_files[CN.PATH].tolist(), [os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_2)])
+        self.assertListEqual(fc.queried_folders[CN.PATH].tolist(), [os.path.join(TEMP_DIR, SUB_DIR_1)])
+        self.assertEqual(fc.queried_files[CN.SIZE_BYTES].dtype, np.int64)
+        self.assertTrue(fc.files.empty)
+
+    def test_fresh_crawl_keeps_all_items_in_memory(self):
+        fc = FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False, print_skipped_items=False,
+                           filter_path=SUB_DIR_1, use_index=True)
+        fc.crawl_folders()
+
+        self.assertIsNone(fc.queried_files)
+        self.assertListEqual(sorted(fc.files[CN.PATH].tolist()),
+                             sorted([os.path.join(TEMP_DIR, TEMP_FILE_1),
+                                     os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_2)]))
+
+    def test_duplicates_of_saved_crawl_are_found_among_all_files(self):
+        FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False, print_skipped_items=False,
+                      use_index=True).crawl_folders()
+        fc = FolderCrawler(path=TEMP_DIR, crawl=False, print_files=False, print_folders=False,
+                           print_skipped_items=False, filter_path=SUB_DIR_1, use_index=True, find_duplicates=True)
+        fc.crawl_folders()
+
+        duplicates = fc.find_duplicate_files()
+
+        self.assertEqual(len(fc.queried_files), 1)
+        self.assertEqual(len(duplicates), 2)
+
+    def test_index_reads_only_files_which_can_contain_text(self):
+        other_file = os.path.join(TEMP_DIR, TEMP_FILE_2)
+        with open(other_file, "w") as file:
+            file.write("Other content")
+        fc = FolderCrawler(path=TEMP_DIR, print_files=False, print_folders=False, print_skipped_items=False,
+                           use_index=True)
+        fc.crawl_folders()
+
+        result = fc._read_content_of_multiple_files(filter_file_content="OTHER")
+        candidates = fc._get_indexed_candidates(fc.files[CN.PATH].tolist(), "OTHER")
+        os.remove(other_file)
+
+        self.assertListEqual(result, [["Other content"]])
+        self.assertListEqual(candidates, [other_file])
+
+
 class FolderCrawlerTestsSaveCrawlResults(unittest.TestCase):
     def setUp(self):
         self.fc = FolderCrawler(path=CURRENT_DIRECTORY)
@@ -644,6 +1032,20 @@ class FolderCrawlerTestsFilterSubdirectories(unittest.TestCase):
         number_of_paths_expected = 2
         self.assertEqual(len(result), number_of_paths_expected)
 
+    def test_filter_subdirectories_compares_whole_path_components(self):
+        df = pd.DataFrame({COLUMN_NAMES[0]: ['C:/Users/ab', 'C:/Users/a', 'C:/Users/a/b']})
+        result = self.fc._filter_subdirectories(df, COLUMN_NAMES[0])
+        self.assertListEqual(result[COLUMN_NAMES[0]].tolist(), ['C:/Users/ab', 'C:/Users/a/b'])
+
+    def test_filter_subdirectories_with_backslashes(self):
+        df = pd.DataFrame({COLUMN_NAMES[0]: ['C:\\Users\\Subfolder', 'C:\\Users', 'C:\\Users2']})
+        result = self.fc._filter_subdirectories(df, COLUMN_NAMES[0])
+        self.assertListEqual(result.index.tolist(), [0, 2])
+
+    def test_filter_subdirectories_keeps_other_columns(self):
+        result = self.fc._filter_subdirectories(TEST_DATAFRAME, COLUMN_NAMES[0])
+        pd.testing.assert_frame_equal(result, TEST_DATAFRAME.iloc[[2]])
+
 
 class FolderCrawlerTestsGetTimePerformance(unittest.TestCase):
     def setUp(self):
@@ -1002,6 +1404,22 @@ class TestFolderCrawlerReadContentOfMultipleFiles(unittest.TestCase):
         self.assertEqual(file2[2], TEST_TEXT)
         self.assertRaises(IndexError, lambda: file2[3])
 
+    def test_read_content_of_multiple_files_with_upper_case_path(self):
+        # Prepare the test environment
+        upper_case_file = TEMP_FILE_1.upper().replace(".TXT", ".txt")
+        test_helper = TestHelper(upper_case_file)
+        test_helper.create_test_paths(TEST_TEXT)
+
+        # Run test
+        self.fc.files = pd.DataFrame({COLUMN_NAMES[0]: [upper_case_file]})
+        result = self.fc._read_content_of_multiple_files(filter_file_content="TEMPORARY")
+
+        # Clean up the test environment
+        test_helper.delete_test_paths()
+
+        # Evaluate
+        self.assertListEqual(result, [[TEST_TEXT]])
+
 # endregion
 
 
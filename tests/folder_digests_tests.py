@@ -0,0 +1,113 @@
+import os
+import unittest
+import datetime
+import numpy as np
+import pandas as pd
+
+from folder_digests import get_folder_digests, get_changed_folders, get_root_digest, get_parent_folders, \
+    get_folder_depth, ROOT_FOLDER
+from test_helper import TestHelper
+from structures import ColumnNames as CN
+
+# region constants
+DATE_1 = datetime.datetime(2022, 1, 1)
+DATE_2 = datetime.datetime(2023, 1, 1)
+TEMP_DIR = "temp_dir"
+
+
+def make_files(rows: list[tuple[str, datetime.datetime, int]]) -> pd.DataFrame:
+    return pd.DataFrame({
+        CN.RELATIVE_PATH: [relative_path for relative_path, _, _ in rows],
+        CN.PATH: [os.path.join(TEMP_DIR, relative_path) for relative_path, _, _ in rows],
+        CN.CHANGED: pd.to_datetime([changed for _, changed, _ in rows]),
+        CN.SIZE_BYTES: np.array([size for _, _, size in rows], dtype=np.int64),
+    })
+
+
+FILES = make_files([
+    ("root.txt", DATE_1, 1),
+    (os.path.join("a", "file.txt"), DATE_1, 2),
+    (os.path.join("a", "b", "file.txt"), DATE_1, 3),
+    (os.path.join("c", "d", "file.txt"), DATE_1, 4),
+])
+
+
+# endregion
+
+# region Unit tests
+class FolderDigestsTestsGetFolderDigests(unittest.TestCase):
+    def _get_digests(self, files: pd.DataFrame) -> dict[str, str]:
+        digests = get_folder_digests(files)
+        return dict(zip(digests[CN.RELATIVE_PATH], digests[CN.DIGEST]))
+
+    def test_every_folder_has_a_digest(self):
+        self.assertListEqual(list(self._get_digests(FILES)),
+                             [ROOT_FOLDER, "a", os.path.join("a", "b"), "c", os.path.join("c", "d")])
+
+    def test_order_of_files_does_not_change_digests(self):
+        self.assertDictEqual(self._get_digests(FILES), self._get_digests(FILES.iloc[::-1]))
+
+    def test_change_is_propagated_only_to_parent_folders(self):
+        changed = FILES.copy()
+        changed.loc[2, CN.CHANGED] = DATE_2
+        digests, changed_digests = self._get_digests(FILES), self._get_digests(changed)
+
+        different = {folder for folder in digests if digests[folder] != changed_digests[folder]}
+        self.assertSetEqual(different, {ROOT_FOLDER, "a", os.path.join("a", "b")})
+
+    def test_renamed_folder_changes_digest_of_parent(self):
+        renamed = FILES.copy()
+        renamed.loc[3, CN.RELATIVE_PATH] = os.path.join("c", "e", "file.txt")
+        digests, renamed_digests = self._get_digests(FILES), self._get_digests(renamed)
+
+        self.assertEqual(digests[os.path.join("c", "d")], renamed_digests[os.path.join("c", "e")])
+        self.assertNotEqual(digests["c"], renamed_digests["c"])
+
+    def test_no_files(self):
+        digests = get_folder_digests(FILES.iloc[:0])
+        self.assertListEqual(digests[CN.RELATIVE_PATH].tolist(), [ROOT_FOLDER])
+
+    def test_hashes_of_contents(self):
+        paths = [os.path.join(TEMP_DIR, "same.txt"), os.path.join(TEMP_DIR, "other.txt")]
+        test_helper = TestHelper(TEMP_DIR, *paths)
+        test_helper.create_test_paths("abc", "abd", use_the_same_text=False)
+        # Both files have the same name, size and last change, only their contents differ.
+        files_1 = make_files([("same.txt", DATE_1, 3)])
+        files_2 = files_1.assign(**{CN.PATH: [paths[1]]})
+
+        with_contents = [get_root_digest(get_folder_digests(files, hash_contents=True))
+                         for files in (files_1, files_2)]
+        without_contents = [get_root_digest(get_folder_digests(files)) for files in (files_1, files_2)]
+        test_helper.delete_test_paths()
+
+        self.assertNotEqual(*with_contents)
+        self.assertEqual(*without_contents)
+
+
+class FolderDigestsTestsGetChangedFolders(unittest.TestCase):
+    def test_same_trees(self):
+        self.assertTrue(get_changed_folders(get_folder_digests(FILES), get_folder_digests(FILES)).empty)
+
+    def test_changed_and_missing_folders(self):
+        changed = FILES.drop(index=3)
+        changed.loc[1, CN.SIZE_BYTES] = 5
+        result = get_changed_folders(get_folder_digests(FILES), get_folder_digests(changed))
+        self.assertListEqual(sorted(result), [ROOT_FOLDER, "a", "c", os.path.join("c", "d")])
+
+
+class FolderDigestsTestsHelpers(unittest.TestCase):
+    def test_get_parent_folders(self):
+        result = get_parent_folders(pd.Series(["file.txt", os.path.join("a", "b", "file.txt")]))
+        self.assertListEqual(result.tolist(), [ROOT_FOLDER, os.path.join("a", "b")])
+        self.assertTrue(get_parent_folders(pd.Series([], dtype=object)).empty)
+
+    def test_get_folder_depth(self):
+        self.assertEqual(get_folder_depth(ROOT_FOLDER), 0)
+        self.assertEqual(get_folder_depth("a"), 1)
+        self.assertEqual(get_folder_depth(os.path.join("a", "b")), 2)
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
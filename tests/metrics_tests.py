@@ -0,0 +1,94 @@
+import os
+import json
+import time
+import unittest
+import threading
+
+from metrics import CrawlMetrics, PhaseMetrics, PROMETHEUS_PREFIX
+from structures import Phase
+
+# region constants
+TEMP_JSON = "temp_metrics.json"
+TEMP_PROMETHEUS = "temp_metrics.prom"
+BUSY_SECONDS = 0.3
+
+
+def keep_cpu_busy(metrics: CrawlMetrics, phase: str) -> None:
+    with metrics.measure(phase):
+        end = time.perf_counter() + BUSY_SECONDS
+        while time.perf_counter() < end:
+            pass
+
+
+# endregion
+
+# region Unit tests
+class MetricsTestsCrawlMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = CrawlMetrics()
+        for _ in range(2):
+            with self.metrics.measure(Phase.WALK) as phase:
+                phase.items += 5
+                phase.bytes_read += 100
+        with self.metrics.measure(Phase.SAVE) as phase:
+            phase.errors += 1
+
+    def tearDown(self):
+        for path in (TEMP_JSON, TEMP_PROMETHEUS):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_runs_of_phase_are_summed(self):
+        walk = self.metrics.phases[Phase.WALK]
+        self.assertEqual((walk.calls, walk.items, walk.bytes_read, walk.errors), (2, 10, 200, 0))
+        self.assertGreater(walk.wall_seconds, 0)
+        self.assertEqual(walk.items_per_second, walk.items / walk.wall_seconds)
+
+    def test_phase_is_measured_also_when_it_fails(self):
+        with self.assertRaises(ValueError), self.metrics.measure(Phase.LOAD):
+            raise ValueError
+        self.assertEqual(self.metrics.phases[Phase.LOAD].calls, 1)
+
+    def test_overlapping_phases_do_not_count_each_others_cpu_time(self):
+        metrics = CrawlMetrics()
+        background = threading.Thread(target=keep_cpu_busy, args=(metrics, Phase.SAVE))
+        with metrics.measure(Phase.RENDER):
+            background.start()
+            background.join()
+
+        self.assertGreater(metrics.phases[Phase.SAVE].cpu_seconds, BUSY_SECONDS / 2)
+        self.assertLess(metrics.phases[Phase.RENDER].cpu_seconds, BUSY_SECONDS / 2)
+
+    def test_phase_with_own_threads_counts_their_cpu_time(self):
+        metrics = CrawlMetrics()
+        worker = threading.Thread(target=keep_cpu_busy, args=(metrics, Phase.SAVE))
+        with metrics.measure(Phase.WALK, include_threads=True):
+            worker.start()
+            worker.join()
+
+        self.assertGreater(metrics.phases[Phase.WALK].cpu_seconds, BUSY_SECONDS / 2)
+
+    def test_phase_without_time_has_no_speed(self):
+        self.assertEqual(PhaseMetrics(Phase.FILTER, items=3).items_per_second, 0.0)
+
+    def test_save_json(self):
+        self.metrics.save(TEMP_JSON)
+        with open(TEMP_JSON) as f:
+            saved = json.load(f)
+        self.assertListEqual([phase["phase"] for phase in saved["phases"]], [Phase.WALK, Phase.SAVE])
+        self.assertEqual(saved["phases"][0]["items"], 10)
+        self.assertIn("items_per_second", saved["phases"][0])
+
+    def test_save_prometheus(self):
+        self.metrics.save(TEMP_PROMETHEUS)
+        with open(TEMP_PROMETHEUS) as f:
+            lines = f.read().splitlines()
+        self.assertIn(f'{PROMETHEUS_PREFIX}_items_total{{phase="{Phase.WALK}"}} 10', lines)
+        self.assertIn(f'{PROMETHEUS_PREFIX}_errors_total{{phase="{Phase.SAVE}"}} 1', lines)
+        self.assertIn(f"# TYPE {PROMETHEUS_PREFIX}_wall_seconds_total counter", lines)
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
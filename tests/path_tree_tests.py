@@ -0,0 +1,80 @@
+import os
+import unittest
+import numpy as np
+
+from path_tree import PathTree, NO_DIRECTORY, NO_PARENT
+
+# region constants
+ROOT = os.sep.join(["C:", "Users"])
+PATHS = [os.path.join(ROOT, "a", "b", "file_1.txt"),
+         os.path.join(ROOT, "a", "file_2.txt"),
+         os.path.join(ROOT, "a", "b"),
+         os.path.join(ROOT, "c", "file_3.txt"),
+         os.path.join(ROOT, "a", "b", "file_4.txt"),
+         "file_5.txt"]
+
+
+# endregion
+
+# region Unit tests
+class PathTreeTestsEncode(unittest.TestCase):
+    def setUp(self):
+        self.tree = PathTree()
+        self.directory_ids, self.names = self.tree.encode(PATHS)
+
+    def test_paths_are_rebuilt_exactly(self):
+        self.assertListEqual(self.tree.get_paths(self.directory_ids, self.names).tolist(), PATHS)
+
+    def test_paths_with_repeated_and_trailing_separators_are_rebuilt_exactly(self):
+        paths = [os.sep + "a" + os.sep * 2 + "b", "a" + os.sep, os.sep]
+        tree = PathTree()
+        self.assertListEqual(tree.get_paths(*tree.encode(paths)).tolist(), paths)
+
+    def test_every_directory_is_stored_once(self):
+        self.assertListEqual(self.tree.get_directory_paths(), ["C:", ROOT, os.path.join(ROOT, "a"),
+                                                               os.path.join(ROOT, "a", "b"), os.path.join(ROOT, "c")])
+        self.assertListEqual(self.tree.parent_ids, [NO_PARENT, 0, 1, 2, 1])
+        self.assertListEqual(self.names.tolist(), ["file_1.txt", "file_2.txt", "b", "file_3.txt", "file_4.txt",
+                                                   "file_5.txt"])
+        self.assertListEqual(self.directory_ids.tolist(), [3, 2, 2, 4, 3, NO_DIRECTORY])
+
+    def test_only_requested_rows_are_rebuilt(self):
+        self.assertListEqual(self.tree.get_paths(self.directory_ids[[3]], self.names[[3]]).tolist(), [PATHS[3]])
+
+    def test_no_paths(self):
+        directory_ids, names = PathTree().encode([])
+        self.assertEqual(len(directory_ids), 0)
+        self.assertEqual(len(names), 0)
+
+    def test_tree_from_lists(self):
+        tree = PathTree.from_lists(self.tree.parent_ids, self.tree.names)
+        self.assertListEqual(tree.get_paths(self.directory_ids, self.names).tolist(), PATHS)
+        self.assertListEqual(tree.get_directory_paths(), self.tree.get_directory_paths())
+        self.assertEqual(tree.find_directory(os.path.join(ROOT, "c")), 4)
+
+
+class PathTreeTestsQueries(unittest.TestCase):
+    def setUp(self):
+        self.tree = PathTree()
+        self.directory_ids, self.names = self.tree.encode(PATHS)
+
+    def test_directory_which_is_not_in_tree(self):
+        self.assertIsNone(self.tree.find_directory(os.path.join(ROOT, "d")))
+
+    def test_values_are_aggregated_into_all_parent_directories(self):
+        totals = self.tree.aggregate(self.directory_ids, np.array([1, 2, 0, 4, 8, 16]))
+        self.assertListEqual(totals.tolist(), [15, 15, 11, 9, 4])
+
+    def test_maximums_ignore_missing_values(self):
+        totals = self.tree.aggregate(self.directory_ids, np.array([1, np.nan, 0, 4, 8, 16]), np.fmax, np.nan)
+        self.assertListEqual(totals.tolist(), [8, 8, 8, 8, 4])
+
+    def test_depths_of_directories(self):
+        self.assertListEqual(self.tree.get_depths().tolist(), [0, 1, 2, 3, 2])
+
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
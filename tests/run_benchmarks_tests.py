@@ -0,0 +1,44 @@
+import unittest
+
+from benchmarks.run_benchmarks import find_regressions, time_stage
+
+# region constants
+def make_results(*rows: tuple[str, str, float]) -> dict:
+    return {"results": [{"shape": shape, "stage": stage, "best": best} for shape, stage, best in rows]}
+
+
+BASELINE = make_results(("wide", "_crawl_deep", 1.0), ("wide", "_save_dataframes", 2.0))
+
+
+# endregion
+
+# region Unit tests
+class RunBenchmarksTestsFindRegressions(unittest.TestCase):
+    def test_only_slower_stages_are_regressions(self):
+        results = make_results(("wide", "_crawl_deep", 1.5), ("wide", "_save_dataframes", 2.1),
+                               ("deep", "_crawl_deep", 9.0))
+        regressions = find_regressions(results, BASELINE, tolerance=0.2)
+        self.assertListEqual(regressions, [{"shape": "wide", "stage": "_crawl_deep", "ratio": 1.5}])
+
+    def test_no_regressions(self):
+        self.assertListEqual(find_regressions(BASELINE, BASELINE), [])
+
+
+class RunBenchmarksTestsTimeStage(unittest.TestCase):
+    def test_stage_is_run_repeatedly_without_output(self):
+        calls = []
+
+        def stage():
+            print("This line is not printed.")
+            calls.append(None)
+            return len(calls)
+
+        result, seconds = time_stage(stage, repeat=3)
+        self.assertEqual(result, 3)
+        self.assertEqual(len(seconds), 3)
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import os
+import json
+import unittest
+import datetime
+import numpy as np
+import pandas as pd
+
+import snapshots
+from snapshots import save_snapshot, load_snapshot, iter_snapshot, read_snapshot_schema, get_column_type, \
+    merge_sorted_snapshots, SnapshotWriter, STRING_TYPE, PATH_TYPE, DATETIME_TYPE, SCHEMA_MEMBER, COLUMN_MEMBER
+from structures import ColumnNames as CN
+
+# region constants
+TEMP_SNAPSHOT = "temp_snapshot.npz"
+TEMP_CHUNKS = ("temp_chunk_1.npz", "temp_chunk_2.npz")
+
+TEST_DATAFRAME = pd.DataFrame({
+    CN.PATH: ['C:/Users', 'C:/Users/Subfolder', 'C:/Users/Příliš žluťoučký kůň'],
+    CN.CHANGED: pd.to_datetime([datetime.datetime(2022, 1, 1), datetime.datetime(2022, 2, 1), None]),
+    CN.SIZE_BYTES: np.array([1024, 2048, 3072], dtype=np.int64),
+    CN.FILE_COUNT: [1.0, np.nan, 3.0]
+})
+
+
+# endregion
+
+# region Unit tests
+class SnapshotsTestsSaveAndLoad(unittest.TestCase):
+    def tearDown(self):
+        if os.path.exists(TEMP_SNAPSHOT):
+            os.remove(TEMP_SNAPSHOT)
+
+    def test_load_returns_saved_dataframe(self):
+        save_snapshot(TEMP_SNAPSHOT, TEST_DATAFRAME)
+        result = load_snapshot(TEMP_SNAPSHOT)
+        pd.testing.assert_frame_equal(result, TEST_DATAFRAME)
+
+    def test_load_only_requested_columns(self):
+        save_snapshot(TEMP_SNAPSHOT, TEST_DATAFRAME)
+        result = load_snapshot(TEMP_SNAPSHOT, [CN.SIZE_BYTES, CN.PATH])
+        pd.testing.assert_frame_equal(result, TEST_DATAFRAME[[CN.SIZE_BYTES, CN.PATH]])
+
+    def test_load_non_existing_column(self):
+        save_snapshot(TEMP_SNAPSHOT, TEST_DATAFRAME)
+        with self.assertRaises(KeyError):
+            load_snapshot(TEMP_SNAPSHOT, ["non_existing_column"])
+
+    def test_load_empty_dataframe(self):
+        empty = TEST_DATAFRAME.iloc[:0]
+        save_snapshot(TEMP_SNAPSHOT, empty)
+        result = load_snapshot(TEMP_SNAPSHOT)
+        self.assertTrue(result.empty)
+        self.assertListEqual(list(result.columns), list(TEST_DATAFRAME.columns))
+
+    def test_schema_describes_columns(self):
+        save_snapshot(TEMP_SNAPSHOT, TEST_DATAFRAME)
+        schema = read_snapshot_schema(TEMP_SNAPSHOT)
+        self.assertEqual(schema["rows"], len(TEST_DATAFRAME))
+        self.assertListEqual([column["type"] for column in schema["columns"]],
+                             [STRING_TYPE, DATETIME_TYPE, "int64", "float64"])
+
+    def test_schema_contains_metadata(self):
+        metadata = {"root": "C:/Users", "deep": True}
+        save_snapshot(TEMP_SNAPSHOT, TEST_DATAFRAME, metadata)
+        self.assertDictEqual(read_snapshot_schema(TEMP_SNAPSHOT)["metadata"], metadata)
+
+    def test_schema_without_metadata(self):
+        save_snapshot(TEMP_SNAPSHOT, TEST_DATAFRAME)
+        self.assertDictEqual(read_snapshot_schema(TEMP_SNAPSHOT)["metadata"], {})
+
+
+class SnapshotsTestsRowGroups(unittest.TestCase):
+    def setUp(self):
+        self.row_group_size = snapshots.ROW_GROUP_SIZE
+        snapshots.ROW_GROUP_SIZE = 2
+
+    def tearDown(self):
+        snapshots.ROW_GROUP_SIZE = self.row_group_size
+        if os.path.exists(TEMP_SNAPSHOT):
+            os.remove(TEMP_SNAPSHOT)
+
+    def test_rows_are_split_into_row_groups(self):
+        save_snapshot(TEMP_SNAPSHOT, TEST_DATAFRAME)
+        row_groups = list(iter_snapshot(TEMP_SNAPSHOT, [CN.PATH]))
+
+        self.assertListEqual(read_snapshot_schema(TEMP_SNAPSHOT)["row_groups"], [2, 1])
+        self.assertListEqual([len(group) for group in row_groups], [2, 1])
+        pd.testing.assert_frame_equal(load_snapshot(TEMP_SNAPSHOT), TEST_DATAFRAME)
+
+    def test_empty_snapshot_yields_one_empty_dataframe(self):
+        save_snapshot(TEMP_SNAPSHOT, TEST_DATAFRAME.iloc[:0])
+        row_groups = list(iter_snapshot(TEMP_SNAPSHOT))
+        self.assertEqual(len(row_groups), 1)
+        self.assertTrue(row_groups[0].empty)
+
+    def test_load_snapshot_of_version_1(self):
+        schema = {"version": 1, "rows": 3, "columns": [{"name": CN.SIZE_BYTES, "type": "int64"}]}
+        np.savez_compressed(TEMP_SNAPSHOT, **{
+            COLUMN_MEMBER.format(0): TEST_DATAFRAME[CN.SIZE_BYTES].to_numpy(),
+            SCHEMA_MEMBER: np.frombuffer(json.dumps(schema).encode(), dtype=np.uint8)})
+        pd.testing.assert_frame_equal(load_snapshot(TEMP_SNAPSHOT), TEST_DATAFRAME[[CN.SIZE_BYTES]])
+
+
+class SnapshotsTestsPathColumns(unittest.TestCase):
+    def setUp(self):
+        self.row_group_size = snapshots.ROW_GROUP_SIZE
+        snapshots.ROW_GROUP_SIZE = 2
+
+    def tearDown(self):
+        snapshots.ROW_GROUP_SIZE = self.row_group_size
+        for path in (TEMP_SNAPSHOT, *TEMP_CHUNKS):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_path_column_is_loaded_as_saved(self):
+        save_snapshot(TEMP_SNAPSHOT, TEST_DATAFRAME, path_columns=[CN.PATH])
+        self.assertEqual(read_snapshot_schema(TEMP_SNAPSHOT)["columns"][0]["type"], PATH_TYPE)
+        pd.testing.assert_frame_equal(load_snapshot(TEMP_SNAPSHOT), TEST_DATAFRAME)
+        pd.testing.assert_frame_equal(load_snapshot(TEMP_SNAPSHOT, [CN.PATH]), TEST_DATAFRAME[[CN.PATH]])
+
+    def test_empty_path_column(self):
+        save_snapshot(TEMP_SNAPSHOT, TEST_DATAFRAME.iloc[:0], path_columns=[CN.PATH])
+        result = load_snapshot(TEMP_SNAPSHOT)
+        self.assertTrue(result.empty)
+        self.assertListEqual(list(result.columns), list(TEST_DATAFRAME.columns))
+
+    def test_merged_snapshot_keeps_path_column(self):
+        save_snapshot(TEMP_CHUNKS[0], TEST_DATAFRAME.iloc[[0, 2]], path_columns=[CN.PATH])
+        save_snapshot(TEMP_CHUNKS[1], TEST_DATAFRAME.iloc[[1]], path_columns=[CN.PATH])
+        merge_sorted_snapshots(list(TEMP_CHUNKS), TEMP_SNAPSHOT, CN.PATH)
+
+        self.assertEqual(read_snapshot_schema(TEMP_SNAPSHOT)["columns"][0]["type"], PATH_TYPE)
+        pd.testing.assert_frame_equal(load_snapshot(TEMP_SNAPSHOT),
+                                      TEST_DATAFRAME.sort_values(CN.PATH, ignore_index=True))
+
+
+class SnapshotsTestsSnapshotWriter(unittest.TestCase):
+    def tearDown(self):
+        for path in (TEMP_SNAPSHOT, *TEMP_CHUNKS):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_written_parts_are_loaded_as_one_dataframe(self):
+        with SnapshotWriter(TEMP_SNAPSHOT, row_group_size=2) as writer:
+            writer.write(TEST_DATAFRAME.iloc[:1])
+            writer.write(TEST_DATAFRAME.iloc[1:])
+
+        self.assertListEqual(read_snapshot_schema(TEMP_SNAPSHOT)["row_groups"], [1, 2])
+        pd.testing.assert_frame_equal(load_snapshot(TEMP_SNAPSHOT), TEST_DATAFRAME)
+
+    def test_failed_writing_leaves_no_snapshot(self):
+        with self.assertRaises(RuntimeError):
+            with SnapshotWriter(TEMP_SNAPSHOT) as writer:
+                writer.write(TEST_DATAFRAME)
+                raise RuntimeError()
+        self.assertListEqual([path for path in os.listdir() if path.startswith(TEMP_SNAPSHOT)], [])
+
+    def test_merged_snapshot_is_sorted(self):
+        save_snapshot(TEMP_CHUNKS[0], TEST_DATAFRAME.iloc[[0, 2]].sort_values(CN.PATH), row_group_size=1)
+        save_snapshot(TEMP_CHUNKS[1], TEST_DATAFRAME.iloc[[1]])
+        rows = merge_sorted_snapshots(list(TEMP_CHUNKS), TEMP_SNAPSHOT, CN.PATH, {"root": "C:/Users"})
+
+        self.assertEqual(rows, 3)
+        self.assertDictEqual(read_snapshot_schema(TEMP_SNAPSHOT)["metadata"], {"root": "C:/Users"})
+        pd.testing.assert_frame_equal(load_snapshot(TEMP_SNAPSHOT),
+                                      TEST_DATAFRAME.sort_values(CN.PATH, ignore_index=True))
+
+    def test_merge_of_empty_snapshots(self):
+        save_snapshot(TEMP_CHUNKS[0], TEST_DATAFRAME.iloc[:0])
+        self.assertEqual(merge_sorted_snapshots([TEMP_CHUNKS[0]], TEMP_SNAPSHOT, CN.PATH), 0)
+        result = load_snapshot(TEMP_SNAPSHOT)
+        self.assertTrue(result.empty)
+        self.assertListEqual(list(result.columns), list(TEST_DATAFRAME.columns))
+
+
+class SnapshotsTestsGetColumnType(unittest.TestCase):
+    def test_column_with_mixed_objects_cannot_be_stored(self):
+        with self.assertRaises(TypeError):
+            get_column_type(pd.Series(['path', 1]))
+
+    def test_column_with_strings(self):
+        self.assertEqual(get_column_type(TEST_DATAFRAME[CN.PATH]), STRING_TYPE)
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
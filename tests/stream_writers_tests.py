@@ -0,0 +1,66 @@
+import io
+import json
+import datetime
+import unittest
+import pandas as pd
+
+from stream_writers import write_table, write_csv, write_ndjson, CSV_COLUMNS
+from structures import ItemType, ColumnNames as CN
+
+# region constants
+CHANGE = datetime.datetime(2022, 1, 1, 10, 0, 0)
+FILES = pd.DataFrame({CN.PATH: ["root/file1.txt", "root/file2.txt"], CN.CHANGED: [CHANGE, CHANGE],
+                      CN.SIZE_BYTES: [10, 20]})
+FOLDERS = pd.DataFrame({CN.PATH: ["root/folder"], CN.CHANGED: [CHANGE], CN.SIZE_BYTES: [30], CN.FILE_COUNT: [2],
+                        CN.NEWEST_CHANGE: [CHANGE]})
+BATCHES = [(ItemType.FILES, FILES.iloc[:1]), (ItemType.FILES, FILES.iloc[1:]), (ItemType.FOLDERS, FOLDERS)]
+
+
+# endregion
+
+# region Unit tests
+class StreamWritersTestsWriteTable(unittest.TestCase):
+    def test_rows_are_numbered_through_batches_of_one_type(self):
+        file = io.StringIO()
+        rows = write_table(BATCHES, file, lambda batch: ",".join(map(str, batch.index)))
+        self.assertEqual(rows, 3)
+        self.assertListEqual(file.getvalue().splitlines(), [ItemType.FILES.upper(), "0", "1",
+                                                            ItemType.FOLDERS.upper(), "0"])
+
+
+class StreamWritersTestsWriteCsv(unittest.TestCase):
+    def test_one_header_for_all_item_types(self):
+        file = io.StringIO()
+        rows = write_csv(BATCHES, file)
+        file.seek(0)
+        written = pd.read_csv(file)
+
+        self.assertEqual(rows, 3)
+        self.assertListEqual(list(written.columns), CSV_COLUMNS)
+        self.assertListEqual(written[CN.ITEM_TYPE].tolist(), [ItemType.FILES, ItemType.FILES, ItemType.FOLDERS])
+        self.assertListEqual(written[CN.SIZE_BYTES].tolist(), [10, 20, 30])
+        self.assertTrue(pd.isna(written[CN.FILE_COUNT][0]))
+
+
+class StreamWritersTestsWriteNdjson(unittest.TestCase):
+    def test_one_object_per_line(self):
+        file = io.StringIO()
+        rows = write_ndjson(BATCHES, file)
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+
+        self.assertEqual(rows, 3)
+        self.assertEqual(len(lines), 3)
+        self.assertDictEqual(lines[0], {CN.ITEM_TYPE: ItemType.FILES, CN.PATH: "root/file1.txt",
+                                        CN.CHANGED: "2022-01-01T10:00:00.000000", CN.SIZE_BYTES: 10})
+        self.assertEqual(lines[2][CN.FILE_COUNT], 2)
+
+    def test_no_batches(self):
+        file = io.StringIO()
+        self.assertEqual(write_ndjson([], file), 0)
+        self.assertEqual(file.getvalue(), "")
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
 import os
+import glob
+import shutil
 
 from structures import SavedCrawls, FileOps
 
@@ -70,7 +72,12 @@ class TestHelper:
         """
         This method deletes all files containing saved crawls and the root folder of the saved crawls.
         """
-        os.remove(SavedCrawls.FILES)
-        os.remove(SavedCrawls.FOLDERS)
-        os.remove(SavedCrawls.SKIPPED)
+        for path in (SavedCrawls.FILES, SavedCrawls.FOLDERS, SavedCrawls.SKIPPED,
+                     SavedCrawls.FILES_SNAPSHOT, SavedCrawls.FOLDERS_SNAPSHOT, SavedCrawls.SKIPPED_SNAPSHOT,
+                     SavedCrawls.INDEX, SavedCrawls.CONTENT_INDEX, SavedCrawls.HASH_CACHE,
+                     *glob.glob(SavedCrawls.FILES_TEMP.format("*")), *glob.glob(SavedCrawls.DIGESTS_TEMP.format("*"))):
+            if os.path.exists(path):
+                os.remove(path)
+        for path in glob.glob(f"{SavedCrawls.DIFFERENCES}*"):
+            shutil.rmtree(path)
         os.rmdir(SavedCrawls.ROOT)
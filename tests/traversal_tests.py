@@ -0,0 +1,338 @@
+import os
+import datetime
+import unittest
+from unittest import mock
+
+import traversal
+from test_helper import TestHelper
+from traversal import (WorkStealingWalker, scan_roots_by_device, group_by_device, is_rotational_device,
+                       scan_items, scan_items_incremental, scan_tree_totals, scan_tree_totals_batch,
+                       unpack_totals_batch, aggregate_folder_totals, FolderTotalsAggregator,
+                       NONE, RECORD_PATH, RECORD_IS_FOLDER, RECORD_SIZE, RECORD_MTIME)
+
+# region constants
+TEMP_DIR = "temp_dir"
+SUB_DIR_1 = "sub_dir1"
+SUB_DIR_2 = "sub_dir2"
+TEMP_FILE_1 = "temp_file1.txt"
+TEMP_FILE_2 = "temp_file2.txt"
+TEST_TEXT = "This is a temporary file for testing."
+TEST_PATHS = (TEMP_DIR,
+              os.path.join(TEMP_DIR, SUB_DIR_1),
+              os.path.join(TEMP_DIR, SUB_DIR_2),
+              os.path.join(TEMP_DIR, TEMP_FILE_1),
+              os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_1),
+              os.path.join(TEMP_DIR, SUB_DIR_2, TEMP_FILE_2))
+
+
+# endregion
+
+# region Unit tests
+class TraversalTestsScanItems(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(*TEST_PATHS)
+        self.test_helper.create_test_paths(TEST_TEXT)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+
+    def test_scan_items_deep_has_same_order_as_os_walk(self):
+        expected = []
+        for root, folders, files in os.walk(TEMP_DIR):
+            expected.extend((os.path.join(root, file), False) for file in files)
+            expected.extend((os.path.join(root, folder), True) for folder in folders)
+
+        result = [record[:RECORD_SIZE] for record in scan_items(TEMP_DIR, go_deep=True)]
+
+        self.assertListEqual(result, expected)
+        self.assertEqual(len(result), len(TEST_PATHS) - 1)
+
+    def test_scan_items_shallow_stays_in_root(self):
+        result = [record[RECORD_PATH] for record in scan_items(TEMP_DIR, go_deep=False)]
+        expected = [os.path.join(TEMP_DIR, TEMP_FILE_1),
+                    os.path.join(TEMP_DIR, SUB_DIR_1),
+                    os.path.join(TEMP_DIR, SUB_DIR_2)]
+        self.assertListEqual(sorted(result), sorted(expected))
+
+    def test_scan_items_returns_stat_of_files(self):
+        for record in scan_items(TEMP_DIR, go_deep=True):
+            if record[RECORD_IS_FOLDER]:
+                self.assertIs(record[RECORD_SIZE], NONE)
+            else:
+                self.assertEqual(record[RECORD_SIZE], os.path.getsize(record[RECORD_PATH]))
+            self.assertEqual(record[RECORD_MTIME], os.path.getmtime(record[RECORD_PATH]))
+
+    def test_scan_items_non_existing_folder(self):
+        result = list(scan_items(os.path.join(TEMP_DIR, "non_existing_folder"), go_deep=True))
+        self.assertListEqual(result, [])
+
+
+class TraversalTestsScanItemsIncremental(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(*TEST_PATHS)
+        self.test_helper.create_test_paths(TEST_TEXT)
+        self.previous_listings, self.previous_changes = self._get_previous_crawl(TEMP_DIR)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+
+    @staticmethod
+    def _get_previous_crawl(path: str) -> tuple[dict, dict]:
+        records = list(scan_items(path, go_deep=True))
+        folders = [path] + [record[RECORD_PATH] for record in records if record[RECORD_IS_FOLDER]]
+        previous_changes = {folder: datetime.datetime.fromtimestamp(os.path.getmtime(folder)) for folder in folders}
+        previous_listings = {folder: ([], []) for folder in folders}
+        for record in records:
+            listing = previous_listings[os.path.dirname(record[RECORD_PATH])]
+            if record[RECORD_IS_FOLDER]:
+                listing[1].append(record[RECORD_PATH])
+            else:
+                listing[0].append(record)
+        return previous_listings, previous_changes
+
+    def test_incremental_scan_returns_same_records_as_full_scan(self):
+        result = list(scan_items_incremental(TEMP_DIR, self.previous_listings, self.previous_changes))
+        self.assertListEqual(result, list(scan_items(TEMP_DIR, go_deep=True)))
+
+    def test_unchanged_folders_are_not_listed_again(self):
+        with mock.patch.object(traversal, "scan_directory", wraps=traversal.scan_directory) as scan_directory:
+            list(scan_items_incremental(TEMP_DIR, self.previous_listings, self.previous_changes))
+        scan_directory.assert_not_called()
+
+    def test_changed_folder_is_listed_again(self):
+        new_file = os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_2)
+        previous_change = datetime.datetime.fromtimestamp(os.path.getmtime(os.path.join(TEMP_DIR, SUB_DIR_1)))
+        self.previous_changes[os.path.join(TEMP_DIR, SUB_DIR_1)] = previous_change - datetime.timedelta(seconds=1)
+        with open(new_file, "w") as f:
+            f.write(TEST_TEXT)
+
+        with mock.patch.object(traversal, "scan_directory", wraps=traversal.scan_directory) as scan_directory:
+            result = list(scan_items_incremental(TEMP_DIR, self.previous_listings, self.previous_changes))
+        expected = list(scan_items(TEMP_DIR, go_deep=True))
+        os.remove(new_file)
+
+        self.assertListEqual(result, expected)
+        scan_directory.assert_called_once_with(os.path.join(TEMP_DIR, SUB_DIR_1))
+
+    def test_modified_file_in_unchanged_folder_is_stat_again(self):
+        file_path = os.path.join(TEMP_DIR, SUB_DIR_2, TEMP_FILE_2)
+        with open(file_path, "a") as f:
+            f.write(TEST_TEXT)
+
+        result = list(scan_items_incremental(TEMP_DIR, self.previous_listings, self.previous_changes))
+        trusted = list(scan_items_incremental(TEMP_DIR, self.previous_listings, self.previous_changes,
+                                              restat_files=False))
+
+        self.assertListEqual(result, list(scan_items(TEMP_DIR, go_deep=True)))
+        self.assertIn(self.previous_listings[os.path.join(TEMP_DIR, SUB_DIR_2)][0][0], trusted)
+
+    def test_deleted_folder_is_noticed(self):
+        self.previous_listings[os.path.join(TEMP_DIR, SUB_DIR_1)][1].append(
+            os.path.join(TEMP_DIR, SUB_DIR_1, "deleted_folder"))
+        result = list(scan_items_incremental(TEMP_DIR, self.previous_listings, self.previous_changes))
+        self.assertListEqual(result, list(scan_items(TEMP_DIR, go_deep=True)))
+
+
+class TraversalTestsWorkStealingWalker(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(*TEST_PATHS)
+        self.test_helper.create_test_paths(TEST_TEXT)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+
+    def test_parallel_scan_returns_same_records_as_serial_scan(self):
+        result = WorkStealingWalker(workers=4).scan(TEMP_DIR, go_deep=True)
+        expected = list(scan_items(TEMP_DIR, go_deep=True))
+        self.assertListEqual(result, expected)
+
+    def test_parallel_scan_shallow(self):
+        result = WorkStealingWalker(workers=4).scan(TEMP_DIR, go_deep=False)
+        expected = list(scan_items(TEMP_DIR, go_deep=False))
+        self.assertListEqual(result, expected)
+
+    def test_parallel_scan_non_existing_folder(self):
+        result = WorkStealingWalker(workers=4).scan(os.path.join(TEMP_DIR, "non_existing_folder"), go_deep=True)
+        self.assertListEqual(result, [])
+
+    def test_parallel_scan_of_more_roots(self):
+        # The second root is a sub-folder of the first one, so both walks share the listed folders.
+        roots = [TEMP_DIR, os.path.join(TEMP_DIR, SUB_DIR_1)]
+        for workers in (1, 4):
+            with self.subTest(workers=workers):
+                result = WorkStealingWalker(workers=workers).scan_roots(roots, go_deep=True)
+                self.assertListEqual(result, [list(scan_items(root, go_deep=True)) for root in roots])
+
+    def test_roots_are_listed_at_the_same_time_with_one_worker(self):
+        roots = [os.path.join(TEMP_DIR, SUB_DIR_1), os.path.join(TEMP_DIR, SUB_DIR_2)]
+        with mock.patch.object(traversal.threading, "Thread", wraps=traversal.threading.Thread) as thread:
+            result = WorkStealingWalker(workers=1).scan_roots(roots, go_deep=True)
+
+        self.assertEqual(thread.call_count, len(roots))
+        self.assertListEqual(result, [list(scan_items(root, go_deep=True)) for root in roots])
+
+    def test_threads_of_one_worker_are_capped(self):
+        roots = [TEMP_DIR, os.path.join(TEMP_DIR, SUB_DIR_1), os.path.join(TEMP_DIR, SUB_DIR_2)]
+        for max_threads in (1, 2):
+            with self.subTest(max_threads=max_threads), \
+                    mock.patch.object(traversal.threading, "Thread", wraps=traversal.threading.Thread) as thread:
+                result = WorkStealingWalker(workers=1, max_threads=max_threads).scan_roots(roots, go_deep=True)
+
+                self.assertLessEqual(thread.call_count, max_threads)
+                self.assertListEqual(result, [list(scan_items(root, go_deep=True)) for root in roots])
+
+    def test_workers_are_at_least_one(self):
+        self.assertEqual(WorkStealingWalker(workers=0).workers, 1)
+
+
+class TraversalTestsAggregateFolderTotals(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(*TEST_PATHS)
+        self.test_helper.create_test_paths(TEST_TEXT)
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+
+    def test_aggregated_totals_match_walking_each_folder(self):
+        records = list(scan_items(TEMP_DIR, go_deep=True))
+
+        result = aggregate_folder_totals(records)
+
+        expected = {record[RECORD_PATH]: scan_tree_totals(record[RECORD_PATH])
+                    for record in records if record[RECORD_IS_FOLDER]}
+        self.assertDictEqual(result, expected)
+
+    def test_aggregated_totals_of_one_folder(self):
+        result = aggregate_folder_totals(list(scan_items(TEMP_DIR, go_deep=True)))
+        size, file_count, newest_change = result[os.path.join(TEMP_DIR, SUB_DIR_1)]
+
+        self.assertEqual(size, len(TEST_TEXT))
+        self.assertEqual(file_count, 1)
+        self.assertEqual(newest_change, os.path.getmtime(os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_1)))
+
+    def test_aggregated_totals_of_empty_folder(self):
+        records = [(os.path.join(TEMP_DIR, SUB_DIR_1), True, NONE, 0.0)]
+        result = aggregate_folder_totals(records)
+        self.assertEqual(result[os.path.join(TEMP_DIR, SUB_DIR_1)], (0, 0, NONE))
+
+    def test_aggregated_size_is_none_if_any_file_is_unreadable(self):
+        records = [(os.path.join(TEMP_DIR, SUB_DIR_1), True, NONE, 0.0),
+                   (os.path.join(TEMP_DIR, SUB_DIR_1, TEMP_FILE_1), False, NONE, NONE)]
+        result = aggregate_folder_totals(records)
+        self.assertIs(result[os.path.join(TEMP_DIR, SUB_DIR_1)][0], NONE)
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "Symbolic links are not supported.")
+    def test_content_of_linked_folder_is_not_added_to_parent_folders(self):
+        link = os.path.join(TEMP_DIR, SUB_DIR_1, "link")
+        try:
+            os.symlink(os.path.abspath(os.path.join(TEMP_DIR, SUB_DIR_2)), link, target_is_directory=True)
+        except OSError:
+            self.skipTest("Symbolic links cannot be created.")
+        try:
+            records = list(scan_items(TEMP_DIR, go_deep=True))
+            result = aggregate_folder_totals(records)
+            expected = {record[RECORD_PATH]: scan_tree_totals(record[RECORD_PATH])
+                        for record in records if record[RECORD_IS_FOLDER]}
+        finally:
+            os.remove(link)
+
+        self.assertIn(link, result)
+        self.assertEqual(result[link][1], 1)
+        self.assertEqual(result[os.path.join(TEMP_DIR, SUB_DIR_1)][1], 1)
+        self.assertDictEqual(result, expected)
+
+    def test_totals_of_records_added_one_by_one_are_the_same(self):
+        records = list(scan_items(TEMP_DIR, go_deep=True))
+        aggregator = FolderTotalsAggregator()
+        for record in records:
+            aggregator.add_records([record])
+        self.assertDictEqual(aggregator.get_totals(), aggregate_folder_totals(records))
+
+
+class TraversalTestsScanTreeTotals(unittest.TestCase):
+    def test_scan_tree_totals_of_non_existing_folder(self):
+        self.assertEqual(scan_tree_totals("non_existing_folder"), (0, 0, NONE))
+
+    def test_scan_tree_totals_match_os_walk(self):
+        test_helper = TestHelper(*TEST_PATHS)
+        test_helper.create_test_paths(TEST_TEXT)
+
+        size, file_count, _ = scan_tree_totals(TEMP_DIR)
+        expected_size = sum(os.path.getsize(os.path.join(root, file))
+                            for root, _, files in os.walk(TEMP_DIR) for file in files)
+
+        test_helper.delete_test_paths()
+
+        self.assertEqual(size, expected_size)
+        self.assertEqual(file_count, 3)
+
+
+class TraversalTestsScanTreeTotalsBatch(unittest.TestCase):
+    def test_batch_returns_parallel_arrays(self):
+        test_helper = TestHelper(*TEST_PATHS)
+        test_helper.create_test_paths(TEST_TEXT)
+        paths = [TEMP_DIR, os.path.join(TEMP_DIR, SUB_DIR_1), "non_existing_folder"]
+
+        sizes, file_counts, newest_changes = scan_tree_totals_batch(paths)
+        result = unpack_totals_batch(sizes, file_counts, newest_changes)
+        expected = [scan_tree_totals(path) for path in paths]
+
+        test_helper.delete_test_paths()
+
+        self.assertEqual(len(sizes), len(paths))
+        self.assertListEqual(result, expected)
+
+    def test_unpacked_missing_values_are_none(self):
+        sizes, file_counts, newest_changes = scan_tree_totals_batch(["non_existing_folder"])
+        result = unpack_totals_batch(sizes, file_counts, newest_changes)
+        self.assertIs(result[0][2], NONE)
+
+
+class TraversalTestsScanRootsByDevice(unittest.TestCase):
+    def setUp(self):
+        self.test_helper = TestHelper(*TEST_PATHS)
+        self.test_helper.create_test_paths(TEST_TEXT)
+        self.roots = [os.path.join(TEMP_DIR, SUB_DIR_1), os.path.join(TEMP_DIR, SUB_DIR_2), TEMP_DIR]
+
+    def tearDown(self):
+        self.test_helper.delete_test_paths()
+
+    def test_records_of_each_root_are_same_as_serial_scan(self):
+        expected = [list(scan_items(root, go_deep=True)) for root in self.roots]
+        # The temporary folders are on one device, the other devices are pretended.
+        for devices in ({1: [0, 1, 2]}, {1: [0], 2: [1, 2]}, {1: [0], 2: [1], 3: [2]}):
+            with self.subTest(devices=devices), mock.patch.object(traversal, "group_by_device", return_value=devices):
+                self.assertListEqual(scan_roots_by_device(self.roots, go_deep=True, workers=4), expected)
+
+    def test_rotational_devices_get_fewer_workers(self):
+        devices = {1: [0], 2: [1, 2]}
+        with mock.patch.object(traversal, "group_by_device", return_value=devices), \
+                mock.patch.object(traversal, "is_rotational_device", side_effect=lambda device: device == 2), \
+                mock.patch.object(traversal, "WorkStealingWalker", wraps=WorkStealingWalker) as walker:
+            scan_roots_by_device(self.roots, go_deep=True, workers=8, rotational_workers=2)
+        self.assertListEqual(sorted(call.args[0] for call in walker.call_args_list), [2, 8])
+
+    def test_rotational_device_with_more_roots_is_listed_by_capped_threads(self):
+        roots = self.roots * 2
+        devices = {1: list(range(len(roots)))}
+        for workers in (1, 8):
+            with self.subTest(workers=workers), \
+                    mock.patch.object(traversal, "group_by_device", return_value=devices), \
+                    mock.patch.object(traversal, "is_rotational_device", return_value=True), \
+                    mock.patch.object(traversal.threading, "Thread", wraps=traversal.threading.Thread) as thread:
+                result = scan_roots_by_device(roots, go_deep=True, workers=workers, rotational_workers=2)
+
+                self.assertLessEqual(thread.call_count, 2)
+                self.assertListEqual(result, [list(scan_items(root, go_deep=True)) for root in roots])
+
+    def test_group_by_device(self):
+        self.assertDictEqual(group_by_device(self.roots), {os.stat(TEMP_DIR).st_dev: [0, 1, 2]})
+
+    def test_device_which_does_not_report_rotation(self):
+        self.assertFalse(is_rotational_device(os.makedev(0, 0) if hasattr(os, "makedev") else 0))
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import shutil
+import unittest
+
+from benchmarks.tree_generator import generate_tree, modify_tree, TREE_SHAPES
+from traversal import scan_items
+
+# region constants
+TEMP_DIR_1 = "temp_tree1"
+TEMP_DIR_2 = "temp_tree2"
+SCALE = 0.05
+
+
+# endregion
+
+# region Unit tests
+class TreeGeneratorTestsGenerateTree(unittest.TestCase):
+    def tearDown(self):
+        for path in (TEMP_DIR_1, TEMP_DIR_2):
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def _get_relative_records(self, root: str) -> list[tuple]:
+        return [(os.path.relpath(path, root), is_folder, size if not is_folder else None, mtime)
+                for path, is_folder, size, mtime in scan_items(root, go_deep=True)]
+
+    def test_same_seed_creates_same_tree(self):
+        for shape in TREE_SHAPES:
+            with self.subTest(shape=shape):
+                counts = [generate_tree(root, shape, SCALE) for root in (TEMP_DIR_1, TEMP_DIR_2)]
+                self.assertEqual(counts[0], counts[1])
+                self.assertListEqual(self._get_relative_records(TEMP_DIR_1), self._get_relative_records(TEMP_DIR_2))
+                self.tearDown()
+
+    def test_counts_of_items(self):
+        files, folders, size = generate_tree(TEMP_DIR_1, "wide", SCALE)
+        records = list(scan_items(TEMP_DIR_1, go_deep=True))
+
+        self.assertEqual(folders, sum(is_folder for _, is_folder, _, _ in records))
+        self.assertEqual(files, len(records) - folders)
+        self.assertEqual(size, sum(size for _, is_folder, size, _ in records if not is_folder))
+
+    def test_modify_tree(self):
+        generate_tree(TEMP_DIR_1, "wide", SCALE)
+        generate_tree(TEMP_DIR_2, "wide", SCALE)
+        modified = modify_tree(TEMP_DIR_2, fraction=0.1)
+
+        different = set(self._get_relative_records(TEMP_DIR_2)) - set(self._get_relative_records(TEMP_DIR_1))
+        self.assertEqual(len(different), modified)
+
+# endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
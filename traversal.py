@@ -0,0 +1,534 @@
+import datetime
+import os
+import stat
+import threading
+import numpy as np
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+# region Constants
+NONE = np.nan
+
+# Layout of one crawl record: (path, is_folder, size in bytes, last change as a POSIX timestamp).
+# Sizes and timestamps which could not be read are set to NONE.
+RECORD_PATH = 0
+RECORD_IS_FOLDER = 1
+RECORD_SIZE = 2
+RECORD_MTIME = 3
+
+# Spinning disks slow down when their heads jump between many folders at once, so only this many workers list
+# the folders of one rotational device. Other devices (SSD, network shares) get all the workers.
+ROTATIONAL_DEVICE_WORKERS = 2
+# Linux reports for every block device whether it is rotational. Partitions have the flag on their parent device.
+ROTATIONAL_FLAG_PATHS = ("/sys/dev/block/{}:{}/queue/rotational", "/sys/dev/block/{}:{}/../queue/rotational")
+
+
+# endregion
+
+# region Traversal engine
+def scan_items(path: str, go_deep: bool) -> Iterator[tuple[str, bool, int | float, float]]:
+    """
+    Walks through the folder at the given path with os.scandir and yields one record per found item.
+    The size and the last change of every item are taken from the stat cache of os.DirEntry, therefore each item
+    costs just one stat call. Sizes of folders are not computed here and are always set to NONE.
+
+    The order of the records is the same as with os.walk (top-down): files of a folder come first, then its
+    sub-folders, then the contents of each sub-folder in turn.
+
+    :param path: The path of the folder that needs to be crawled.
+    :param go_deep: A boolean value that determines whether to go deep into subdirectories or not.
+    """
+    pending_folders = [path]
+    while pending_folders:
+        folder = pending_folders.pop()
+        files, folders, folders_to_enter = scan_directory(folder)
+        yield from files
+        yield from folders
+        if go_deep:
+            # Reversed, so that the first sub-folder is popped out from the stack first.
+            pending_folders.extend(reversed(folders_to_enter))
+
+
+def scan_directory(path: str) -> tuple[list, list, list[str]]:
+    """
+    Lists one folder with os.scandir and returns the records of its files, the records of its sub-folders and the
+    paths of sub-folders which can be entered. Symbolic links to folders are listed as folders, but they are not
+    entered (same as os.walk with followlinks=False). Folders which cannot be listed are treated as empty.
+
+    :param path: The path of the folder that needs to be listed.
+    """
+    files = []
+    folders = []
+    folders_to_enter = []
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return files, folders, folders_to_enter
+
+    with entries:
+        for entry in entries:
+            try:
+                is_folder = entry.is_dir()
+            except OSError:
+                is_folder = False
+
+            size, last_change = _get_stat_of_entry(entry)
+            if is_folder:
+                folders.append((entry.path, True, NONE, last_change))
+                if not entry.is_symlink():
+                    folders_to_enter.append(entry.path)
+            else:
+                files.append((entry.path, False, size, last_change))
+
+    return files, folders, folders_to_enter
+
+
+def _get_stat_of_entry(entry: os.DirEntry) -> tuple[int | float, float]:
+    """
+    Returns the size and the last change of the given entry. Symbolic links are followed, so the values are the same
+    as from os.path.getsize and os.path.getmtime. If the entry cannot be stat-ed, both values are NONE.
+
+    :param entry: The directory entry produced by os.scandir.
+    """
+    try:
+        stat = entry.stat()
+    except OSError:
+        return NONE, NONE
+    return stat.st_size, stat.st_mtime
+
+
+# endregion
+
+# region Incremental traversal
+def scan_items_incremental(path: str, previous_listings: dict[str, tuple[list, list[str]]],
+                           previous_changes: dict[str, datetime.datetime],
+                           restat_files: bool = True) -> Iterator[tuple]:
+    """
+    Deep crawl which reuses the listings of folders from a previous crawl. A folder is listed again only if its last
+    change differs from the previous crawl (a file or a folder was added, removed or renamed in it). Otherwise, its
+    previous listing is reused and only its sub-folders are checked in the same way. The records are the same, and
+    in the same order, as from scan_items.
+
+    Changing the content of a file does not change the last change of its folder. Therefore, the files of reused
+    listings are stat-ed again, unless restat_files is False. In that case their previous records are carried
+    forward as they are.
+
+    :param path: The path of the folder that needs to be crawled.
+    :param previous_listings: Records of files and paths of sub-folders of each folder from the previous crawl.
+    :param previous_changes: Last changes of the folders from the previous crawl, as datetimes.
+    :param restat_files: A boolean value that determines whether to stat the files of reused listings again.
+    """
+    pending_folders = [path]
+    while pending_folders:
+        folder = pending_folders.pop()
+        listing = _reuse_listing(folder, previous_listings, previous_changes, restat_files)
+        files, folders, folders_to_enter = listing if listing is not None else scan_directory(folder)
+        yield from files
+        yield from folders
+        # Reversed, so that the first sub-folder is popped out from the stack first.
+        pending_folders.extend(reversed(folders_to_enter))
+
+
+def _reuse_listing(folder: str, previous_listings: dict[str, tuple[list, list[str]]],
+                   previous_changes: dict[str, datetime.datetime], restat_files: bool) -> tuple | None:
+    """
+    Returns the listing of the folder in the same form as scan_directory, built from the previous crawl.
+    If the folder changed since the previous crawl or anything in the listing does not match anymore, None is
+    returned and the folder has to be listed again.
+
+    :param folder: The path of the folder.
+    :param previous_listings: Records of files and paths of sub-folders of each folder from the previous crawl.
+    :param previous_changes: Last changes of the folders from the previous crawl, as datetimes.
+    :param restat_files: A boolean value that determines whether to stat the files again.
+    """
+    previous_listing = previous_listings.get(folder)
+    if previous_listing is None:
+        return None
+
+    try:
+        folder_stat = os.stat(folder)
+    except OSError:
+        return None
+    if datetime.datetime.fromtimestamp(folder_stat.st_mtime) != previous_changes.get(folder):
+        return None
+
+    previous_files, previous_folders = previous_listing
+    files = previous_files
+    if restat_files:
+        files = []
+        for file_path, *_ in previous_files:
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                return None
+            if stat.S_ISDIR(file_stat.st_mode):
+                return None
+            files.append((file_path, False, file_stat.st_size, file_stat.st_mtime))
+
+    folders = []
+    folders_to_enter = []
+    for folder_path in previous_folders:
+        try:
+            folder_stat = os.lstat(folder_path)
+            is_symlink = stat.S_ISLNK(folder_stat.st_mode)
+            if is_symlink:
+                folder_stat = os.stat(folder_path)
+        except OSError:
+            return None
+        if not stat.S_ISDIR(folder_stat.st_mode):
+            return None
+
+        folders.append((folder_path, True, NONE, folder_stat.st_mtime))
+        if not is_symlink:
+            folders_to_enter.append(folder_path)
+
+    return files, folders, folders_to_enter
+
+
+# endregion
+
+# region Parallel traversal
+class WorkStealingWalker:
+    """
+    The WorkStealingWalker lists folders in parallel. Every folder is one unit of work. Each worker has its own queue
+    of folders; it takes the newest folder from its own queue and, when the queue is empty, steals the oldest folder
+    from the queue of another worker. Folders found by a worker are put into its own queue, so one huge subtree is
+    split among all the workers instead of keeping just one of them busy.
+
+    The workers are threads, because os.scandir and stat release the GIL while they wait for the file system, and
+    the listed records do not have to be pickled between processes.
+    """
+
+    def __init__(self, workers: int = 1, max_threads: int = None):
+        """
+        :param workers: The number of workers that list the folders. One worker means a serial walk of one root.
+        :param max_threads: The highest number of threads which list the folders at the same time, for example on a
+        spinning disk. If None, one worker still lists several roots with one thread per root.
+        """
+        self.workers = max(1, workers)
+        self.max_threads = max_threads
+
+        self._queues: list[deque] = []
+        self._listings: dict[str, tuple[list, list, list[str]]] = {}
+        self._pending_folders = 0
+        self._condition = threading.Condition()
+        self._errors: list[BaseException] = []
+
+    def scan(self, path: str, go_deep: bool) -> list[tuple]:
+        """
+        Crawls through the folder at the given path and returns the same records, in the same order, as scan_items.
+
+        :param path: The path of the folder that needs to be crawled.
+        :param go_deep: A boolean value that determines whether to go deep into subdirectories or not.
+        """
+        return self.scan_roots([path], go_deep)[0]
+
+    def scan_roots(self, paths: list[str], go_deep: bool) -> list[list[tuple]]:
+        """
+        Crawls through the folders at the given paths at the same time, with the same workers, and returns the
+        records of each path separately, in the same order as scan_items. The roots are put into different queues,
+        so each of them starts being listed immediately and the workers steal the folders of all of them. With one
+        worker and without max_threads, every root gets its own thread, so that several roots are still listed at
+        the same time.
+
+        :param paths: The paths of the folders that need to be crawled.
+        :param go_deep: A boolean value that determines whether to go deep into subdirectories or not.
+        """
+        workers = self.workers if self.workers > 1 or self.max_threads is not None else len(paths)
+        if self.max_threads is not None:
+            workers = min(workers, max(1, self.max_threads))
+        if not go_deep or workers <= 1:
+            return [list(scan_items(path, go_deep)) for path in paths]
+
+        self._queues = [deque() for _ in range(workers)]
+        self._listings = {}
+        self._errors = []
+        self._pending_folders = len(paths)
+        for index, path in enumerate(paths):
+            self._queues[index % workers].append(path)
+
+        threads = [threading.Thread(target=self._work, args=(index,), daemon=True) for index in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+        records = [list(self._iter_listings_in_walk_order(path)) for path in paths]
+        self._listings = {}
+        return records
+
+    def _work(self, index: int) -> None:
+        """
+        The loop of one worker. It lists folders until there is no folder left in any queue and no other worker
+        is listing a folder anymore.
+
+        :param index: The index of the worker and of its own queue.
+        """
+        own_queue = self._queues[index]
+        while (folder := self._get_next_folder(index)) is not None:
+            folders_to_enter = []
+            try:
+                listing = scan_directory(folder)
+                self._listings[folder] = listing
+                folders_to_enter = listing[2]
+            except BaseException as error:
+                self._errors.append(error)
+            finally:
+                with self._condition:
+                    # Reversed, so that the first sub-folder is popped out from the queue first.
+                    own_queue.extend(reversed(folders_to_enter))
+                    self._pending_folders += len(folders_to_enter) - 1
+                    self._condition.notify_all()
+
+    def _get_next_folder(self, index: int) -> str | None:
+        """
+        Returns the next folder for the worker with the given index: the newest folder from its own queue or the
+        oldest folder stolen from another queue. If all the work is done, None is returned.
+
+        :param index: The index of the worker and of its own queue.
+        """
+        while True:
+            try:
+                return self._queues[index].pop()
+            except IndexError:
+                pass
+
+            for offset in range(1, len(self._queues)):
+                try:
+                    return self._queues[(index + offset) % len(self._queues)].popleft()
+                except IndexError:
+                    continue
+
+            with self._condition:
+                if self._pending_folders <= 0:
+                    return None
+                # New folders are put into the queues only while holding the condition, so no wake-up can be missed.
+                if not any(self._queues):
+                    self._condition.wait()
+
+    def _iter_listings_in_walk_order(self, path: str) -> Iterator[tuple]:
+        """
+        Yields the records of the listed folders in the same order as scan_items does.
+
+        :param path: The path of the folder which was crawled.
+        """
+        pending_folders = [path]
+        while pending_folders:
+            # The listings are not popped, because one root may be a sub-folder of another root.
+            files, folders, folders_to_enter = self._listings[pending_folders.pop()]
+            yield from files
+            yield from folders
+            pending_folders.extend(reversed(folders_to_enter))
+
+
+# endregion
+
+# region Device scheduling
+def scan_roots_by_device(paths: list[str], go_deep: bool, workers: int = 1,
+                         rotational_workers: int = ROTATIONAL_DEVICE_WORKERS) -> list[list[tuple]]:
+    """
+    Crawls through the folders at the given paths and returns the records of each path separately, in the same order
+    as scan_items. The roots are grouped by the devices they are on. The groups are crawled at the same time, each by
+    its own WorkStealingWalker, so crawling roots on different devices takes as long as the slowest device.
+
+    :param paths: The paths of the folders that need to be crawled.
+    :param go_deep: A boolean value that determines whether to go deep into subdirectories or not.
+    :param workers: The number of workers which list the folders of one device.
+    :param rotational_workers: The highest number of workers which list the folders of one rotational device.
+    """
+    devices = group_by_device(paths)
+    records = [[] for _ in paths]
+
+    def scan_device(device: int, indexes: list[int]) -> None:
+        if is_rotational_device(device):
+            # The cap holds also for several roots on the same spinning disk.
+            walker = WorkStealingWalker(min(workers, rotational_workers), max_threads=rotational_workers)
+        else:
+            walker = WorkStealingWalker(workers)
+        for index, device_records in zip(indexes, walker.scan_roots([paths[index] for index in indexes], go_deep)):
+            records[index] = device_records
+
+    if len(devices) <= 1:
+        for device, indexes in devices.items():
+            scan_device(device, indexes)
+        return records
+
+    with ThreadPoolExecutor(len(devices)) as executor:
+        # The results are consumed, so that an error of any device is raised here.
+        list(executor.map(scan_device, devices.keys(), devices.values()))
+    return records
+
+
+def group_by_device(paths: list[str]) -> dict[int, list[int]]:
+    """
+    Returns the indexes of the paths grouped by the devices which the paths are on.
+
+    :param paths: The paths of the folders that need to be crawled.
+    """
+    devices = {}
+    for index, path in enumerate(paths):
+        devices.setdefault(os.stat(path).st_dev, []).append(index)
+    return devices
+
+
+def is_rotational_device(device: int) -> bool:
+    """
+    Returns True if the device is a spinning disk. Devices which do not report it, like network shares or devices
+    on systems other than Linux, are treated as not rotational.
+
+    :param device: The st_dev of a path on the device.
+    """
+    if not hasattr(os, "major"):
+        return False
+    for flag_path in ROTATIONAL_FLAG_PATHS:
+        try:
+            with open(flag_path.format(os.major(device), os.minor(device))) as flag:
+                return flag.read().strip() == "1"
+        except (OSError, ValueError):
+            continue
+    return False
+
+
+# endregion
+
+# region Pool workers
+# The functions in this region are sent to the multiprocessing pool. They live at module level, so that only their
+# name and the chunk of paths is pickled, and each chunk returns its results as parallel numpy arrays.
+def scan_tree_totals_batch(paths: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes scan_tree_totals for a chunk of folders and returns the sizes, the numbers of files and the newest last
+    changes as three parallel arrays. Sizes and last changes which are NONE are stored as NaN.
+
+    :param paths: The paths of the folders whose totals need to be computed.
+    """
+    sizes = np.empty(len(paths), dtype=np.float64)
+    file_counts = np.empty(len(paths), dtype=np.int64)
+    newest_changes = np.empty(len(paths), dtype=np.float64)
+    for index, path in enumerate(paths):
+        sizes[index], file_counts[index], newest_changes[index] = scan_tree_totals(path)
+    return sizes, file_counts, newest_changes
+
+
+def unpack_totals_batch(sizes: np.ndarray, file_counts: np.ndarray,
+                        newest_changes: np.ndarray) -> list[tuple[int | float, int, float]]:
+    """
+    Converts the arrays returned by scan_tree_totals_batch back into the tuples returned by scan_tree_totals.
+
+    :param sizes: The sizes of the folders.
+    :param file_counts: The numbers of files in the folders.
+    :param newest_changes: The newest last changes of the files in the folders.
+    """
+    return [(NONE if np.isnan(size) else int(size), int(file_count), NONE if np.isnan(newest) else float(newest))
+            for size, file_count, newest in zip(sizes, file_counts, newest_changes)]
+
+
+# endregion
+
+# region Folder totals
+def aggregate_folder_totals(records: list[tuple]) -> dict[str, tuple[int | float, int, float]]:
+    """
+    Computes the total size, the number of files and the newest last change of every folder in the given records.
+    The records of files are added to their parent folder and then the folders are rolled up into their parent
+    folders, from the deepest to the shallowest. Therefore, each record is visited only once and no file system
+    call is needed (except for symbolic links to folders, which were not entered by the traversal).
+
+    The values are the same as if the folder was walked with os.walk. If the size of any file in the folder is
+    NONE, the size of the whole folder is NONE as well.
+
+    :param records: Records of a deep crawl, as yielded by scan_items.
+    """
+    aggregator = FolderTotalsAggregator()
+    aggregator.add_records(records)
+    return aggregator.get_totals()
+
+
+class FolderTotalsAggregator:
+    """
+    The FolderTotalsAggregator class computes the same totals as aggregate_folder_totals from records which are added
+    in batches, as they are crawled. Only the totals of folders are kept, not the records of files.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.folders = []
+
+    def add_records(self, records: Iterable[tuple]) -> None:
+        """
+        Adds the records of files to the totals of their parent folders and remembers the crawled folders.
+
+        :param records: Records of a deep crawl, as yielded by scan_items.
+        """
+        for path, is_folder, size, last_change in records:
+            if is_folder:
+                self.folders.append(path)
+            else:
+                _add_to_totals(self.totals, os.path.dirname(path), size, 1, last_change)
+
+    def get_totals(self) -> dict[str, tuple[int | float, int, float]]:
+        """
+        Rolls the totals of the folders up into their parent folders and returns the totals of every crawled folder.
+        Call it only once, after all records were added.
+        """
+        totals = self.totals
+        # A child folder has always one more separator than its parent, so the deepest folders come first.
+        folders = sorted(self.folders, key=lambda folder_path: folder_path.count(os.sep), reverse=True)
+        for folder in folders:
+            if os.path.islink(folder):
+                # The content of a link is not inside its parent folders (os.walk with followlinks=False), so only
+                # the link itself gets its totals.
+                totals[folder] = list(scan_tree_totals(folder))
+                continue
+            if folder not in totals:
+                totals[folder] = [0, 0, NONE]
+            _add_to_totals(totals, os.path.dirname(folder), *totals[folder])
+
+        return {folder: tuple(totals[folder]) for folder in folders}
+
+
+def scan_tree_totals(path: str) -> tuple[int | float, int, float]:
+    """
+    Walks the folder at the given path with os.scandir and returns the total size of all files in it and in its
+    sub-folders, the number of these files and their newest last change. Symbolic links to sub-folders are not
+    entered (same as os.walk with followlinks=False). If the size of any file cannot be read, the size is NONE.
+
+    :param path: The path of the folder whose totals need to be computed.
+    """
+    totals = {}
+    pending_folders = [path]
+    while pending_folders:
+        files, _, folders_to_enter = scan_directory(pending_folders.pop())
+        for _, _, size, last_change in files:
+            _add_to_totals(totals, path, size, 1, last_change)
+        pending_folders.extend(folders_to_enter)
+
+    return tuple(totals.get(path, (0, 0, NONE)))
+
+
+def _add_to_totals(totals: dict, folder: str, size: int | float, file_count: int, newest_change: float) -> None:
+    """
+    Adds the size, the number of files and the newest last change to the totals of the given folder.
+
+    :param totals: Dictionary with lists [size, number of files, newest last change] per folder path.
+    :param folder: The path of the folder whose totals need to be updated.
+    :param size: The size which is added to the folder. NONE makes the size of the folder NONE.
+    :param file_count: The number of files which is added to the folder.
+    :param newest_change: The last change which is compared with the newest last change of the folder.
+    """
+    folder_totals = totals.get(folder)
+    if folder_totals is None:
+        folder_totals = totals[folder] = [0, 0, NONE]
+
+    if size is NONE or folder_totals[0] is NONE:
+        folder_totals[0] = NONE
+    else:
+        folder_totals[0] += size
+    folder_totals[1] += file_count
+    if newest_change is not NONE and (folder_totals[2] is NONE or newest_change > folder_totals[2]):
+        folder_totals[2] = newest_change
+
+
+# endregion